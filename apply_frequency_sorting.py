@@ -5,8 +5,10 @@
 
 import json
 import os
-import shutil
-from collections import defaultdict
+
+from pipeline_trace import log
+from ranking_engine import CHAPTER_COUNT, DATA_DIR, CommonStrokeScorer, RankingEngine, split_into_chapters
+from stroke_table import stroke_count
 
 def load_common_characters():
     """加载常用汉字列表（前3500个最常用字）"""
@@ -121,65 +123,8 @@ def load_common_characters():
     return set(common_chars)
 
 def estimate_stroke_count(char):
-    """估算汉字笔画数（简化版）"""
-    common_strokes = {
-        '一': 1, '乙': 1, '二': 2, '十': 2, '丁': 2, '厂': 2, '七': 2,
-        '卜': 2, '八': 2, '人': 2, '入': 2, '儿': 2, '匕': 2, '几': 2,
-        '九': 2, '刁': 2, '了': 2, '刀': 2, '力': 2, '乃': 2, '又': 2,
-        '三': 3, '千': 3, '川': 3, '个': 3, '勺': 3, '久': 3, '凡': 3,
-        '及': 3, '亡': 3, '门': 3, '义': 3, '之': 3, '尸': 3, '己': 3,
-        '已': 3, '子': 3, '卫': 3, '也': 3, '女': 3, '飞': 3, '刃': 3,
-        '习': 3, '马': 3, '乡': 3, '丰': 4, '王': 4, '井': 4, '开': 4,
-        '夫': 4, '天': 4, '元': 4, '无': 4, '云': 4, '专': 4, '丐': 4,
-        '廿': 4, '五': 4, '不': 4, '丐': 4, '丑': 4, '中': 4, '丰': 4,
-        '为': 4, '主': 5, '市': 5, '立': 5, '冯': 5, '玄': 5, '玉': 5,
-        '瓜': 5, '瓦': 5, '甘': 5, '生': 5, '用': 5, '田': 5, '由': 5,
-        '甲': 5, '申': 5, '电': 5, '白': 5, '皮': 5, '皿': 5, '目': 5,
-        '矛': 5, '矢': 5, '石': 5, '示': 5, '内': 4, '午': 4, '牛': 4,
-        '手': 4, '毛': 4, '气': 4, '片': 4, '斤': 4, '爪': 4, '父': 4,
-        '月': 4, '氏': 4, '欠': 4, '风': 4, '文': 4, '方': 4, '火': 4,
-        '斗': 4, '户': 4, '心': 4, '毋': 4, '水': 4, '见': 4, '长': 4,
-        '车': 4, '贝': 4, '见': 4, '韦': 4, '木': 4, '犬': 4, '歹': 4,
-        '车': 4, '戈': 4, '比': 4, '瓦': 4, '止': 4, '攴': 4, '日': 4,
-        '曰': 4, '水': 4, '火': 4, '爪': 4, '父': 4, '爻': 4, '爿': 4,
-        '片': 4, '牙': 4, '牛': 4, '犬': 4, '玄': 4, '玉': 4, '瓜': 4,
-        '瓦': 4, '甘': 4, '生': 4, '用': 4, '田': 4, '疋': 4, '疒': 4,
-        '癶': 4, '白': 4, '皮': 4, '皿': 4, '目': 4, '矛': 4, '矢': 4,
-        '石': 4, '示': 4, '禸': 4, '禾': 4, '穴': 4, '立': 4, '竹': 4,
-        '米': 4, '糸': 4, '缶': 4, '网': 4, '羊': 4, '羽': 4, '老': 4,
-        '而': 4, '耒': 4, '耳': 4, '聿': 4, '肉': 4, '臣': 4, '自': 4,
-        '至': 4, '臼': 4, '舌': 4, '舛': 4, '舟': 4, '艮': 4, '色': 4,
-        '艸': 4, '虍': 4, '虫': 4, '血': 4, '行': 4, '衣': 4, '襾': 4,
-        '見': 4, '角': 4, '言': 4, '谷': 4, '豆': 4, '豕': 4, '豸': 4,
-        '貝': 4, '赤': 4, '走': 4, '足': 4, '身': 4, '車': 4, '辛': 4,
-        '辰': 4, '辵': 4, '邑': 4, '酉': 4, '釆': 4, '里': 4, '金': 4,
-        '長': 4, '門': 4, '阜': 4, '隶': 4, '隹': 4, '雨': 4, '靑': 4,
-        '非': 4, '面': 4, '革': 4, '韋': 4, '韭': 4, '音': 4, '頁': 4,
-        '風': 4, '飛': 4, '食': 4, '首': 4, '香': 4, '馬': 4, '骨': 4,
-        '高': 4, '髟': 4, '鬥': 4, '鬯': 4, '鬲': 4, '鬼': 4, '魚': 4,
-        '鳥': 4, '鹵': 4, '鹿': 4, '麥': 4, '麻': 4, '黃': 4, '黍': 4,
-        '黑': 4, '黹': 4, '黽': 4, '鼎': 4, '鼓': 4, '鼠': 4, '鼻': 4,
-        '齊': 4, '齒': 4, '龍': 4, '龜': 4, '龠': 4
-    }
-    
-    if char in common_strokes:
-        return common_strokes[char]
-    
-    code_point = ord(char)
-    if 0x4E00 <= code_point <= 0x9FFF:
-        if code_point < 0x4F00:
-            return 3
-        elif code_point < 0x6000:
-            return 6
-        elif code_point < 0x7000:
-            return 9
-        elif code_point < 0x8000:
-            return 12
-        elif code_point < 0x9000:
-            return 15
-        else:
-            return 8
-    return 8
+    """查询汉字笔画数（码位索引的笔画表，见 stroke_table.py）"""
+    return stroke_count(char)
 
 def calculate_character_score(char_data, common_chars):
     """计算汉字综合得分（得分越低越常用）"""
@@ -199,93 +144,25 @@ def calculate_character_score(char_data, common_chars):
     
     return total_score
 
-def sort_characters_by_frequency():
+def sort_characters_by_frequency(engine=None):
     """按字频排序所有汉字"""
-    print("开始按字频排序汉字...")
-    
-    backup_dir = "data/backup_before_frequency_sorting"
-    if not os.path.exists(backup_dir):
-        os.makedirs(backup_dir)
-        print(f"创建备份目录: {backup_dir}")
-    
-    for chapter in range(1, 11):
-        src_file = f"data/chapter_{chapter}_characters.json"
-        dst_file = f"{backup_dir}/chapter_{chapter}_characters.json.backup"
-        if os.path.exists(src_file):
-            shutil.copy2(src_file, dst_file)
-            print(f"  备份: {src_file} -> {dst_file}")
-    
-    common_chars = load_common_characters()
-    print(f"加载常用字: {len(common_chars)} 个")
-    
-    all_characters = []
-    for chapter in range(1, 11):
-        try:
-            with open(f'data/chapter_{chapter}_characters.json', 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                all_characters.extend(data)
-                print(f"  第{chapter}章: 加载了{len(data)}个汉字")
-        except Exception as e:
-            print(f"  第{chapter}章加载失败: {e}")
-    
-    print(f"总共收集到 {len(all_characters)} 个汉字")
-    
-    print("计算汉字得分...")
-    scored_characters = []
-    for char_data in all_characters:
-        score = calculate_character_score(char_data, common_chars)
-        scored_characters.append({
-            'char_data': char_data,
-            'score': score
-        })
-    
-    print("按得分排序...")
-    scored_characters.sort(key=lambda x: x['score'])
-    
-    print("生成最终排名...")
-    ranked_characters = []
-    for i, item in enumerate(scored_characters, 1):
-        char_data = item['char_data'].copy()
-        char_data['frequency_rank'] = i
-        ranked_characters.append(char_data)
-    
-    print("按章节重新分组...")
-    total_chars = len(ranked_characters)
-    chars_per_chapter = total_chars // 10
-    remainder = total_chars % 10
-    
-    start_index = 0
-    for chapter in range(1, 11):
-        chapter_count = chars_per_chapter
-        if chapter <= remainder:
-            chapter_count += 1
-        
-        end_index = start_index + chapter_count
-        chapter_chars = ranked_characters[start_index:end_index]
-        
-        output_file = f'data/chapter_{chapter}_characters.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(chapter_chars, f, ensure_ascii=False, indent=2)
-        
-        print(f"  第{chapter}章: {len(chapter_chars)}个汉字")
-        print(f"    第一个字: {chapter_chars[0]['char']} (排名: {chapter_chars[0]['frequency_rank']})")
-        print(f"    最后一个字: {chapter_chars[-1]['char']} (排名: {chapter_chars[-1]['frequency_rank']})")
-        
-        start_index = end_index
-    
-    generate_statistics_report(ranked_characters)
-    
-    print("\n" + "=" * 60)
-    print("排序完成！")
-    print("=" * 60)
-    print("重要提示:")
-    print("1. 原始数据已备份到 data/backup_before_frequency_sorting/")
-    print("2. 新的字频排名已应用到所有章节数据")
-    print("3. 现在汉字将按字频排序（最常用字在前）")
-    print("4. 排序规则: 常用字优先 → 笔画数少优先 → Unicode编码")
-    print("=" * 60)
+    log("开始按字频排序汉字...")
 
-def generate_statistics_report(ranked_characters):
+    if engine is None:
+        engine = RankingEngine()
+    engine.run(CommonStrokeScorer())
+    
+    log("\n" + "=" * 60)
+    log("排序完成！")
+    log("=" * 60)
+    log("重要提示:")
+    log("1. 排序前的数据已保存为快照（python snapshot_store.py list 查看）")
+    log("2. 新的字频排名已应用到所有章节数据")
+    log("3. 现在汉字将按字频排序（最常用字在前）")
+    log("4. 排序规则: 常用字优先 → 笔画数少优先 → Unicode编码")
+    log("=" * 60)
+
+def generate_statistics_report(ranked_characters, data_dir=DATA_DIR, chapter_count=CHAPTER_COUNT):
     """生成统计报告"""
     report = {
         "total_characters": len(ranked_characters),
@@ -312,19 +189,7 @@ def generate_statistics_report(ranked_characters):
         for c in ranked_characters[-50:]
     ]
     
-    total_chars = len(ranked_characters)
-    chars_per_chapter = total_chars // 10
-    remainder = total_chars % 10
-    
-    start_index = 0
-    for chapter in range(1, 11):
-        chapter_count = chars_per_chapter
-        if chapter <= remainder:
-            chapter_count += 1
-        
-        end_index = start_index + chapter_count
-        chapter_chars = ranked_characters[start_index:end_index]
-        
+    for chapter, chapter_chars in enumerate(split_into_chapters(ranked_characters, chapter_count), 1):
         report["chapters_summary"][f"chapter_{chapter}"] = {
             "character_count": len(chapter_chars),
             "first_char": chapter_chars[0]['char'],
@@ -332,29 +197,28 @@ def generate_statistics_report(ranked_characters):
             "last_char": chapter_chars[-1]['char'],
             "last_char_rank": chapter_chars[-1]['frequency_rank']
         }
-        
-        start_index = end_index
     
-    with open('data/frequency_sorting_report.json', 'w', encoding='utf-8') as f:
+    report_file = os.path.join(data_dir, 'frequency_sorting_report.json')
+    with open(report_file, 'w', encoding='utf-8') as f:
         json.dump(report, f, ensure_ascii=False, indent=2)
     
-    print(f"\n统计报告已保存: data/frequency_sorting_report.json")
+    log(f"\n统计报告已保存: {report_file}")
     
-    print("\n=== 字频排序统计报告 ===")
-    print(f"总汉字数: {report['total_characters']}")
-    print("\n前10个最常用汉字:")
+    log("\n=== 字频排序统计报告 ===")
+    log(f"总汉字数: {report['total_characters']}")
+    log("\n前10个最常用汉字:")
     for i, char_info in enumerate(report['top_50_chars'][:10], 1):
-        print(f"  {i}. {char_info['char']} ({char_info['jyutping']}) - 排名: {char_info['frequency_rank']}")
+        log(f"  {i}. {char_info['char']} ({char_info['jyutping']}) - 排名: {char_info['frequency_rank']}")
     
-    print("\n最后10个汉字:")
+    log("\n最后10个汉字:")
     for i, char_info in enumerate(report['bottom_50_chars'][-10:], 1):
         idx = report['total_characters'] - 10 + i
-        print(f"  {idx}. {char_info['char']} ({char_info['jyutping']}) - 排名: {char_info['frequency_rank']}")
+        log(f"  {idx}. {char_info['char']} ({char_info['jyutping']}) - 排名: {char_info['frequency_rank']}")
 
 if __name__ == "__main__":
-    print("=" * 60)
-    print("汉字字频排序系统")
-    print("排序规则: 常用字优先 → 笔画数少优先 → Unicode编码")
-    print("=" * 60)
+    log("=" * 60)
+    log("汉字字频排序系统")
+    log("排序规则: 常用字优先 → 笔画数少优先 → Unicode编码")
+    log("=" * 60)
     
     sort_characters_by_frequency()
\ No newline at end of file
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+排序流水线基准测试
+对每个评分器（apply_frequency_sorting.py 与 simple_frequency_sort.py 共用 common）
+分别计时：加载章节 → 准备 → 评分 → 排序 → 排名 → 分章 → 写入 → 统计报告，
+数据为真实的 8105 个汉字以及 10 万、100 万条合成记录（见 vectorized_scoring.synthetic_characters）。
+
+每个「规模 × 评分器」在单独的子进程中运行，读写都在临时目录里进行，不会改动 data/。
+阶段由 pipeline_trace 记录（写入阶段另含分页、章节、数据集、反查索引等子阶段）。
+结果写成 JSON（各阶段耗时、计数器、进程常驻内存峰值，加 --tracemalloc 时另记各阶段 Python 堆峰值），
+并与保存的基线比较：阶段耗时超出容差即视为退化，退出码为 1。
+
+    python benchmark_sorters.py                          全部规模和评分器
+    python benchmark_sorters.py --sizes real 100000 --scorers wordfreq
+    python benchmark_sorters.py --save-baseline          把本次结果保存为基线
+"""
+
+import argparse
+import concurrent.futures
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+from chapter_pages import MANIFEST_FILE
+from chapter_writer import write_files
+from pipeline_trace import PipelineTrace, stage, use_trace, warn
+from ranking_engine import DATA_DIR, SCORERS, RankingEngine, chapter_file, discover_chapter_count, \
+    load_characters, split_into_chapters
+
+BASELINE_FILE = "benchmark_baseline.json"
+RESULTS_FILE = "benchmark_results.json"
+DEFAULT_SIZES = ["real", "100000", "1000000"]
+TOLERANCE = 0.25
+MIN_REGRESSION = 0.005  # 秒；更短的阶段波动太大，不参与比较
+
+
+def max_rss_mb():
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以字节计，Linux 以 KB 计
+    return usage / 2 ** 20 if sys.platform == "darwin" else usage / 1024
+
+
+def prepare_workdir(size, workdir, data_dir):
+    """把待测数据放进临时目录，返回章节数量"""
+    if size == "real":
+        chapter_count = discover_chapter_count(data_dir)
+        for chapter in range(1, chapter_count + 1):
+            shutil.copy(chapter_file(data_dir, chapter), chapter_file(workdir, chapter))
+        # 保留多音字专栏等特殊章节的清单条目
+        if os.path.exists(os.path.join(data_dir, MANIFEST_FILE)):
+            shutil.copy(os.path.join(data_dir, MANIFEST_FILE), os.path.join(workdir, MANIFEST_FILE))
+        return chapter_count
+
+    from vectorized_scoring import synthetic_characters
+
+    characters = synthetic_characters(int(size))
+    for i, record in enumerate(characters, 1):
+        record['frequency_rank'] = i
+    chapters = split_into_chapters(characters)
+    write_files([(chapter_file(workdir, chapter), chapter_chars)
+                 for chapter, chapter_chars in enumerate(chapters, 1)], minify=True)
+    return len(chapters)
+
+
+def isolate_frequency_cache(size, workdir):
+    """字频缓存改用临时目录里的文件（每个用例在单独的子进程中运行）
+
+    合成数据的查询不会写进共享的 .cache/wordfreq-*.json，也不会让之后的运行变快；
+    真实数据先复制一份共享缓存，与平时运行时一样从热缓存开始。
+    """
+    import frequency_cache
+
+    if size == "real":
+        for path in glob.glob(os.path.join(frequency_cache.CACHE_DIR, "wordfreq-*.json")):
+            shutil.copy(path, workdir)
+    frequency_cache.CACHE_DIR = workdir
+
+
+def run_case(size, scorer_name, vectorized=False, trace_memory=False, data_dir=DATA_DIR):
+    """在临时目录中跑一遍完整流水线，返回各阶段的测量结果"""
+    # 不输出进度；准备数据不计入结果
+    workdir = tempfile.mkdtemp(prefix="jyutping-bench-")
+    try:
+        with use_trace(PipelineTrace(quiet=True)):
+            chapter_count = prepare_workdir(size, workdir, data_dir)
+            isolate_frequency_cache(size, workdir)
+
+        trace = PipelineTrace(quiet=True, trace_memory=trace_memory)
+        with use_trace(trace):
+            scorer = SCORERS[scorer_name]()
+            with stage("load"):
+                characters = load_characters(workdir, chapter_count)
+            engine = RankingEngine(workdir, chapter_count, characters=characters)
+            with stage("prepare"):
+                scorer.prepare(characters)
+            if vectorized:
+                with stage("score_sort"):
+                    scored = engine.vector_score(scorer, characters)
+            else:
+                with stage("score"):
+                    scored = engine.score_characters(scorer, characters)
+                with stage("sort"):
+                    engine.sort_scored(scorer, scored)
+            with stage("assign_ranks"):
+                ranked = engine.assign_ranks(scorer, scored)
+            with stage("split"):
+                chapters = split_into_chapters(ranked, chapter_count)
+            # write_chapters 和 report 自己记录 write（含各子阶段）与 report 阶段
+            engine.write_chapters(ranked, scorer, chapters)
+            engine.report(scorer, ranked)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    stages = {}
+    for record in trace.to_json()["stages"]:
+        stages[record["name"]] = {"seconds": record["seconds"], "parent": record["parent"]}
+        if "memory" in record:
+            stages[record["name"]]["heap_peak_mb"] = record["memory"]["peak_mb"]
+    return {
+        "size": size,
+        "records": len(characters),
+        "scorer": scorer_name,
+        "vectorized": vectorized,
+        "total_seconds": round(sum(s["seconds"] for s in stages.values() if s["parent"] is None), 6),
+        "rss_peak_mb": round(max_rss_mb(), 1),
+        "counters": trace.counters,
+        "stages": stages,
+    }
+
+
+def case_key(case):
+    return f"{case['size']}/{case['scorer']}{'/vectorized' if case['vectorized'] else ''}"
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """返回退化列表 [(用例, 阶段, 基线秒数, 本次秒数)]"""
+    previous = {case_key(case): case for case in baseline.get("cases", [])}
+    regressions = []
+    for case in results["cases"]:
+        base_case = previous.get(case_key(case))
+        if base_case is None:
+            continue
+        for name, stage in case["stages"].items():
+            base_stage = base_case["stages"].get(name)
+            if base_stage is None:
+                continue
+            before, after = base_stage["seconds"], stage["seconds"]
+            if after - before > MIN_REGRESSION and after > before * (1 + tolerance):
+                regressions.append((case_key(case), name, before, after))
+    return regressions
+
+
+def print_table(cases):
+    stage_names = []
+    for case in cases:
+        stage_names.extend(name for name, stage in case["stages"].items()
+                           if stage["parent"] is None and name not in stage_names)
+    print(f"{'用例':<28}" + "".join(f"{name:>13}" for name in stage_names) + f"{'合计':>10}{'内存峰值':>10}")
+    for case in cases:
+        cells = "".join(f"{case['stages'][name]['seconds'] * 1000:>10.1f} ms" if name in case["stages"]
+                        else f"{'-':>13}" for name in stage_names)
+        print(f"{case_key(case):<28}{cells}{case['total_seconds']:>8.2f} s{case['rss_peak_mb']:>7.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对各排序器的每个阶段计时")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES,
+                        help="数据规模：real 表示真实章节数据，数字表示合成记录条数")
+    parser.add_argument("--scorers", nargs="+", choices=sorted(SCORERS), default=sorted(SCORERS))
+    parser.add_argument("--vectorized", action="store_true", help="同时测试 numpy 向量化路径")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="统计各阶段 Python 堆峰值（会使耗时明显变长）")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="真实章节数据目录")
+    parser.add_argument("-o", "--output", default=RESULTS_FILE, help="结果 JSON 文件")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="基线 JSON 文件")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果保存为基线")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="允许的耗时增幅（0.25 即 25%%）")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        if size != "real" and not size.isdigit():
+            parser.error(f"无效的规模: {size}")
+
+    jobs = [(size, scorer, vectorized)
+            for size in args.sizes
+            for scorer in args.scorers
+            for vectorized in ([False, True] if args.vectorized else [False])]
+
+    cases = []
+    # 每个用例一个全新的进程（spawn），内存峰值互不影响；依次运行以免互相争抢 CPU
+    context = multiprocessing.get_context("spawn")
+    for size, scorer, vectorized in jobs:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            case = pool.submit(run_case, size, scorer, vectorized, args.tracemalloc, args.data_dir).result()
+        cases.append(case)
+        print(f"  {case_key(case)}: {case['records']} 条, {case['total_seconds']:.2f} s")
+
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "tracemalloc": args.tracemalloc,
+        "cases": cases,
+    }
+    print()
+    print_table(cases)
+
+    # 比较结果（含没有基线的情况）一并写进结果文件，CI 等读取结果的一方不会把「没有比较」当成「没有退化」
+    regressions = []
+    if args.save_baseline:
+        results["baseline"] = {"path": args.baseline, "status": "saved"}
+    elif not os.path.exists(args.baseline):
+        results["baseline"] = {"path": args.baseline, "status": "missing"}
+    else:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        results["baseline"] = {
+            "path": args.baseline,
+            "status": "regressed" if regressions else "ok",
+            "tolerance": args.tolerance,
+            "tracemalloc_mismatch": baseline.get("tracemalloc") != results["tracemalloc"],
+            "regressions": [{"case": key, "stage": name, "before": before, "after": after}
+                            for key, name, before, after in regressions],
+        }
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n结果已写入 {args.output}")
+
+    status = results["baseline"]["status"]
+    if status == "saved":
+        shutil.copy(args.output, args.baseline)
+        print(f"已保存为基线 {args.baseline}")
+        return
+    if status == "missing":
+        # 基线与机器相关，不随仓库提交；没有基线时明确提示本次没有做退化检查
+        warn(f"⚠️ 没有基线文件 {args.baseline}，本次没有做退化检查；使用 --save-baseline 保存基线")
+        return
+    if results["baseline"]["tracemalloc_mismatch"]:
+        warn("⚠️ 基线与本次的 tracemalloc 设置不同，耗时不可直接比较")
+    if not regressions:
+        print(f"与基线 {args.baseline} 相比没有退化（容差 {args.tolerance:.0%}）")
+        return
+    warn(f"⚠️ 与基线 {args.baseline} 相比有 {len(regressions)} 个阶段变慢:")
+    for key, name, before, after in regressions:
+        warn(f"  {key} {name}: {before * 1000:.1f} ms → {after * 1000:.1f} ms (+{after / before - 1:.0%})")
+    sys.exit(1)
+
+if __name__ == "__main__":
+    main()
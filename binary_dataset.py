@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+可内存映射的二进制汉字数据集
+按列存储定长字段，行按 frequency_rank 排序；打开文件只需 mmap 并读取列目录，
+之后按排名或码位随机访问，不解析 JSON、不复制数据
+
+文件格式（小端）：
+    头部    魔数 b'JYDS'、格式版本、列数、行数
+    列目录  每列 "<12s c x I I"：列名、struct 类型码、数据偏移、元素个数
+    列数据  每列按 8 字节对齐
+        codepoint     I  码位
+        rank          I  frequency_rank
+        tone          B  声调
+        reading       H  读音编码（音节序号 * 8 + 声调；例外读音为 例外序号 * 8 + 7，见 jyutping_inventory.py）
+        secondary     H  第二读音编码（NO_READING 表示没有该字段）
+        wordfreq      d  wordfreq_score
+        audio         B  是否有音频
+        by_codepoint  I  按码位排序的行号（用于二分查找）
+        syl_ends      I  音节表：第 i 个音节在 syl_text 中的结束位置
+        syl_text      B  音节表：UTF-8 文本
+        irr_ends      I  例外读音表（同上）
+        irr_text      B
+"""
+
+import argparse
+import bisect
+import mmap
+import os
+import struct
+import time
+
+from jyutping_inventory import JyutpingInventory, is_irregular
+from pipeline_trace import count
+
+DATASET_NAME = "characters.bin"
+DATASET_FILE = os.path.join("data", DATASET_NAME)
+
+MAGIC = b"JYDS"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<4sHHI")
+COLUMN = struct.Struct("<12scxII")
+NO_READING = 0xFFFF
+
+ROW_COLUMNS = [
+    ("codepoint", "I"),
+    ("rank", "I"),
+    ("tone", "B"),
+    ("reading", "H"),
+    ("secondary", "H"),
+    ("wordfreq", "d"),
+    ("audio", "B"),
+]
+
+
+def _align(offset, alignment=8):
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def _string_table(strings):
+    text = bytearray()
+    ends = []
+    for string in strings:
+        text += string.encode('utf-8')
+        ends.append(len(text))
+    return ends, text
+
+
+def pack_dataset(characters, audio_chars=(), inventory=None):
+    """把汉字记录打包成二进制数据集（返回 bytes）"""
+    rows = sorted(characters, key=lambda c: c.get('frequency_rank', 0))
+    audio_chars = set(audio_chars)
+    if inventory is None:
+        inventory = JyutpingInventory()
+        inventory.add_characters(rows)
+
+    def reading_id(text):
+        code = inventory.encode(text)
+        return NO_READING if code is None else code
+
+    columns = {name: [] for name, _ in ROW_COLUMNS}
+    for row in rows:
+        columns["codepoint"].append(ord(row['char']))
+        columns["rank"].append(row.get('frequency_rank', 0))
+        columns["tone"].append(row.get('tone', 0))
+        columns["reading"].append(reading_id(row.get('jyutping', '')))
+        columns["secondary"].append(reading_id(row.get('secondary_jyutping')))
+        columns["wordfreq"].append(float(row.get('wordfreq_score', 0.0)))
+        columns["audio"].append(1 if row['char'] in audio_chars else 0)
+    if max(len(inventory.syllables), len(inventory.irregular)) * 8 >= NO_READING:
+        raise ValueError(f"音节种类过多: {len(inventory.syllables)}")
+
+    columns["by_codepoint"] = sorted(range(len(rows)), key=columns["codepoint"].__getitem__)
+    columns["syl_ends"], columns["syl_text"] = _string_table(inventory.syllables)
+    columns["irr_ends"], columns["irr_text"] = _string_table(inventory.irregular)
+
+    layout = ROW_COLUMNS + [("by_codepoint", "I"), ("syl_ends", "I"), ("syl_text", "B"),
+                            ("irr_ends", "I"), ("irr_text", "B")]
+    offset = _align(HEADER.size + COLUMN.size * len(layout))
+    directory = []
+    payloads = []
+    for name, fmt in layout:
+        values = columns[name]
+        payload = bytes(values) if fmt == "B" else struct.pack(f"<{len(values)}{fmt}", *values)
+        directory.append(COLUMN.pack(name.encode('ascii'), fmt.encode('ascii'), offset, len(values)))
+        payloads.append((offset, payload))
+        offset = _align(offset + len(payload))
+
+    buffer = bytearray(offset)
+    HEADER.pack_into(buffer, 0, MAGIC, FORMAT_VERSION, len(layout), len(rows))
+    buffer[HEADER.size:HEADER.size + COLUMN.size * len(layout)] = b"".join(directory)
+    for start, payload in payloads:
+        buffer[start:start + len(payload)] = payload
+    return bytes(buffer)
+
+
+def audio_characters(audio_dir="audio"):
+    """有音频（单字或多音字录音）的汉字集合"""
+    from build_audio_index import scan_audio
+    single, multi = scan_audio(audio_dir)
+    return set(single) | {key.split("|")[0] for key in multi}
+
+
+def write_dataset(characters, output_path=DATASET_FILE, audio_chars=(), inventory=None):
+    payload = pack_dataset(characters, audio_chars, inventory)
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, output_path)
+    count("files_written")
+    count("bytes_written", len(payload))
+    return len(payload)
+
+
+class BinaryDataset:
+    """内存映射的二进制数据集；各列以 memoryview 形式零拷贝访问"""
+
+    def __init__(self, path=DATASET_FILE):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, column_count, self.size = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"无法识别的数据集文件: {path}")
+
+        self._view = memoryview(self._mm)
+        self.columns = {}
+        for i in range(column_count):
+            name, fmt, offset, count = COLUMN.unpack_from(self._mm, HEADER.size + i * COLUMN.size)
+            fmt = fmt.decode('ascii')
+            width = struct.calcsize(fmt)
+            self.columns[name.rstrip(b"\0").decode('ascii')] = (
+                self._view[offset:offset + count * width].cast(fmt))
+        self._strings = {}
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def _string(self, table, index):
+        key = (table, index)
+        text = self._strings.get(key)
+        if text is None:
+            ends = self.columns[f"{table}_ends"]
+            start = ends[index - 1] if index else 0
+            text = self._strings[key] = bytes(self.columns[f"{table}_text"][start:ends[index]]).decode('utf-8')
+        return text
+
+    def reading(self, code):
+        """读音编码还原成粤拼文本；NO_READING 返回 None"""
+        if code == NO_READING:
+            return None
+        if is_irregular(code):
+            return self._string("irr", code >> 3)
+        return f"{self._string('syl', code >> 3)}{code & 7}"
+
+    def row_index_by_rank(self, rank):
+        ranks = self.columns["rank"]
+        index = bisect.bisect_left(ranks, rank)
+        return index if index < self.size and ranks[index] == rank else None
+
+    def row_index_by_codepoint(self, code_point):
+        codepoints = self.columns["codepoint"]
+        order = self.columns["by_codepoint"]
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if codepoints[order[mid]] < code_point:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.size and codepoints[order[lo]] == code_point:
+            return order[lo]
+        return None
+
+    def record(self, index):
+        """第 index 行还原成与章节 JSON 相同字段的字典"""
+        c = self.columns
+        record = {
+            'char': chr(c["codepoint"][index]),
+            'jyutping': self.reading(c["reading"][index]),
+            'tone': c["tone"][index],
+            'frequency_rank': c["rank"][index],
+            'wordfreq_score': c["wordfreq"][index],
+        }
+        secondary = self.reading(c["secondary"][index])
+        if secondary is not None:
+            record['secondary_jyutping'] = secondary
+        return record
+
+    def by_rank(self, rank):
+        index = self.row_index_by_rank(rank)
+        return None if index is None else self.record(index)
+
+    def by_char(self, char):
+        index = self.row_index_by_codepoint(ord(char))
+        return None if index is None else self.record(index)
+
+    def has_audio(self, char):
+        index = self.row_index_by_codepoint(ord(char))
+        return index is not None and bool(self.columns["audio"][index])
+
+    def as_array(self, name):
+        """以 numpy 数组形式零拷贝访问一列（需要 numpy）"""
+        import numpy as np
+        return np.frombuffer(self.columns[name], dtype=self.columns[name].format)
+
+    def close(self):
+        for view in self.columns.values():
+            view.release()
+        self.columns = {}
+        self._view.release()
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成并检查二进制汉字数据集")
+    parser.add_argument("--data-dir", default="data", help="章节数据目录")
+    parser.add_argument("-o", "--output", default=DATASET_FILE, help="输出文件")
+    parser.add_argument("--benchmark", action="store_true", help="对比 JSON 解析与 mmap 打开的耗时")
+    args = parser.parse_args()
+
+    from jyutping_inventory import update_inventory
+    from ranking_engine import discover_chapter_count, load_characters
+
+    characters = load_characters(args.data_dir, discover_chapter_count(args.data_dir))
+    inventory = update_inventory(characters, args.data_dir)
+    size = write_dataset(characters, args.output, audio_characters(), inventory)
+    print(f"✅ 已写入 {args.output}: {len(characters)} 个汉字, {size / 1024:.1f} KB")
+
+    with BinaryDataset(args.output) as dataset:
+        mismatched = [c['char'] for c in characters
+                      if dataset.by_char(c['char']) != {**c, 'wordfreq_score': float(c.get('wordfreq_score', 0.0))}]
+        print(f"校验: {len(characters) - len(mismatched)}/{len(characters)} 条记录一致")
+        print(f"有音频: {sum(dataset['audio'])} 个")
+
+    if args.benchmark:
+        import json
+        from ranking_engine import chapter_file
+
+        rounds = 200
+        start = time.perf_counter()
+        for _ in range(rounds // 20):
+            for chapter in range(1, discover_chapter_count(args.data_dir) + 1):
+                with open(chapter_file(args.data_dir, chapter), 'r', encoding='utf-8') as f:
+                    json.load(f)
+        json_time = (time.perf_counter() - start) / (rounds // 20)
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            with BinaryDataset(args.output) as dataset:
+                dataset.by_rank(1)
+        mmap_time = (time.perf_counter() - start) / rounds
+        print(f"解析全部章节 JSON: {json_time * 1000:.2f} ms/次")
+        print(f"打开二进制数据集并查询一次: {mmap_time * 1e6:.1f} µs/次")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+数据构建图
+把所有派生数据（排名后的章节、多音字专栏、统计报告、分章汇总、音频元数据、音频去重、音频索引、例词、多音字分析、预缓存清单）
+登记为一张依赖图，一条命令只重建有变化的部分：
+
+    python build.py                 构建全部
+    python build.py examples        只构建 examples 及其上游
+    python build.py --list          列出各阶段及其是否需要重建
+    python build.py -n              只显示将要运行的阶段
+    python build.py --force rank    强制重建 rank（下游按内容变化决定是否重建）
+
+每个阶段声明输入、输出和命令；某阶段的输入是另一个（先登记的）阶段的输出时，它依赖那个阶段。
+阶段的键是命令、参数、脚本（含本地导入的 Python 模块和 require 的 JS 文件）和全部输入文件内容的 SHA-256，
+与上次成功构建时记录的键相同且输出都存在时跳过；上游重建后输出没变，下游同样跳过。
+互不依赖的阶段在线程池中并行运行（各阶段本身是独立的 Python/Node 进程）。
+
+有的阶段会原地改写上游的文件（如多音字专栏更新 chapters.json 中第 11 章的字数），
+所以各阶段的键在整次构建结束后按最终的文件内容记录，紧接着再构建不会重复运行。
+状态保存在 .cache/build/state.json（另含按大小和修改时间缓存的文件哈希）。
+"""
+
+import argparse
+import ast
+import functools
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from chapter_writer import write_files
+from json_backend import dump_file, load_file, load_files
+from pipeline_trace import log, warn
+from ranking_engine import DATA_DIR, chapter_file, discover_chapter_count
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = os.path.join(".cache", "build", "state.json")
+STATE_VERSION = 1
+MISSING = "missing"
+# Node 脚本中按相对路径 require 的本地文件
+JS_REQUIRE = re.compile(r"""\brequire\(\s*['"](\.{1,2}/[^'"]+)['"]\s*\)""")
+# 各评分器（--scorer 可选的排名方式）的统计报告
+REPORTS = {
+    "common": "frequency_sorting_report.json",
+    "real": "real_frequency_sorting_report.json",
+    "wordfreq": "wordfreq_sorting_report.json",
+    "fusion": "fusion_sorting_report.json",
+}
+
+
+class Stage:
+    """一个构建阶段：command 是命令行参数列表，或在本进程中调用的函数"""
+
+    def __init__(self, name, command, inputs, outputs, params=None, description=""):
+        self.name = name
+        self.command = command
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.params = params or {}
+        self.description = description
+        self.deps = []
+
+    @property
+    def scripts(self):
+        if callable(self.command):
+            return [os.path.relpath(os.path.abspath(__file__), ROOT)]
+        return [arg for arg in self.command if arg.endswith((".py", ".js"))]
+
+    def signature(self):
+        if callable(self.command):
+            return f"{self.command.__module__}.{self.command.__name__}"
+        return [os.path.basename(arg) if arg == sys.executable else arg for arg in self.command]
+
+
+@functools.lru_cache(maxsize=None)
+def direct_imports(script):
+    """脚本直接导入的仓库内模块（构建期间脚本不会变化，只解析一次）"""
+    if script.endswith(".js"):
+        return js_requires(script)
+    with open(script, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), script)
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        modules.update(name.split(".")[0] + ".py" for name in names)
+    return frozenset(module for module in modules if os.path.exists(module))
+
+
+def js_requires(script):
+    """Node 脚本 require 的本地文件（按 Node 的规则补全 .js / .json / index.js）"""
+    with open(script, 'r', encoding='utf-8') as f:
+        source = f.read()
+    required = set()
+    for spec in JS_REQUIRE.findall(source):
+        path = os.path.normpath(os.path.join(os.path.dirname(script), spec))
+        for candidate in (path, path + ".js", path + ".json", os.path.join(path, "index.js")):
+            if os.path.isfile(candidate):
+                required.add(candidate)
+                break
+    return frozenset(required)
+
+
+def local_imports(script, seen=None):
+    """脚本及其（递归）导入的仓库内模块和 require 的文件"""
+    seen = set() if seen is None else seen
+    if script in seen or not os.path.exists(script):
+        return seen
+    seen.add(script)
+    if script.endswith((".py", ".js")):
+        for module in direct_imports(script):
+            local_imports(module, seen)
+    return seen
+
+
+class BuildState:
+    """各阶段上次成功构建的键，以及文件哈希缓存 {路径: [大小, 修改时间, 摘要]}"""
+
+    def __init__(self, path=STATE_FILE):
+        self.path = path
+        self.stages = {}
+        self.hashes = {}
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return self
+        try:
+            data = load_file(self.path, cache=False)
+        except (OSError, ValueError) as e:
+            warn(f"读取构建状态失败，全部重建: {e}")
+            return self
+        if data.get("version") == STATE_VERSION:
+            self.stages = data.get("stages", {})
+            self.hashes = data.get("hashes", {})
+        return self
+
+    def save(self):
+        dump_file(self.path, {"version": STATE_VERSION, "stages": self.stages, "hashes": self.hashes})
+
+    def file_digest(self, path):
+        stat = os.stat(path)
+        cached = self.hashes.get(path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(2 ** 20), b""):
+                digest.update(block)
+        self.hashes[path] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def path_digest(self, path):
+        """文件的内容摘要；目录按相对路径合并其中所有文件的摘要"""
+        if os.path.isfile(path):
+            return self.file_digest(path)
+        if not os.path.isdir(path):
+            return MISSING
+        digest = hashlib.sha256()
+        prefix = len(path.rstrip(os.sep)) + 1
+        for root, dirs, names in os.walk(path):
+            dirs.sort()
+            for name in sorted(names):
+                file_path = os.path.join(root, name)
+                digest.update(f"{file_path[prefix:]}\0{self.file_digest(file_path)}\n".encode())
+        return digest.hexdigest()
+
+    def stage_key(self, stage):
+        scripts = sorted(set().union(*(local_imports(script) for script in stage.scripts)))
+        payload = {
+            "command": stage.signature(),
+            "params": stage.params,
+            "scripts": {script: self.path_digest(script) for script in scripts},
+            "inputs": {path: self.path_digest(path) for path in stage.inputs},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def is_current(self, stage, key):
+        return self.stages.get(stage.name) == key and all(os.path.exists(path) for path in stage.outputs)
+
+
+def write_chapter_characters(data_dir=DATA_DIR):
+    """data/chapter_characters.json：各章汉字的排名汇总 {章节: [{char, jyutping, tone, frequency_rank}]}"""
+    summary = {}
+    paths = [chapter_file(data_dir, chapter) for chapter in range(1, discover_chapter_count(data_dir) + 1)]
+    for chapter, (path, characters, error) in enumerate(load_files(paths), 1):
+        if error is not None:
+            raise error
+        summary[str(chapter)] = [
+            {field: record[field] for field in ("char", "jyutping", "tone", "frequency_rank") if field in record}
+            for record in sorted(characters, key=lambda c: c.get('frequency_rank', 0))
+        ]
+    write_files([(os.path.join(data_dir, "chapter_characters.json"), summary)])
+
+
+def build_graph(scorer="wordfreq", data_dir=DATA_DIR):
+    """按依赖顺序登记全部阶段；依赖关系由输入与输出的重叠推出"""
+    python = sys.executable
+    chapters = [chapter_file(data_dir, chapter) for chapter in range(1, discover_chapter_count(data_dir) + 1)]
+    manifest = os.path.join(data_dir, "chapters.json")
+    polyphones = chapter_file(data_dir, 11)
+    inventory = os.path.join(data_dir, "jyutping_inventory.json")
+    single_chars = os.path.join("audio", "single_chars")
+    syllables = os.path.join("audio", "syllables")
+    audio_index = os.path.join("audio", "index.json")
+    strokes = os.path.join(data_dir, "stroke_counts.bin")
+    stages = [
+        Stage("stroke_table", [python, "stroke_table.py", os.path.join(data_dir, "stroke_counts.tsv"), "-o", strokes],
+              inputs=[os.path.join(data_dir, "stroke_counts.tsv")], outputs=[strokes],
+              description="按码位索引的笔画数表"),
+        # 排名写回时二进制数据集的「是否有音频」列读取 audio/index.json，所以音频两步先登记、rank 排在其后
+        Stage("audio_metadata", [python, "scan_audio_metadata.py"],
+              inputs=[single_chars, audio_index], outputs=[audio_index],
+              description="音频时长、比特率、帧数和哈希"),
+        Stage("audio_dedupe", [python, "dedupe_audio.py"],
+              inputs=[single_chars, audio_index],
+              outputs=[audio_index, syllables, os.path.join("audio", "dedupe_report.json")],
+              description="按内容哈希合并重复音频"),
+        Stage("rank", [python, "ranking_engine.py", scorer, "-q"],
+              inputs=chapters + [manifest, os.path.join(data_dir, "corpus_frequency.json"), strokes, single_chars,
+                                 audio_index],
+              outputs=chapters + [manifest, inventory, os.path.join(data_dir, "pages"),
+                                  os.path.join(data_dir, "characters.bin"), os.path.join(data_dir, "reverse_index"),
+                                  os.path.join(data_dir, REPORTS[scorer])],
+              params={"scorer": scorer},
+              description="排名、写回章节、分页、二进制数据集、读音反查索引"),
+        Stage("polyphones", ["node", "generate_polyphone_chapter.js"],
+              inputs=chapters + [manifest], outputs=[polyphones, manifest],
+              description="多音字专栏（第 11 章）"),
+    ]
+    for name, report in sorted(REPORTS.items()):
+        if name != scorer:
+            inputs = chapters + [manifest, strokes]
+            # 融合默认包含 real 的排名
+            if name in ("real", "fusion"):
+                inputs.append(os.path.join(data_dir, "corpus_frequency.json"))
+            stages.append(Stage(f"report_{name}", [python, "ranking_engine.py", name, "--dry-run", "-q"],
+                                inputs=inputs, outputs=[os.path.join(data_dir, report)],
+                                description=f"{name} 评分器的统计报告"))
+    stages += [
+        Stage("chapter_characters", write_chapter_characters, inputs=chapters + [manifest],
+              outputs=[os.path.join(data_dir, "chapter_characters.json")], description="各章汉字汇总"),
+        Stage("audio_index", [python, "build_audio_index.py"],
+              inputs=chapters + [polyphones, manifest, inventory, single_chars, syllables,
+                                 os.path.join("audio", "index.json")],
+              outputs=[os.path.join("audio", "index")], description="按章节分片的音频索引"),
+        Stage("examples", [python, "mine_example_words.py"],
+              inputs=chapters + [polyphones, manifest, inventory],
+              outputs=[os.path.join(data_dir, "examples")], description="例词分片"),
+        Stage("polyphone_analysis", ["node", "analyze_polyphones.js"],
+              inputs=chapters + [polyphones], outputs=["polyphone_analysis.json"], description="多音字分析"),
+        Stage("polyphone_verification", ["node", "verify_polyphone_data.js"],
+              inputs=[polyphones], outputs=["polyphone_verification.json"], description="多音字数据校验"),
+        Stage("precache", [python, "build_precache_manifest.py"],
+              inputs=chapters + [polyphones, manifest, inventory, os.path.join(data_dir, "pages"),
+                                 os.path.join(data_dir, "examples"), os.path.join("audio", "index"),
+                                 syllables, single_chars,
+                                 os.path.join("audio", "index.json")],
+              outputs=[os.path.join(data_dir, "precache.json")], description="带内容哈希的预缓存清单"),
+    ]
+
+    for i, stage in enumerate(stages):
+        for upstream in stages[:i]:
+            if any(produces(output, path) for output in upstream.outputs for path in stage.inputs):
+                stage.deps.append(upstream.name)
+    return {stage.name: stage for stage in stages}
+
+
+def produces(output, path):
+    return path == output or path.startswith(output.rstrip(os.sep) + os.sep)
+
+
+def select(graph, targets):
+    """目标阶段及其全部上游，保持登记顺序"""
+    if not targets:
+        return list(graph)
+    needed = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in needed:
+            needed.add(name)
+            pending.extend(graph[name].deps)
+    return [name for name in graph if name in needed]
+
+
+def run_stage(stage, verbose=False):
+    """运行一个阶段，返回 (是否成功, 输出)"""
+    if callable(stage.command):
+        try:
+            stage.command()
+            return True, ""
+        except Exception as e:
+            return False, f"{type(e).__name__}: {e}"
+    try:
+        result = subprocess.run(stage.command, capture_output=not verbose, text=True)
+    except OSError as e:
+        return False, str(e)
+    return result.returncode == 0, (result.stdout or "") + (result.stderr or "")
+
+
+def build(graph, names, state, jobs=None, force=(), dry_run=False, verbose=False):
+    """按依赖顺序构建，互不依赖的阶段并行运行；返回 {阶段: 结果}"""
+    results = {}
+    running = {}
+    remaining = list(names)
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        while remaining or running:
+            for name in list(remaining):
+                stage = graph[name]
+                dep_results = [results.get(dep) for dep in stage.deps if dep in names]
+                if any(result is None for result in dep_results):
+                    continue
+                remaining.remove(name)
+                if any(result in ("failed", "blocked") for result in dep_results):
+                    results[name] = "blocked"
+                    continue
+                key = state.stage_key(stage)
+                if name not in force and state.is_current(stage, key):
+                    results[name] = "skipped"
+                elif dry_run:
+                    # 上游不会真正运行，下游按「需要重建」处理
+                    results[name] = "would_run"
+                    force = set(force) | {other for other in names if name in graph[other].deps}
+                else:
+                    log(f"▶ {name}: {stage.description}")
+                    running[pool.submit(run_stage, stage, verbose)] = (name, time.perf_counter())
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, start = running.pop(future)
+                ok, output = future.result()
+                elapsed = time.perf_counter() - start
+                if ok:
+                    results[name] = "built"
+                    log(f"✓ {name} ({elapsed:.1f} 秒)")
+                else:
+                    results[name] = "failed"
+                    warn(f"✗ {name} 失败 ({elapsed:.1f} 秒)")
+                    if output:
+                        warn(output.rstrip())
+
+    if not dry_run:
+        # 按最终的文件内容记录键（见模块说明），失败和未运行的阶段保持原样
+        for name, result in results.items():
+            if result in ("built", "skipped"):
+                state.stages[name] = state.stage_key(graph[name])
+        state.save()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按依赖关系增量构建全部派生数据")
+    parser.add_argument("targets", nargs="*", help="要构建的阶段（默认全部，自动包含上游）")
+    parser.add_argument("--scorer", default="wordfreq", choices=sorted(REPORTS),
+                        help="决定章节排名的评分器")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="并行阶段数（默认 CPU 核数）")
+    parser.add_argument("--force", nargs="*", default=None, help="强制重建的阶段（不带参数时全部重建）")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="只显示需要重建的阶段")
+    parser.add_argument("--list", action="store_true", help="列出各阶段、依赖及状态")
+    parser.add_argument("-v", "--verbose", action="store_true", help="显示各阶段自身的输出")
+    parser.add_argument("--state", default=STATE_FILE, help="构建状态文件")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    graph = build_graph(args.scorer)
+    unknown = [name for name in args.targets + (args.force or []) if name not in graph]
+    if unknown:
+        parser.error(f"未知的阶段: {', '.join(unknown)}（可选: {', '.join(graph)}）")
+    state = BuildState(args.state).load()
+    names = select(graph, args.targets)
+
+    if args.list:
+        for name in names:
+            stage = graph[name]
+            status = "最新" if state.is_current(stage, state.stage_key(stage)) else "需要重建"
+            deps = f" ← {', '.join(stage.deps)}" if stage.deps else ""
+            print(f"{name:<24}{status:<8}{stage.description}{deps}")
+        return
+
+    force = set(names) if args.force == [] else set(args.force or ())
+    start = time.perf_counter()
+    results = build(graph, names, state, args.jobs, force, args.dry_run, args.verbose)
+    elapsed = time.perf_counter() - start
+
+    if args.dry_run:
+        pending = [name for name in names if results.get(name) == "would_run"]
+        print(f"需要重建: {', '.join(pending)}" if pending else "全部是最新的")
+        return
+    counts = {result: sum(1 for r in results.values() if r == result)
+              for result in ("built", "skipped", "failed", "blocked")}
+    print(f"{'✅' if not counts['failed'] else '❌'} 构建完成 ({elapsed:.1f} 秒): 重建 {counts['built']}, "
+          f"跳过 {counts['skipped']}, 失败 {counts['failed']}"
+          + (f", 因上游失败未运行 {counts['blocked']}" if counts["blocked"] else ""))
+    if counts["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
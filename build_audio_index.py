@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+按章节分片的音频索引生成器
+扫描 audio/single_chars/ 和完整索引 audio/index.json，生成：
+    audio/index/manifest.json     总数、单字音频和合并音频的路径模板、各章分片路径、缺少音频的汉字
+    audio/index/chapter_N.json    {"single": "有单字音频的字", "syllables": {"ji6": "二义异…"},
+                                   "multi": {"字|读音编码": 路径}}
+完整索引中的路径优先：dedupe_audio.py 合并后的字指向 audio/syllables/ 下以读音命名的文件，放在 syllables 中。
+读音编码见 jyutping_inventory.py。页面只需加载清单和当前章节的分片，查找音频是一次哈希查询
+"""
+
+import argparse
+import json
+import os
+
+from chapter_pages import is_ranked_chapter, load_manifest
+from chapter_writer import write_files
+from json_backend import load_file
+from jyutping_inventory import update_inventory
+from pipeline_trace import log, warn
+from ranking_engine import DATA_DIR, chapter_file, discover_chapter_count
+
+AUDIO_DIR = "audio"
+LEGACY_INDEX = os.path.join(AUDIO_DIR, "index.json")
+SHARD_DIR = os.path.join(AUDIO_DIR, "index")
+INDEX_VERSION = "2.2"
+SINGLE_PATH = "{audio_dir}/single_chars/{{char}}.mp3"
+SYLLABLE_PATH = "{audio_dir}/syllables/{{file}}.mp3"
+
+
+def multi_key(char, jyutping):
+    return f"{char}|{jyutping}"
+
+
+def scan_audio(audio_dir=AUDIO_DIR):
+    """收集可用的音频：{字: 路径} 和 {"字|粤拼": 路径}"""
+    single = {}
+    single_dir = os.path.join(audio_dir, "single_chars")
+    if os.path.isdir(single_dir):
+        for name in sorted(os.listdir(single_dir)):
+            char, ext = os.path.splitext(name)
+            if ext == ".mp3" and len(char) == 1:
+                single[char] = f"{audio_dir}/single_chars/{name}"
+
+    multi = {}
+    legacy_path = os.path.join(audio_dir, "index.json")
+    if os.path.exists(legacy_path):
+        with open(legacy_path, 'r', encoding='utf-8') as f:
+            legacy = json.load(f)
+        for item in legacy.get("multi_chars", []):
+            if os.path.exists(item["audio_path"]):
+                multi[multi_key(item["char"], item["jyutping"])] = item["audio_path"]
+            else:
+                warn(f"  ⚠️ 多音字音频不存在: {item['audio_path']}")
+        for item in legacy.get("single_chars", []):
+            if os.path.exists(item["audio_path"]):
+                single[item["char"]] = item["audio_path"]
+            elif item["char"] not in single:
+                warn(f"  ⚠️ 旧索引中的音频不存在: {item['audio_path']}")
+    return single, multi
+
+
+def load_chapter(data_dir, chapter):
+    path = chapter_file(data_dir, chapter)
+    if not os.path.exists(path):
+        return None
+    data = load_file(path)
+    return data if isinstance(data, list) else data.get("characters", [])
+
+
+def readings(record):
+    """记录中出现的所有粤拼（主读音和第二读音）"""
+    result = [record.get('jyutping', '')]
+    if record.get('secondary_jyutping'):
+        result.append(record['secondary_jyutping'])
+    return result
+
+
+def syllable_file(path, audio_dir=AUDIO_DIR):
+    """合并音频的文件名（不含扩展名），其他路径返回 None"""
+    prefix = SYLLABLE_PATH.format(audio_dir=audio_dir).split("{file}")[0]
+    if path.startswith(prefix) and path.endswith(".mp3"):
+        return path[len(prefix):-len(".mp3")]
+    return None
+
+
+def build_shard(characters, single, multi, inventory, audio_dir=AUDIO_DIR):
+    """一个章节的分片及其中缺少音频的汉字"""
+    single_chars = []
+    syllables = {}
+    shard = {"single": "", "multi": {}}
+    missing = []
+    for record in characters:
+        char = record['char']
+        found = False
+        for jyutping in readings(record):
+            path = multi.get(multi_key(char, jyutping))
+            if path:
+                shard["multi"][multi_key(char, inventory.encode(jyutping))] = path
+                found = True
+        if char in single:
+            file = syllable_file(single[char], audio_dir)
+            if file is None:
+                single_chars.append(char)
+            else:
+                syllables[file] = syllables.get(file, "") + char
+            found = True
+        if not found:
+            missing.append(char)
+    shard["single"] = "".join(single_chars)
+    if syllables:
+        shard["syllables"] = syllables
+    return shard, missing
+
+
+def build_audio_index(data_dir=DATA_DIR, chapter_count=None, audio_dir=AUDIO_DIR, shard_dir=SHARD_DIR):
+    log("=== 生成分片音频索引 ===")
+    single, multi = scan_audio(audio_dir)
+    log(f"音频文件: 单音字 {len(single)} 个, 多音字 {len(multi)} 个")
+
+    chapter_count = chapter_count or discover_chapter_count(data_dir)
+    # 多音字专栏等特殊章节不计入数据集，但同样需要分片
+    special = [entry['id'] for entry in load_manifest(data_dir) if not is_ranked_chapter(entry)]
+
+    # 非标准路径的单字音频无法用模板表示
+    template = SINGLE_PATH.format(audio_dir=audio_dir)
+    for char, path in single.items():
+        if path != template.format(char=char) and syllable_file(path, audio_dir) is None:
+            raise ValueError(f"单字音频路径与模板不符: {path}")
+
+    loaded = {chapter: load_chapter(data_dir, chapter) for chapter in list(range(1, chapter_count + 1)) + special}
+    loaded = {chapter: characters for chapter, characters in loaded.items() if characters is not None}
+    inventory = update_inventory([c for characters in loaded.values() for c in characters], data_dir)
+
+    files = []
+    chapters = {}
+    missing = []
+    dataset_size = 0
+    for chapter, characters in loaded.items():
+        shard, chapter_missing = build_shard(characters, single, multi, inventory, audio_dir)
+        shard_path = os.path.join(shard_dir, f"chapter_{chapter}.json")
+        files.append((shard_path, shard))
+        chapters[str(chapter)] = {
+            "file": shard_path.replace(os.sep, "/"),
+            "count": len(shard["single"]) + sum(map(len, shard.get("syllables", {}).values())) + len(shard["multi"]),
+        }
+        if chapter not in special:
+            dataset_size += len(characters)
+            missing.extend(chapter_missing)
+        log(f"  第{chapter}章: {len(characters)} 个汉字, {chapters[str(chapter)]['count']} 条音频, "
+              f"缺少 {len(chapter_missing)} 个")
+
+    manifest = {
+        "version": INDEX_VERSION,
+        "total_count": len(single) + len(multi),
+        "single_chars_count": len(single),
+        "multi_chars_count": len(multi),
+        "single_path": template,
+        "syllable_path": SYLLABLE_PATH.format(audio_dir=audio_dir),
+        "chapters": chapters,
+        "missing": missing,
+    }
+    os.makedirs(shard_dir, exist_ok=True)
+    files.append((os.path.join(shard_dir, "manifest.json"), manifest))
+    write_files(files, minify=True)
+
+    log(f"\n✅ 已写入 {len(files) - 1} 个分片和 {shard_dir}/manifest.json")
+    log(f"数据集 {dataset_size} 个汉字中有 {len(missing)} 个没有音频:")
+    for start in range(0, len(missing), 40):
+        log(f"  {''.join(missing[start:start + 40])}")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成按章节分片的音频索引")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="章节数据目录")
+    parser.add_argument("--chapters", type=int, default=None, help="章节数量（默认沿用 chapters.json）")
+    parser.add_argument("--audio-dir", default=AUDIO_DIR, help="音频目录")
+    args = parser.parse_args()
+
+    build_audio_index(args.data_dir, args.chapters, args.audio_dir, os.path.join(args.audio_dir, "index"))
+
+
+if __name__ == "__main__":
+    main()
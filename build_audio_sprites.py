@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+按章节打包音频精灵（sprite）
+按音频索引分片（build_audio_index.py）列出每章页面会请求的音频文件，同一文件只收一次，
+在帧边界处依次拼接，去掉各文件的 ID3 标签和编码器信息帧，生成：
+    audio/sprites/chapter_N.mp3    拼接后的音频帧
+    audio/sprites/chapter_N.json   {"file": ..., "hash": ..., "bytes": ..., "clips": {音频路径: [字节偏移, 字节数, 毫秒]}}
+    audio/sprites/manifest.json    {"version": 1, "chapters": {"N": {"file": 偏移表路径, "hash": ..., "clips": 段数}}}
+每段都从独立编码的第一帧开始，页面按字节截取即可得到一个可直接播放的 MP3。
+
+精灵由部署流程（.github/workflows/deploy.yml）在上传前生成，不提交到仓库；
+页面在某章第一次发音时才读取清单和该章的偏移表与精灵，下载完成前仍播放单独的文件。
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+
+from chapter_writer import write_files
+from json_backend import load_file
+from mp3_frames import audio_frames
+from pipeline_trace import log, warn
+
+AUDIO_DIR = "audio"
+FORMAT_VERSION = 1
+
+
+def content_hash(payload):
+    """与预缓存清单相同的内容哈希（sha256 前 16 位），页面用作 ?v= 版本号"""
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def chapter_paths(shard, manifest):
+    """一章页面可能请求的音频路径，按分片中的顺序（即排名顺序）去重"""
+    paths = []
+    for char in shard.get("single", ""):
+        paths.append(manifest["single_path"].replace("{char}", char))
+    for file in shard.get("syllables", {}):
+        paths.append(manifest["syllable_path"].replace("{file}", file))
+    paths.extend(shard.get("multi", {}).values())
+    return list(dict.fromkeys(paths))
+
+
+def build_sprite(paths):
+    """返回 (拼接后的字节, 偏移表, 未打包的路径)"""
+    sprite = bytearray()
+    clips = {}
+    skipped = []
+    stream_format = None
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            skipped.append(path)
+            continue
+        frames = audio_frames(data)
+        # 采样率、声道不同的片段无法放进同一个流，仍使用单独文件
+        if not frames or (stream_format and frames[0][1].stream_format != stream_format):
+            skipped.append(path)
+            continue
+        stream_format = frames[0][1].stream_format
+
+        start = frames[0][0]
+        end = frames[-1][0] + frames[-1][1].length
+        duration = sum(header.duration for _, header in frames)
+        clips[path] = [len(sprite), end - start, round(duration * 1000)]
+        sprite += data[start:end]
+    return bytes(sprite), clips, skipped
+
+
+def write_sprite(path, payload):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".tmp-", suffix=os.path.basename(path))
+    with os.fdopen(fd, 'wb') as f:
+        f.write(payload)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+
+def build_audio_sprites(audio_dir=AUDIO_DIR, chapters=None):
+    log("=== 生成章节音频精灵 ===")
+    manifest = load_file(os.path.join(audio_dir, "index", "manifest.json"))
+    sprite_dir = os.path.join(audio_dir, "sprites")
+    os.makedirs(sprite_dir, exist_ok=True)
+
+    tables = []
+    listing = {}
+    log(f"{'章节':>4} {'汉字':>5} {'请求数(前→后)':>14} {'原文件总大小':>12} {'精灵大小':>10}")
+    for chapter, entry in manifest["chapters"].items():
+        if chapters and int(chapter) not in chapters:
+            continue
+        paths = chapter_paths(load_file(entry["file"]), manifest)
+        sprite, clips, skipped = build_sprite(paths)
+        if not clips:
+            continue
+
+        sprite_path = f"{audio_dir}/sprites/chapter_{chapter}.mp3"
+        write_sprite(sprite_path, sprite)
+        table = {"file": sprite_path, "hash": content_hash(sprite), "bytes": len(sprite), "clips": clips}
+        table_path = f"{audio_dir}/sprites/chapter_{chapter}.json"
+        tables.append((table_path, table))
+        listing[chapter] = {
+            "file": table_path,
+            "hash": content_hash(json.dumps(table, sort_keys=True).encode('utf-8')),
+            "clips": len(clips),
+        }
+
+        # 之前整章每个音频文件各请求一次；现在每章一个偏移表加一个精灵文件（未打包的仍单独请求）
+        original = sum(os.path.getsize(path) for path in clips)
+        log(f"{chapter:>4} {entry['count']:>5} {len(paths):>8} → {2 + len(skipped)} "
+            f"{original / 1024:>10.1f} KB {len(sprite) / 1024:>7.1f} KB")
+        if skipped:
+            warn(f"  ⚠️ 第{chapter}章有 {len(skipped)} 个文件格式不一致或无法读取，未打包: {', '.join(skipped[:10])}")
+
+    tables.append((os.path.join(sprite_dir, "manifest.json"), {"version": FORMAT_VERSION, "chapters": listing}))
+    write_files(tables, minify=True)
+    log(f"\n✅ 已写入 {len(listing)} 个精灵到 {sprite_dir}/")
+    return listing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按章节拼接音频并生成偏移表")
+    parser.add_argument("--audio-dir", default=AUDIO_DIR, help="音频目录")
+    parser.add_argument("--only", type=int, nargs="+", help="只生成指定章节")
+    args = parser.parse_args()
+
+    build_audio_sprites(args.audio_dir, args.only)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+从本地语料统计字频
+把大文本文件（UTF-8，可达数 GB）用 mmap 按块切分（块边界对齐到完整的 UTF-8 字符），
+在进程池中逐块统计汉字出现次数，再合并各块的计数，生成：
+    data/corpus_frequency.json   {"version", "sources", "total", "chars": "的一是…", "counts": [...]}
+chars 按次数从高到低排列，与 counts 逐位对应；RealFrequencySorter 读取一次即可使用。
+
+统计过程中定期把已完成的块和累计计数写到 .cache/corpus_frequency/checkpoint.json，
+中断后重新运行同样的命令会跳过已完成的块（源文件大小或修改时间变化的块会重新统计）。
+
+    python build_corpus_frequency.py 语料目录/ 另一个文件.txt
+    python build_corpus_frequency.py 语料目录/ --workers 8 --chunk-mb 32
+"""
+
+import argparse
+import collections
+import json
+import mmap
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pipeline_trace import log, warn
+
+TABLE_VERSION = 1
+TABLE_FILE = os.path.join("data", "corpus_frequency.json")
+CHECKPOINT_FILE = os.path.join(".cache", "corpus_frequency", "checkpoint.json")
+CHUNK_SIZE = 64 * 2 ** 20
+TEXT_SUFFIXES = (".txt", ".text", ".md", ".csv", ".tsv", ".jsonl")
+
+# 统一表意文字及扩展区（与 vectorized_scoring.synthetic_characters 使用的区块一致，另加兼容表意文字）
+CJK_RANGES = (
+    (0x3400, 0x4DBF),
+    (0x4E00, 0x9FFF),
+    (0xF900, 0xFAFF),
+    (0x20000, 0x2A6DF),
+    (0x2A700, 0x2EBE0),
+    (0x30000, 0x3134A),
+)
+
+
+def is_cjk(char):
+    code_point = ord(char)
+    return any(start <= code_point <= end for start, end in CJK_RANGES)
+
+
+def collect_sources(paths):
+    """展开目录，返回去重后的文件列表"""
+    sources = []
+    seen = set()
+    for path in paths:
+        if os.path.isdir(path):
+            candidates = [os.path.join(root, name)
+                          for root, _, names in sorted(os.walk(path))
+                          for name in sorted(names) if name.lower().endswith(TEXT_SUFFIXES)]
+        else:
+            candidates = [path]
+        for candidate in candidates:
+            real = os.path.realpath(candidate)
+            if real not in seen and os.path.getsize(real) > 0:
+                seen.add(real)
+                sources.append(real)
+    return sources
+
+
+def source_key(path):
+    stat = os.stat(path)
+    return f"{path}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+def plan_chunks(path, chunk_size=CHUNK_SIZE):
+    """把文件切成 [(起点, 长度)]；边界向后移到下一个 UTF-8 首字节"""
+    size = os.path.getsize(path)
+    chunks = []
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            end = min(start + chunk_size, size)
+            while end < size and mm[end] & 0xC0 == 0x80:
+                end += 1
+            chunks.append((start, end - start))
+            start = end
+    return chunks
+
+
+def count_text(text):
+    """{汉字: 次数}；有 numpy 时按码位 bincount（约快 10 倍），否则用 Counter"""
+    try:
+        import numpy as np
+    except ImportError:
+        return {char: n for char, n in collections.Counter(text).items() if is_cjk(char)}
+
+    code_points = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    mask = np.zeros(code_points.shape, dtype=bool)
+    for start, end in CJK_RANGES:
+        mask |= (code_points >= start) & (code_points <= end)
+    counts = np.bincount(code_points[mask])
+    found = np.nonzero(counts)[0]
+    return dict(zip(map(chr, found.tolist()), counts[found].tolist()))
+
+
+def count_chunk(path, start, length):
+    """统计一个块中各汉字的出现次数（在工作进程中运行）"""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        text = mm[start:start + length].decode('utf-8', errors='ignore')
+    return count_text(text)
+
+
+class Checkpoint:
+    """已完成的块和累计计数（原子写入）"""
+
+    def __init__(self, path=CHECKPOINT_FILE):
+        self.path = path
+        self.done = set()
+        self.counts = collections.Counter()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return self
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            warn(f"读取检查点失败，重新统计: {e}")
+            return self
+        if data.get("version") != TABLE_VERSION:
+            return self
+        self.done = set(data.get("done", []))
+        self.counts = collections.Counter(dict(zip(data.get("chars", ""), data.get("counts", []))))
+        return self
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        chars = "".join(self.counts)
+        data = {
+            "version": TABLE_VERSION,
+            "done": sorted(self.done),
+            "chars": chars,
+            "counts": [self.counts[c] for c in chars],
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.done = set()
+        self.counts = collections.Counter()
+
+
+def build_frequency_table(paths, output=TABLE_FILE, workers=None, chunk_size=CHUNK_SIZE,
+                          checkpoint_path=CHECKPOINT_FILE, checkpoint_every=30.0, restart=False):
+    sources = collect_sources(paths)
+    if not sources:
+        raise ValueError("没有找到语料文件")
+
+    checkpoint = Checkpoint(checkpoint_path)
+    if restart:
+        checkpoint.clear()
+    else:
+        checkpoint.load()
+
+    planned = [(f"{source_key(path)}|{start}", path, start, length)
+               for path in sources for start, length in plan_chunks(path, chunk_size)]
+    # 检查点里有不属于本次语料的块（文件被修改或没有列出）时，其计数无法单独扣除，只能重新统计
+    if checkpoint.done - {chunk_key for chunk_key, _, _, _ in planned}:
+        warn("检查点与当前语料不一致，重新统计全部语料")
+        checkpoint.clear()
+
+    tasks = [task for task in planned if task[0] not in checkpoint.done]
+    total_bytes = sum(length for _, _, _, length in tasks)
+    skipped = len(planned) - len(tasks)
+    log(f"语料: {len(sources)} 个文件, 待统计 {len(tasks)} 块 ({total_bytes / 2 ** 20:.1f} MB)"
+        + (f", 检查点中已完成 {skipped} 块" if skipped else ""))
+
+    start_time = time.perf_counter()
+    last_save = time.monotonic()
+    processed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(count_chunk, path, start, length): (chunk_key, length)
+                   for chunk_key, path, start, length in tasks}
+        for future in as_completed(futures):
+            chunk_key, length = futures[future]
+            checkpoint.counts.update(future.result())
+            checkpoint.done.add(chunk_key)
+            processed += length
+            if time.monotonic() - last_save >= checkpoint_every:
+                checkpoint.save()
+                last_save = time.monotonic()
+                log(f"  {processed / 2 ** 20:.0f}/{total_bytes / 2 ** 20:.0f} MB")
+    checkpoint.save()
+    elapsed = time.perf_counter() - start_time
+
+    ranked = sorted(checkpoint.counts.items(), key=lambda item: (-item[1], item[0]))
+    table = {
+        "version": TABLE_VERSION,
+        "built": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "sources": [{"path": path, "bytes": os.path.getsize(path)} for path in sources],
+        "total": sum(checkpoint.counts.values()),
+        "chars": "".join(char for char, _ in ranked),
+        "counts": [n for _, n in ranked],
+    }
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    tmp_path = output + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(table, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, output)
+
+    if elapsed > 0 and processed:
+        log(f"统计完成: {processed / 2 ** 20:.1f} MB, {elapsed:.2f} 秒 ({processed / 2 ** 20 / elapsed:.1f} MB/s)")
+    return table
+
+
+def load_frequency_table(path=TABLE_FILE):
+    """读取字频表，返回 {字: 次数}；文件不存在或版本不符时返回 None"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        table = json.load(f)
+    if table.get("version") != TABLE_VERSION:
+        warn(f"字频表版本 {table.get('version')} 与当前版本 {TABLE_VERSION} 不符，忽略: {path}")
+        return None
+    return dict(zip(table["chars"], table["counts"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="从本地语料统计字频表")
+    parser.add_argument("paths", nargs="+", help="语料文件或目录（UTF-8 文本）")
+    parser.add_argument("-o", "--output", default=TABLE_FILE, help="输出的字频表")
+    parser.add_argument("--workers", type=int, default=None, help="进程数（默认 CPU 核数）")
+    parser.add_argument("--chunk-mb", type=float, default=CHUNK_SIZE / 2 ** 20, help="每块大小（MB）")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE, help="检查点文件")
+    parser.add_argument("--checkpoint-every", type=float, default=30.0, help="保存检查点的间隔（秒）")
+    parser.add_argument("--restart", action="store_true", help="忽略已有检查点，从头统计")
+    args = parser.parse_args()
+
+    table = build_frequency_table(args.paths, args.output, args.workers, int(args.chunk_mb * 2 ** 20),
+                                  args.checkpoint, args.checkpoint_every, args.restart)
+    print(f"✅ 已写入 {args.output}: {len(table['chars'])} 个不同汉字, 共 {table['total']} 次")
+    print(f"前20个: {table['chars'][:20]}")
+
+
+if __name__ == "__main__":
+    main()
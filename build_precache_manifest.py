@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+预缓存清单
+列出页面会请求的全部数据和音频文件，写成 data/precache.json：
+    {"version": 1, "total_bytes": 总字节数, "fields": ["url", "hash", "bytes", "rank", "chapters"],
+     "assets": [["audio/syllables/si6.mp3", "3f2a…", 5433, 3, [1, 11]], ...]}
+每个文件一行紧凑数组：路径、内容哈希（SHA-256 前 16 位）、字节数、用到它的字中最好的 frequency_rank、所属章节。
+按 rank 排列：各章共用的文件（章节清单、粤拼音节表、音频索引清单）为 0 排在最前，
+章节文件、分页、例词和音频索引分片取该章（页）最常用的字的排名，单个音频取读这个音的字中最常用的。
+Service Worker 或 DataManager 可以只预缓存前 N 个文件，并按哈希判断哪些文件需要重新下载；
+DataManager 在请求时附加 ?v=<哈希>，重新排序或重建后旧的缓存自然失效。
+
+文件哈希按 (路径, 大小, 修改时间) 缓存在 .cache/precache_hashes.json，
+并借用构建状态（.cache/build/state.json）和音频元数据缓存中已算好的哈希，只对改动过的文件重新计算。
+audio/index.json 只在分片索引缺失时作为后备加载，不列入清单。
+不部署的文件（被 .gitignore 忽略的构建产物、Pages 工作流部署前删除的目录）不列入清单，否则页面会请求不存在的地址。
+"""
+
+import argparse
+import hashlib
+import os
+import subprocess
+
+from build import STATE_FILE
+from build_audio_index import SHARD_DIR
+from chapter_writer import write_files
+from json_backend import dump_file, load_file, load_files
+from pipeline_trace import log, warn
+from ranking_engine import DATA_DIR, chapter_file, discover_chapter_count
+from scan_audio_metadata import CACHE_FILE as AUDIO_CACHE_FILE, INDEX_FILE as AUDIO_INDEX_FILE, index_entries
+
+PRECACHE_FILE = os.path.join(DATA_DIR, "precache.json")
+CACHE_FILE = os.path.join(".cache", "precache_hashes.json")
+CACHE_VERSION = 1
+MANIFEST_VERSION = 1
+HASH_LENGTH = 16
+FIELDS = ["url", "hash", "bytes", "rank", "chapters"]
+# Pages 工作流上传前删除的目录（见 .github/workflows/deploy.yml）
+UNDEPLOYED_DIRS = ("audio/single_chars/",)
+
+
+class HashCache:
+    """{路径: [大小, 修改时间, SHA-256]}；自己没有记录时查构建状态和音频元数据缓存"""
+
+    def __init__(self, path=CACHE_FILE, build_state=STATE_FILE, audio_cache=AUDIO_CACHE_FILE):
+        self.path = path
+        self.entries = {}
+        self.borrowed = {}
+        self.used = set()
+        self.hits = 0
+        self.computed = 0
+        self.sources = (build_state, audio_cache)
+
+    def load(self):
+        data = self._read(self.path)
+        if data.get("version") == CACHE_VERSION:
+            self.entries = data.get("entries", {})
+        build_state, audio_cache = self.sources
+        # 两者的条目都是 [大小, 修改时间, ...]：构建状态直接存哈希，音频元数据缓存存整条元数据
+        self.borrowed.update(self._read(build_state).get("hashes", {}))
+        for path, (size, mtime, metadata) in self._read(audio_cache).get("entries", {}).items():
+            if "sha256" in metadata:
+                self.borrowed.setdefault(path, [size, mtime, metadata["sha256"]])
+        return self
+
+    @staticmethod
+    def _read(path):
+        if not os.path.exists(path):
+            return {}
+        try:
+            return load_file(path, cache=False)
+        except (OSError, ValueError) as e:
+            warn(f"读取哈希缓存失败，忽略: {path}: {e}")
+            return {}
+
+    def save(self):
+        # 只保留本次用到的文件，删除已不存在的
+        entries = {path: entry for path, entry in self.entries.items() if path in self.used}
+        dump_file(self.path, {"version": CACHE_VERSION, "entries": entries}, minify=True)
+
+    def digest(self, path):
+        stat = os.stat(path)
+        self.used.add(path)
+        for entries in (self.entries, self.borrowed):
+            entry = entries.get(path)
+            if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+                self.hits += 1
+                self.entries[path] = entry
+                return entry[2]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(2 ** 20), b""):
+                digest.update(block)
+        self.computed += 1
+        self.entries[path] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+
+def url_of(path):
+    return path.replace(os.sep, "/")
+
+
+def ignored_paths(paths):
+    """被 .gitignore 忽略的路径（不在仓库中，也就不会部署）；不在 git 仓库中时不过滤"""
+    paths = list(paths)
+    try:
+        result = subprocess.run(["git", "check-ignore", "--stdin", "-z"], input="\0".join(paths).encode("utf-8"),
+                                capture_output=True, check=False)
+    except OSError as e:
+        warn(f"无法运行 git，不检查 .gitignore: {e}")
+        return set()
+    # 退出码 0：有被忽略的路径，1：没有
+    if result.returncode not in (0, 1):
+        warn(f"git check-ignore 失败，不检查 .gitignore: {result.stderr.decode('utf-8', 'replace').strip()}")
+        return set()
+    return {path for path in result.stdout.decode("utf-8").split("\0") if path}
+
+
+def deployed_assets(assets):
+    """去掉不会部署的文件，返回 (保留的, 去掉的路径)"""
+    skipped = {url for url in assets if url.startswith(UNDEPLOYED_DIRS)}
+    skipped |= ignored_paths(url for url in assets if url not in skipped)
+    return {url: entry for url, entry in assets.items() if url not in skipped}, sorted(skipped)
+
+
+def chapter_characters(data_dir=DATA_DIR):
+    """{章节: 该章的汉字记录}（包括多音字专栏）"""
+    chapters = list(range(1, discover_chapter_count(data_dir) + 1))
+    if os.path.exists(chapter_file(data_dir, 11)):
+        chapters.append(11)
+    loaded = load_files(chapter_file(data_dir, chapter) for chapter in chapters)
+    result = {}
+    for chapter, (path, characters, error) in zip(chapters, loaded):
+        if error is not None:
+            raise error
+        result[chapter] = characters if isinstance(characters, list) else characters.get('characters', [])
+    return result
+
+
+def collect_assets(data_dir=DATA_DIR, audio_index_file=AUDIO_INDEX_FILE):
+    """{路径: [排名, 章节集合]}；排名为 0 的是各章共用的文件"""
+    assets = {}
+
+    def add(path, rank, chapters=()):
+        if not os.path.exists(path):
+            return
+        entry = assets.setdefault(url_of(path), [rank, set()])
+        entry[0] = min(entry[0], rank)
+        entry[1].update(chapters)
+
+    for path in (os.path.join(data_dir, "chapters.json"), os.path.join(data_dir, "jyutping_inventory.json"),
+                 os.path.join(SHARD_DIR, "manifest.json")):
+        add(path, 0)
+
+    characters = chapter_characters(data_dir)
+    char_rank = {}
+    char_chapters = {}
+    for chapter, records in characters.items():
+        ranks = [record['frequency_rank'] for record in records if 'frequency_rank' in record]
+        best = min(ranks, default=len(char_rank) + 1)
+        for path in (chapter_file(data_dir, chapter),
+                     os.path.join(data_dir, "examples", f"chapter_{chapter}.json"),
+                     os.path.join(SHARD_DIR, f"chapter_{chapter}.json")):
+            add(path, best, (chapter,))
+        for record in records:
+            char = record['char']
+            char_rank[char] = min(char_rank.get(char, best), record.get('frequency_rank', best))
+            char_chapters.setdefault(char, set()).add(chapter)
+
+    manifest = load_file(os.path.join(data_dir, "chapters.json")) if os.path.exists(
+        os.path.join(data_dir, "chapters.json")) else []
+    pages = [(entry['id'], page['file']) for entry in manifest for page in entry.get('pages', [])]
+    # 分页的排名取页内第一个字（每行为 [字, 读音, 排名, ...]，已按排名排列）
+    for (chapter, path), (_, rows, error) in zip(pages, load_files(path for _, path in pages)):
+        if error is not None:
+            warn(f"  ⚠️ 分页读取失败: {path}: {error}")
+            continue
+        add(path, rows[0][2] if rows else 0, (chapter,))
+
+    if os.path.exists(audio_index_file):
+        index = load_file(audio_index_file)
+        for entry in index_entries(index):
+            char = entry['char']
+            if char in char_rank:
+                add(entry['audio_path'], char_rank[char], char_chapters[char])
+    return assets
+
+
+def build_precache_manifest(data_dir=DATA_DIR, output=PRECACHE_FILE, cache_file=CACHE_FILE):
+    assets, skipped = deployed_assets(collect_assets(data_dir))
+    if skipped:
+        warn(f"  ⚠️ {len(skipped)} 个文件不会部署，不列入清单: {', '.join(skipped[:5])}{' …' if len(skipped) > 5 else ''}")
+    cache = HashCache(cache_file).load()
+    rows = []
+    for url, (rank, chapters) in sorted(assets.items(), key=lambda item: (item[1][0], item[0])):
+        rows.append([url, cache.digest(url)[:HASH_LENGTH], os.path.getsize(url), rank, sorted(chapters)])
+    cache.save()
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "total_bytes": sum(row[2] for row in rows),
+        "fields": FIELDS,
+        "assets": rows,
+    }
+    write_files([(output, manifest)], minify=True)
+    log(f"预缓存清单: {len(rows)} 个文件, 哈希缓存命中 {cache.hits} 个, 重新计算 {cache.computed} 个")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成带内容哈希、大小和所属章节的预缓存清单")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="章节数据目录")
+    parser.add_argument("--output", default=PRECACHE_FILE, help="清单文件")
+    parser.add_argument("--top", type=int, default=0, help="显示预缓存前 N 个文件所需的字节数")
+    args = parser.parse_args()
+
+    manifest = build_precache_manifest(args.data_dir, output=args.output)
+    rows = manifest["assets"]
+    print(f"✅ 已写入 {args.output}: {len(rows)} 个文件, 共 {manifest['total_bytes'] / 2 ** 20:.1f} MB")
+    chapter_bytes = {}
+    for _, _, size, _, chapters in rows:
+        for chapter in chapters:
+            chapter_bytes[chapter] = chapter_bytes.get(chapter, 0) + size
+    print("各章: " + ", ".join(f"{chapter} {size / 2 ** 20:.1f} MB" for chapter, size in sorted(chapter_bytes.items())))
+    if args.top:
+        top = rows[:args.top]
+        print(f"前 {len(top)} 个文件（排名 ≤ {top[-1][3] if top else 0}）: {sum(row[2] for row in top) / 2 ** 20:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
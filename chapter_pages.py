@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+章节分页
+把每章按固定字数（并可限制每页字节数）切成小页，页面先加载第 1 页即可显示，
+其余各页随后陆续加载：
+    data/pages/chapter_N/page_K.json   一页汉字，每字一行紧凑数组（见 jyutping_inventory.encode_record）
+    data/chapters.json                  每章附带 "pages": [{"file", "count"}]
+"""
+
+import argparse
+import json
+import os
+
+from jyutping_inventory import update_inventory
+
+PAGES_DIR = "pages"
+PAGE_SIZE = 100
+MANIFEST_FILE = "chapters.json"
+
+
+def page_file(data_dir, chapter, page):
+    return os.path.join(data_dir, PAGES_DIR, f"chapter_{chapter}", f"page_{page}.json")
+
+
+def record_bytes(record):
+    return len(json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+def paginate(rows, page_size=PAGE_SIZE, max_bytes=None):
+    """按字数和字节数上限分页（每页至少一个字）"""
+    pages = []
+    current = []
+    size = 2  # 方括号
+    for record in rows:
+        record_size = record_bytes(record) + (1 if current else 0)
+        full = len(current) >= page_size or (max_bytes and size + record_size > max_bytes)
+        if current and full:
+            pages.append(current)
+            current = []
+            size = 2
+            record_size -= 1
+        current.append(record)
+        size += record_size
+    if current:
+        pages.append(current)
+    return pages
+
+
+def is_ranked_chapter(entry):
+    """按排名划分的普通章节（多音字专栏等特殊章节标题不同）"""
+    return entry.get('title') == f"第 {entry.get('id')} 章"
+
+
+def load_manifest(data_dir):
+    path = os.path.join(data_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build_pages(chapters, data_dir, page_size=PAGE_SIZE, max_bytes=None):
+    """生成分页文件与新的章节清单
+
+    chapters 为按章节顺序的汉字列表。返回 (页文件 [(路径, 数据)], 章节清单, 需要删除的旧页文件)。
+    清单中的特殊章节（如多音字专栏）原样保留。
+    """
+    inventory = update_inventory([c for chapter_chars in chapters for c in chapter_chars], data_dir)
+    files = []
+    entries = []
+    for chapter, chapter_chars in enumerate(chapters, 1):
+        pages = paginate([inventory.encode_record(c) for c in chapter_chars], page_size, max_bytes)
+        page_entries = []
+        for page, page_chars in enumerate(pages, 1):
+            path = page_file(data_dir, chapter, page)
+            files.append((path, page_chars))
+            page_entries.append({"file": path.replace(os.sep, "/"), "count": len(page_chars)})
+        entries.append({
+            "id": chapter,
+            "title": f"第 {chapter} 章",
+            "start_rank": chapter_chars[0].get('frequency_rank', 0) if chapter_chars else 0,
+            "end_rank": chapter_chars[-1].get('frequency_rank', 0) if chapter_chars else 0,
+            "char_count": len(chapter_chars),
+            "pages": page_entries,
+        })
+
+    special = [entry for entry in load_manifest(data_dir) if not is_ranked_chapter(entry)]
+    for entry in special:
+        if entry.get('id', 0) <= len(chapters):
+            raise ValueError(f"章节数量 {len(chapters)} 与特殊章节「{entry.get('title')}」的编号 {entry['id']} 冲突")
+    manifest = entries + special
+
+    keep = {os.path.normpath(path) for path, _ in files}
+    stale = []
+    pages_root = os.path.join(data_dir, PAGES_DIR)
+    if os.path.isdir(pages_root):
+        for root, _, names in os.walk(pages_root):
+            stale.extend(os.path.join(root, name) for name in names
+                         if name.endswith(".json") and os.path.normpath(os.path.join(root, name)) not in keep)
+    return files, manifest, stale
+
+
+def remove_stale_pages(paths, data_dir):
+    for path in paths:
+        os.remove(path)
+    pages_root = os.path.join(data_dir, PAGES_DIR)
+    if os.path.isdir(pages_root):
+        for root, _, _ in os.walk(pages_root, topdown=False):
+            if root != pages_root and not os.listdir(root):
+                os.rmdir(root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按现有章节文件重新生成分页和 chapters.json")
+    parser.add_argument("--data-dir", default="data", help="章节数据目录")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="每页字数")
+    parser.add_argument("--page-kb", type=float, default=None, help="每页最大 KB（不缩进的 JSON）")
+    args = parser.parse_args()
+
+    from chapter_writer import ChapterWriteLock, write_files
+    from ranking_engine import chapter_file, discover_chapter_count
+
+    chapter_count = discover_chapter_count(args.data_dir)
+    chapters = []
+    for chapter in range(1, chapter_count + 1):
+        with open(chapter_file(args.data_dir, chapter), 'r', encoding='utf-8') as f:
+            chapters.append(json.load(f))
+
+    max_bytes = int(args.page_kb * 1024) if args.page_kb else None
+    files, manifest, stale = build_pages(chapters, args.data_dir, args.page_size, max_bytes)
+    with ChapterWriteLock(args.data_dir):
+        write_files(files, minify=True)
+        write_files([(os.path.join(args.data_dir, MANIFEST_FILE), manifest)])
+        remove_stale_pages(stale, args.data_dir)
+
+    for entry in manifest:
+        if "pages" in entry:
+            first = os.path.getsize(entry["pages"][0]["file"]) if entry["pages"] else 0
+            print(f"  第{entry['id']}章: {entry['char_count']} 个汉字, {len(entry['pages'])} 页, "
+                  f"第 1 页 {first / 1024:.1f} KB")
+    print(f"✅ 已写入 {len(files)} 个分页文件和 {MANIFEST_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+章节文件写入器
+在线程池中序列化并压缩所有章节，先写临时文件，全部成功后再逐个原子替换；
+写入期间持有数据目录锁，避免两个排序进程互相覆盖
+"""
+
+import gzip
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pipeline_trace import count, log, warn
+
+LOCK_FILE = ".chapters.lock"
+COMPRESSIONS = ("gz", "br")
+
+
+class ChapterWriteLock:
+    """数据目录写锁（O_EXCL 创建锁文件，记录持有进程的 PID）"""
+
+    def __init__(self, data_dir, timeout=30.0):
+        self.path = os.path.join(data_dir, LOCK_FILE)
+        self.timeout = timeout
+        self.depth = 0
+
+    def _holder_alive(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                pid = int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return True
+        if pid <= 0:
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def acquire(self):
+        if self.depth:
+            self.depth += 1
+            return
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not self._holder_alive():
+                    log(f"清理失效的写锁: {self.path}")
+                    os.remove(self.path)
+                    continue
+                if time.monotonic() >= deadline:
+                    raise RuntimeError(f"另一个排序进程正在写入章节文件（锁: {self.path}）")
+                time.sleep(0.2)
+                continue
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(str(os.getpid()))
+            self.depth = 1
+            return
+
+    def release(self):
+        self.depth -= 1
+        if self.depth == 0 and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+def serialize(data, minify=False):
+    """序列化为 UTF-8 字节；minify 时去掉缩进和空白（Record 等映射按 dict 写出）"""
+    if minify:
+        text = json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=dict)
+    else:
+        text = json.dumps(data, ensure_ascii=False, indent=2, default=dict)
+    return text.encode('utf-8')
+
+
+def compress(payload, kind):
+    """生成预压缩内容；kind 为 'gz' 或 'br'（br 需要安装 brotli）"""
+    if kind == "gz":
+        return gzip.compress(payload, compresslevel=9, mtime=0)
+    if kind == "br":
+        import brotli
+        return brotli.compress(payload, quality=11)
+    raise ValueError(f"不支持的压缩格式: {kind}")
+
+
+def available_compressions(kinds):
+    """过滤掉当前环境无法生成的压缩格式"""
+    result = []
+    for kind in kinds:
+        if kind == "br":
+            try:
+                import brotli  # noqa: F401
+            except ImportError:
+                warn("未安装 brotli，跳过 .br 预压缩文件")
+                continue
+        result.append(kind)
+    return result
+
+
+def _write_temp(path, payload):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".tmp-", suffix=os.path.basename(path))
+    with os.fdopen(fd, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.chmod(tmp_path, 0o644)
+    return tmp_path
+
+
+def _remove_temps(staged):
+    for _, tmp_path, _ in staged:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _prepare(path, data, minify, compressions):
+    """在工作线程中完成序列化、压缩并写入临时文件"""
+    staged = []
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        payload = serialize(data, minify)
+        staged.append((path, _write_temp(path, payload), len(payload)))
+        for kind in compressions:
+            packed = compress(payload, kind)
+            staged.append((f"{path}.{kind}", _write_temp(f"{path}.{kind}", packed), len(packed)))
+    except BaseException:
+        _remove_temps(staged)
+        raise
+    return staged
+
+
+def write_files(files, minify=False, compressions=(), workers=None):
+    """并行写入多个 JSON 文件
+
+    files 为 [(路径, 数据), ...]。所有文件都成功写成临时文件后才依次 os.replace，
+    中途失败时清理临时文件，原有文件保持不变。返回 [(路径, 字节数), ...]。
+    """
+    compressions = available_compressions(compressions)
+    workers = workers or min(len(files), os.cpu_count() or 1) or 1
+
+    staged = []
+    error = None
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_prepare, path, data, minify, compressions) for path, data in files]
+        for future in futures:
+            try:
+                staged.extend(future.result())
+            except Exception as e:
+                error = error or e
+    if error is not None:
+        _remove_temps(staged)
+        raise error
+
+    written = []
+    for path, tmp_path, size in staged:
+        os.replace(tmp_path, path)
+        written.append((path, size))
+    count("files_written", len(written))
+    count("bytes_written", sum(size for _, size in written))
+
+    # 没有重新生成的旧预压缩文件会与新内容不一致，直接删除
+    for path, _ in files:
+        for kind in COMPRESSIONS:
+            sibling = f"{path}.{kind}"
+            if kind not in compressions and os.path.exists(sibling):
+                os.remove(sibling)
+    return written
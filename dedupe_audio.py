@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+按内容哈希合并重复音频
+很多同音字的单字录音是同一个文件（如「二义异易…」都是 ji6），逐字保存需要部署约 39 MB。
+本脚本按 SHA-256（见 scan_audio_metadata.py 的缓存）和粤拼分组，把音频合并成以读音命名的文件：
+    audio/syllables/ji6.mp3        该读音最常用的录音
+    audio/syllables/ji6-2.mp3      同一读音的其他录音（--homophones 时不保留）
+并把 audio/index.json 中各条目的 audio_path 改为合并后的文件（原路径记在 source_path，再次运行仍从原文件读取）。
+页面只使用合并后的文件，Pages 工作流部署前删除 audio/single_chars/。
+
+    默认            只合并逐字节相同的文件（7990 个 → 2319 个，约 11 MB）
+    --homophones    同一读音只保留一个录音（→ 1539 个，约 7.6 MB）
+    --prune         删除已不再被引用的原始单字文件（不可撤销，默认不删）
+
+同时检查两类数据错误，写入 audio/dedupe_report.json：
+    variants        同一粤拼对应内容不同的录音（列出各录音的字和时长，时长相差较大的更可疑）
+    conflicts       同一个录音文件被标成不同的粤拼
+"""
+
+import argparse
+import collections
+import json
+import os
+import shutil
+
+from chapter_writer import write_files
+from pipeline_trace import log, warn
+from scan_audio_metadata import CACHE_FILE, INDEX_FILE, MetadataCache, index_entries, scan_file
+
+AUDIO_DIR = "audio"
+SYLLABLE_DIR = os.path.join(AUDIO_DIR, "syllables")
+REPORT_FILE = os.path.join(AUDIO_DIR, "dedupe_report.json")
+
+
+def source_of(entry):
+    return entry.get("source_path", entry["audio_path"])
+
+
+def hash_sources(entries, cache_file=CACHE_FILE):
+    """{原始路径: 元数据}；优先使用元数据缓存，改动过的文件重新扫描"""
+    cache = MetadataCache(cache_file).load()
+    metadata = {}
+    for path in sorted({source_of(entry) for entry in entries}):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            warn(f"  ⚠️ 音频不存在，跳过: {path}")
+            continue
+        info = cache.get(path, stat)
+        if info is None:
+            info = scan_file(path)
+            cache.put(path, stat, info)
+        metadata[path] = info
+    cache.save()
+    return metadata
+
+
+def plan(entries, metadata, homophones=False):
+    """返回 ({原始路径: 文件名（不含扩展名）}, variants, conflicts)"""
+    by_reading = collections.defaultdict(collections.Counter)
+    readings_of = collections.defaultdict(collections.Counter)
+    for entry in entries:
+        digest = metadata[source_of(entry)]["sha256"]
+        by_reading[entry["jyutping"]][digest] += 1
+        readings_of[digest][entry["jyutping"]] += 1
+
+    # 同一文件被标成多个读音时，按多数读音命名（Counter.most_common 同数时保持首次出现的顺序）
+    primary = {digest: readings.most_common(1)[0][0] for digest, readings in readings_of.items()}
+
+    names = {}
+    for reading, digests in by_reading.items():
+        ranked = [digest for digest, _ in digests.most_common()]
+        if homophones:
+            names[(reading, None)] = reading
+            continue
+        own = [digest for digest in ranked if primary[digest] == reading]
+        for i, digest in enumerate(own, 1):
+            names[(reading, digest)] = reading if i == 1 else f"{reading}-{i}"
+
+    mapping = {}
+    for entry in entries:
+        digest = metadata[source_of(entry)]["sha256"]
+        if homophones:
+            name = names[(entry["jyutping"], None)]
+        else:
+            name = names[(primary[digest], digest)]
+        mapping[source_of(entry)] = name
+
+    sources = collections.defaultdict(list)
+    for entry in entries:
+        sources[metadata[source_of(entry)]["sha256"]].append(entry)
+
+    variants = []
+    for reading, digests in sorted(by_reading.items()):
+        if len(digests) < 2:
+            continue
+        recordings = []
+        for digest, _ in digests.most_common():
+            group = [entry for entry in sources[digest] if entry["jyutping"] == reading]
+            recordings.append({
+                "chars": "".join(entry["char"] for entry in group),
+                "duration_ms": metadata[source_of(group[0])]["duration_ms"],
+                "sha256": digest,
+            })
+        durations = [recording["duration_ms"] for recording in recordings]
+        variants.append({"jyutping": reading, "spread_ms": max(durations) - min(durations),
+                         "recordings": recordings})
+    variants.sort(key=lambda variant: -variant["spread_ms"])
+
+    conflicts = [
+        {"sha256": digest, "readings": {reading: "".join(entry["char"] for entry in sources[digest]
+                                                         if entry["jyutping"] == reading)
+                                        for reading in readings}}
+        for digest, readings in readings_of.items() if len(readings) > 1
+    ]
+    return mapping, variants, conflicts
+
+
+def choose_source(entries, metadata, mapping):
+    """每个合并后的文件取哪个原始文件：引用最多的内容，同数时取索引中靠前的"""
+    usage = collections.Counter(metadata[source_of(entry)]["sha256"] for entry in entries)
+    chosen = {}
+    for entry in entries:
+        path = source_of(entry)
+        name = mapping[path]
+        digest = metadata[path]["sha256"]
+        if name not in chosen or usage[digest] > usage[metadata[chosen[name]]["sha256"]]:
+            chosen[name] = path
+    return chosen
+
+
+def write_syllables(chosen, metadata, syllable_dir=SYLLABLE_DIR):
+    """复制合并后的文件（内容没变的不重写），删除不再使用的旧文件；返回 (写入数, 删除数)"""
+    os.makedirs(syllable_dir, exist_ok=True)
+    written = 0
+    for name, source in chosen.items():
+        target = os.path.join(syllable_dir, f"{name}.mp3")
+        if os.path.exists(target) and os.path.getsize(target) == metadata[source]["bytes"]:
+            with open(target, 'rb') as a, open(source, 'rb') as b:
+                if a.read() == b.read():
+                    continue
+        shutil.copyfile(source, target + ".tmp")
+        os.replace(target + ".tmp", target)
+        written += 1
+    keep = {f"{name}.mp3" for name in chosen}
+    removed = 0
+    for file_name in os.listdir(syllable_dir):
+        if file_name.endswith(".mp3") and file_name not in keep:
+            os.remove(os.path.join(syllable_dir, file_name))
+            removed += 1
+    return written, removed
+
+
+def dedupe(index_file=INDEX_FILE, syllable_dir=SYLLABLE_DIR, report_file=REPORT_FILE, homophones=False,
+           prune=False, cache_file=CACHE_FILE):
+    with open(index_file, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    metadata = hash_sources(index_entries(index), cache_file)
+    entries = [entry for entry in index_entries(index) if source_of(entry) in metadata]
+    mapping, variants, conflicts = plan(entries, metadata, homophones)
+    chosen = choose_source(entries, metadata, mapping)
+    written, removed = write_syllables(chosen, metadata, syllable_dir)
+
+    prefix = syllable_dir.replace(os.sep, "/")
+    for entry in entries:
+        source = source_of(entry)
+        entry["source_path"] = source
+        entry["audio_path"] = f"{prefix}/{mapping[source]}.mp3"
+        # 元数据描述实际播放的文件
+        entry.update({field: value for field, value in metadata[chosen[mapping[source]]].items()
+                      if field != "issue"})
+    index["deduplication"] = {"mode": "homophones" if homophones else "exact", "files": len(chosen)}
+    source_bytes = sum(metadata[path]["bytes"] for path in {source_of(entry) for entry in entries})
+    merged_bytes = sum(metadata[path]["bytes"] for path in chosen.values())
+    report = {
+        "mode": index["deduplication"]["mode"],
+        "source_files": len({source_of(entry) for entry in entries}),
+        "files": len(chosen),
+        "source_bytes": source_bytes,
+        "bytes": merged_bytes,
+        "conflicts": conflicts,
+        "variants": variants,
+    }
+    write_files([(index_file, index), (report_file, report)])
+
+    pruned = 0
+    if prune:
+        used = {entry["audio_path"] for entry in entries}
+        for source in sorted({entry["source_path"] for entry in entries} - used):
+            os.remove(source)
+            pruned += 1
+        for entry in entries:
+            entry.pop("source_path", None)
+        write_files([(index_file, index)])
+
+    log(f"合并后 {len(chosen)} 个文件（原 {report['source_files']} 个）, "
+        f"{merged_bytes / 2 ** 20:.1f} MB（原 {source_bytes / 2 ** 20:.1f} MB）; 写入 {written} 个, 删除 {removed} 个旧文件"
+        + (f", 删除原始文件 {pruned} 个" if prune else ""))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按内容哈希把单字音频合并成以读音命名的文件")
+    parser.add_argument("--index", default=INDEX_FILE, help="音频索引文件")
+    parser.add_argument("--output-dir", default=SYLLABLE_DIR, help="合并后的音频目录")
+    parser.add_argument("--report", default=REPORT_FILE, help="检查报告")
+    parser.add_argument("--homophones", action="store_true", help="同一读音只保留一个录音")
+    parser.add_argument("--prune", action="store_true", help="删除不再被引用的原始文件（不可撤销）")
+    args = parser.parse_args()
+
+    report = dedupe(args.index, args.output_dir, args.report, args.homophones, args.prune)
+    log(f"✅ {report['source_files']} 个录音合并为 {report['files']} 个文件 "
+          f"({report['source_bytes'] / 2 ** 20:.1f} MB → {report['bytes'] / 2 ** 20:.1f} MB), 报告: {args.report}")
+    if report["conflicts"]:
+        warn(f"⚠️ {len(report['conflicts'])} 个录音被标成不同的粤拼:")
+        for conflict in report["conflicts"][:20]:
+            warn("  " + " / ".join(f"{reading}: {chars}" for reading, chars in conflict["readings"].items()))
+    if report["variants"]:
+        warn(f"⚠️ {len(report['variants'])} 个粤拼对应多个不同的录音，时长相差最大的:")
+        for variant in report["variants"][:10]:
+            warn(f"  {variant['jyutping']}: " + ", ".join(
+                f"{recording['chars'][:6]} {recording['duration_ms']} ms" for recording in variant["recordings"][:4]))
+
+
+if __name__ == "__main__":
+    main()
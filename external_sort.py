@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+外部排序
+排序引擎把全部章节读进一个列表再排序，适合几千到几十万条记录。词级词表和完整的 CJK 扩展区
+（数千万条带例词的记录）用本脚本排序，内存占用有上限：
+
+    1. 流式读取记录（章节文件逐个读取，或每行一条记录的 JSON Lines），每攒满一批就评分、按得分稳定排序，
+       写成 .cache/external_sort/ 下的一个有序段（每行 [得分, 记录]）
+    2. 用 heapq.merge 对各段做 k 路归并（段太多时分多轮，每轮最多合并 --fan-in 个相邻的段），
+       边归并边写入 frequency_rank 和评分器的注记，按各章字数依次流式写出章节文件
+
+每批的条数按 --memory-mb 估算（取前 1000 条记录在内存中的平均大小，并为排序留出余量），也可以用 --run-size 指定。
+段内按得分稳定排序，heapq.merge 在得分相同时先取前面的段，所以名次与在内存中整体排序（RankingEngine.rank）相同，
+写出的章节文件逐字节一致；--verify 在小数据上用内存流程再排一遍并比较。
+
+只支持 prepare() 不依赖全部数据的评分器（common、wordfreq），以及按记录中已有得分排序的 field 评分器
+（--score-field，词表通常自带频率）。wordfreq 的字频缓存按单字设计，词表请用 field。
+不生成分页、二进制数据集、反查索引和统计报告，这些都需要全部数据在内存中。
+
+    python external_sort.py wordfreq --output-dir /tmp/chapters --verify
+    python external_sort.py field --score-field frequency --input words.jsonl --output-dir data/words --chapters 50
+"""
+
+import argparse
+import heapq
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+from operator import itemgetter
+
+from chapter_writer import serialize
+from json_backend import dumps, iter_files, loads
+from pipeline_trace import PipelineTrace, count, log, stage, use_trace
+from ranking_engine import (
+    CHAPTER_COUNT,
+    DATA_DIR,
+    SCORERS,
+    RankingEngine,
+    Scorer,
+    chapter_file,
+    chapter_sizes,
+    discover_chapter_count,
+    make_scorer,
+    split_into_chapters,
+)
+from record_store import make_records
+
+SPILL_DIR = os.path.join(".cache", "external_sort")
+MEMORY_MB = 256
+FAN_IN = 64
+SAMPLE_SIZE = 1000
+SORT_OVERHEAD = 2  # 评分和排序时的 (得分, 记录) 元组、键列表等，按记录本身大小的倍数估计
+
+
+class FieldScorer(Scorer):
+    """按记录中已有的得分字段排序"""
+
+    name = "field"
+    streaming = True
+
+    def __init__(self, field, reverse=True):
+        self.field = field
+        self.reverse = reverse
+        self.description = f"记录中的 {field}（{'从高到低' if reverse else '从低到高'}）"
+
+    def score(self, char_data):
+        return char_data.get(self.field, 0)
+
+
+def read_records(inputs=None, data_dir=DATA_DIR):
+    """按顺序逐条产出记录：inputs 为 JSON Lines（.jsonl）或 JSON 数组文件，不指定时读取各章节文件"""
+    if not inputs:
+        inputs = [chapter_file(data_dir, chapter) for chapter in range(1, discover_chapter_count(data_dir) + 1)]
+    for path in inputs:
+        if path.endswith(".jsonl"):
+            with open(path, 'rb') as f:
+                for line in f:
+                    if line.strip():
+                        yield loads(line)
+            continue
+        # JSON 数组只能整个解析，每次只读一个文件
+        for _, data, error in iter_files([path], cache=False):
+            if error is not None:
+                raise error
+            yield from data
+
+
+def record_bytes(value):
+    """记录在内存中的大致字节数（递归计入其中的容器和值）"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(record_bytes(item) for item in value.values())
+    elif isinstance(value, (list, tuple)):
+        size += sum(record_bytes(item) for item in value)
+    return size
+
+
+def estimate_run_size(sample, memory_mb=MEMORY_MB):
+    """内存上限内一批能容纳的记录数"""
+    per_record = sum(map(record_bytes, sample)) / len(sample) if sample else 1
+    run_size = max(1, int(memory_mb * 2 ** 20 / (per_record * SORT_OVERHEAD)))
+    log(f"每条记录约 {per_record:.0f} 字节, 每批 {run_size} 条（内存上限 {memory_mb} MB）")
+    return run_size
+
+
+def write_run(run, path):
+    with open(path, 'wb') as f:
+        for item in run:
+            f.write(dumps(item, minify=True) + b"\n")
+
+
+def read_run(path):
+    with open(path, 'rb') as f:
+        for line in f:
+            yield loads(line)
+
+
+def write_runs(records, scorer, spill_dir, run_size=None, memory_mb=MEMORY_MB):
+    """分批评分并写出有序段，返回 (段文件列表, 记录总数)"""
+    records = iter(records)
+    if run_size is None:
+        sample = list(itertools.islice(records, SAMPLE_SIZE))
+        run_size = estimate_run_size(sample, memory_mb)
+        records = itertools.chain(sample, records)
+        del sample
+
+    runs = []
+    total = 0
+    while True:
+        batch = list(itertools.islice(records, run_size))
+        if not batch:
+            break
+        # 与 RankingEngine.rank 相同的评分和稳定排序
+        scorer.prepare(batch)
+        run = RankingEngine.score_characters(scorer, batch)
+        RankingEngine.sort_scored(scorer, run)
+        path = os.path.join(spill_dir, f"run_{len(runs):05d}.jsonl")
+        write_run(run, path)
+        runs.append(path)
+        total += len(batch)
+        del batch, run
+        log(f"  第 {len(runs)} 段: 累计 {total} 条")
+    count("records_loaded", total)
+    count("runs", len(runs))
+    return runs, total
+
+
+def merge_runs(runs, reverse, spill_dir, fan_in=FAN_IN):
+    """归并各段，返回按名次排列的 [得分, 记录] 迭代器
+
+    段数超过 fan_in 时先把相邻的段分组合并成更大的段，同分时仍是前面的段在前。
+    """
+    key = itemgetter(0)
+    level = 0
+    while len(runs) > fan_in:
+        merged = []
+        for start in range(0, len(runs), fan_in):
+            group = runs[start:start + fan_in]
+            path = os.path.join(spill_dir, f"merge_{level}_{start // fan_in:05d}.jsonl")
+            write_run(heapq.merge(*map(read_run, group), key=key, reverse=reverse), path)
+            for old in group:
+                os.remove(old)
+            merged.append(path)
+        log(f"  第 {level + 1} 轮归并: {len(runs)} 段 → {len(merged)} 段")
+        runs = merged
+        level += 1
+    return heapq.merge(*map(read_run, runs), key=key, reverse=reverse)
+
+
+class ChapterStream:
+    """逐条写出章节文件，内容与 chapter_writer.serialize(整章列表) 相同；先写临时文件"""
+
+    def __init__(self, path, minify=False):
+        self.path = path
+        self.minify = minify
+        self.tmp_path = path + ".tmp"
+        self.count = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.file = open(self.tmp_path, 'wb')
+
+    def write(self, record):
+        if self.minify:
+            self.file.write((b"," if self.count else b"[") + serialize(record, True))
+        else:
+            # indent=2 时列表中每个元素的各行都多缩进两格
+            self.file.write((b",\n  " if self.count else b"[\n  ") + serialize(record).replace(b"\n", b"\n  "))
+        self.count += 1
+
+    def close(self):
+        if not self.count:
+            self.file.write(b"[]")
+        else:
+            self.file.write(b"]" if self.minify else b"\n]")
+        self.file.close()
+
+    def discard(self):
+        self.file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def write_chapters(merged, total, scorer, output_dir, chapter_count=CHAPTER_COUNT, minify=False):
+    """按各章字数依次写出章节文件（全部写完后才替换原文件），返回 [(路径, 条数)]"""
+    ranks = itertools.count(1)
+    streams = []
+    try:
+        for chapter, size in enumerate(chapter_sizes(total, chapter_count), 1):
+            stream = ChapterStream(chapter_file(output_dir, chapter), minify)
+            streams.append(stream)
+            for score, record in itertools.islice(merged, size):
+                record['frequency_rank'] = next(ranks)
+                scorer.annotate(record, score)
+                stream.write(record)
+            stream.close()
+    except BaseException:
+        for stream in streams:
+            stream.discard()
+        raise
+    for stream in streams:
+        os.replace(stream.tmp_path, stream.path)
+    # 章节数量减少时删除多出来的旧章节文件
+    chapter = chapter_count + 1
+    while os.path.exists(chapter_file(output_dir, chapter)):
+        os.remove(chapter_file(output_dir, chapter))
+        chapter += 1
+    return [(stream.path, stream.count) for stream in streams]
+
+
+def external_sort(scorer, output_dir, inputs=None, data_dir=DATA_DIR, chapter_count=CHAPTER_COUNT,
+                  memory_mb=MEMORY_MB, run_size=None, fan_in=FAN_IN, spill_dir=SPILL_DIR, minify=False):
+    """评分 → 写出有序段 → 归并 → 写出章节文件；返回 [(路径, 条数)]"""
+    if not scorer.streaming:
+        raise ValueError(f"评分器 {scorer.name} 需要全部数据才能评分，不支持分批（可用: common、wordfreq、field）")
+    os.makedirs(spill_dir, exist_ok=True)
+    work_dir = tempfile.mkdtemp(dir=spill_dir, prefix="runs-")
+    try:
+        with stage("score_spill"):
+            runs, total = write_runs(read_records(inputs, data_dir), scorer, work_dir, run_size, memory_mb)
+        log(f"共 {total} 条记录, {len(runs)} 段")
+        with stage("merge_write"):
+            merged = merge_runs(runs, scorer.reverse, work_dir, fan_in)
+            return write_chapters(merged, total, scorer, output_dir, chapter_count, minify)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def verify(make, output_dir, inputs=None, data_dir=DATA_DIR, chapter_count=CHAPTER_COUNT, minify=False):
+    """用内存中的流程（RankingEngine.rank）排一遍，与写出的章节文件逐字节比较，返回不一致的文件"""
+    characters = make_records(read_records(inputs, data_dir))
+    ranked = RankingEngine(data_dir, chapter_count, characters=characters).rank(make())
+    mismatched = []
+    for chapter, chapter_chars in enumerate(split_into_chapters(ranked, chapter_count), 1):
+        path = chapter_file(output_dir, chapter)
+        with open(path, 'rb') as f:
+            if f.read() != serialize(chapter_chars, minify):
+                mismatched.append(path)
+    return mismatched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="内存占用有上限的外部排序：分批评分、写出有序段、k 路归并成章节文件")
+    parser.add_argument("scorer", choices=sorted(name for name, cls in SCORERS.items() if cls.streaming) + ["field"],
+                        help="评分器")
+    parser.add_argument("--input", nargs="+", default=None,
+                        help="输入文件：JSON Lines（.jsonl，每行一条记录）或 JSON 数组，按顺序读取（默认读取各章节文件）")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="章节数据目录（不指定 --input 时从这里读取）")
+    parser.add_argument("--output-dir", required=True, help="章节文件的输出目录")
+    parser.add_argument("--chapters", type=int, default=None, help="章节数量（默认沿用 chapters.json）")
+    parser.add_argument("--memory-mb", type=float, default=MEMORY_MB, help="每批记录的内存上限（MB）")
+    parser.add_argument("--run-size", type=int, default=None, help="每批记录数（指定后不按内存上限估算）")
+    parser.add_argument("--fan-in", type=int, default=FAN_IN, help="每轮最多归并的段数")
+    parser.add_argument("--spill-dir", default=SPILL_DIR, help="有序段的临时目录")
+    parser.add_argument("--score-field", default="score", help="field 评分器使用的得分字段")
+    parser.add_argument("--ascending", action="store_true", help="field 评分器按得分从低到高排列")
+    parser.add_argument("--minify", action="store_true", help="章节文件不缩进")
+    parser.add_argument("--verify", action="store_true", help="再用内存中的流程排一遍并逐字节比较（只适合小数据）")
+    parser.add_argument("-q", "--quiet", action="store_true", help="不输出进度（错误仍输出到 stderr）")
+    parser.add_argument("--trace", default=None, help="运行记录 JSON 的路径（默认写到 .cache/traces/）")
+    args = parser.parse_args()
+
+    if os.path.abspath(args.output_dir) == os.path.abspath(args.data_dir):
+        parser.error("输出目录不能是章节数据目录：外部排序不更新分页和 chapters.json，请用 ranking_engine.py")
+    if args.fan_in < 2:
+        parser.error("--fan-in 至少为 2")
+
+    def make():
+        if args.scorer == FieldScorer.name:
+            return FieldScorer(args.score_field, reverse=not args.ascending)
+        return make_scorer(args.scorer, args)
+
+    chapter_count = args.chapters or discover_chapter_count(args.data_dir)
+    trace = PipelineTrace(quiet=args.quiet)
+    with use_trace(trace):
+        written = external_sort(make(), args.output_dir, args.input, args.data_dir, chapter_count,
+                                args.memory_mb, args.run_size, args.fan_in, args.spill_dir, args.minify)
+        for path, records in written:
+            log(f"  {path}: {records} 条")
+        if args.verify:
+            with stage("verify"):
+                mismatched = verify(make, args.output_dir, args.input, args.data_dir, chapter_count, args.minify)
+    path = trace.write(args.trace)
+    trace.log(f"各阶段: {trace.summary()}")
+    trace.log(f"运行记录: {path}")
+    if args.verify:
+        if mismatched:
+            print(f"❌ 与内存排序结果不一致: {', '.join(mismatched)}")
+            sys.exit(1)
+        print(f"✅ 与内存排序结果逐字节一致（{len(written)} 个章节文件）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+wordfreq 字频本地缓存
+按 wordfreq 版本和语言分文件保存逐字频率，后续运行一次读取即可，
+只有缓存未命中的汉字才调用 wordfreq 分词查询
+"""
+
+import argparse
+import os
+import time
+
+from json_backend import dump_file, load_file
+from pipeline_trace import warn
+
+# 相对本文件而不是当前工作目录，从别的目录运行也会命中同一份缓存
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+DEFAULT_LANG = "zh"
+
+
+def wordfreq_version():
+    """当前安装的 wordfreq 版本"""
+    try:
+        from importlib.metadata import version
+        return version("wordfreq")
+    except Exception:
+        import wordfreq
+        return getattr(wordfreq, "__version__", "unknown")
+
+
+class FrequencyCache:
+    """逐字频率缓存（文件名和内容都带 wordfreq 版本与语言）
+
+    文件格式为紧凑 JSON：
+        chars        已查询过的汉字拼成的字符串
+        frequencies  与 chars 逐位对应的 word_frequency() 结果
+    """
+
+    def __init__(self, lang=DEFAULT_LANG, cache_dir=None, version=None):
+        self.lang = lang
+        self.version = version or wordfreq_version()
+        # 未指定时在创建时读取 CACHE_DIR，基准测试可以把它换成临时目录
+        self.path = os.path.join(cache_dir or CACHE_DIR, f"wordfreq-{self.version}-{lang}.json")
+        self.frequencies = {}
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        """一次读取整个缓存文件；版本或语言不符时视为空缓存"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            data = load_file(self.path, cache=False)
+        except (OSError, ValueError) as e:
+            warn(f"读取字频缓存失败，忽略: {e}")
+            return
+        if data.get("version") != self.version or data.get("lang") != self.lang:
+            return
+        self.frequencies = dict(zip(data.get("chars", ""), data.get("frequencies", [])))
+
+    def get(self, char):
+        """命中返回频率，未命中返回 None"""
+        freq = self.frequencies.get(char)
+        if freq is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return freq
+
+    def put(self, char, freq):
+        self.frequencies[char] = freq
+        self.dirty = True
+
+    def save(self):
+        """有新数据时写回缓存（先写临时文件再替换）"""
+        if not self.dirty:
+            return
+        chars = "".join(self.frequencies)
+        data = {
+            "version": self.version,
+            "lang": self.lang,
+            "chars": chars,
+            "frequencies": [self.frequencies[c] for c in chars],
+        }
+        dump_file(self.path, data, minify=True)
+        self.dirty = False
+
+    def clear(self):
+        """删除缓存文件"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.frequencies = {}
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+
+
+def time_lookups(chars, cache_dir=CACHE_DIR):
+    """计时：新建排序器并查询全部汉字的频率"""
+    from wordfreq_based_sorting import WordFreqSorter
+
+    start = time.perf_counter()
+    sorter = WordFreqSorter(FrequencyCache(cache_dir=cache_dir))
+    sorter.prefetch(chars)
+    return time.perf_counter() - start, sorter.cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="wordfreq 字频本地缓存")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="缓存目录")
+    parser.add_argument("--data-dir", default="data", help="章节数据目录")
+    parser.add_argument("--rebuild", action="store_true", help="清空后重新生成缓存")
+    parser.add_argument("--benchmark", action="store_true", help="对比冷启动与热启动耗时")
+    args = parser.parse_args()
+
+    from ranking_engine import load_characters
+    chars = [c['char'] for c in load_characters(args.data_dir)]
+
+    if args.rebuild or args.benchmark:
+        FrequencyCache(cache_dir=args.cache_dir).clear()
+
+    cold, cache = time_lookups(chars, args.cache_dir)
+    print(f"缓存文件: {cache.path}")
+    print(f"  逐字频率: {len(cache.frequencies)} 个")
+    print(f"  大小: {os.path.getsize(cache.path) / 1024:.1f} KB")
+
+    if args.benchmark:
+        warm, cache = time_lookups(chars, args.cache_dir)
+        print("\n=== 字频查询耗时 ===")
+        print(f"  冷启动（逐字调用 wordfreq）: {cold:.3f} 秒")
+        print(f"  热启动（读取缓存）: {warm:.3f} 秒")
+        if warm > 0:
+            print(f"  加速: {cold / warm:.1f} 倍")
+
+
+if __name__ == "__main__":
+    main()
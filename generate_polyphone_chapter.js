@@ -333,6 +333,78 @@ const polyphoneExamples = {
     }
 };
 
+// 多音字释义（两个读音各一条，页面卡片和 verify_polyphone_data.js 使用）
+const polyphoneDefinitions = {
+    "和": {
+        primary: "平和、和谐，如\"和平\"",
+        secondary: "混合、搅拌，如\"和面\""
+    },
+    "中": {
+        primary: "中心、中间，如\"中国\"",
+        secondary: "命中、中奖，如\"中奖\""
+    },
+    "好": {
+        primary: "美好、良好，如\"好人\"",
+        secondary: "喜欢、爱好，如\"好学\""
+    },
+    "着": {
+        primary: "动词后缀，表示动作进行中，如\"看着\"",
+        secondary: "穿着、附着，如\"穿着\""
+    },
+    "地": {
+        primary: "土地、地面，如\"地方\"",
+        secondary: "结构助词，用于形容词后，如\"慢慢地\""
+    },
+    "得": {
+        primary: "获得、得到，如\"得到\"",
+        secondary: "结构助词，用于动词后表示可能"
+    },
+    "只": {
+        primary: "副词，表示仅限于某个范围，如\"只有\"",
+        secondary: "量词，用于动物或某些器物，如\"一只\""
+    },
+    "长": {
+        primary: "长度、长短，如\"长度\"",
+        secondary: "生长、成长，如\"长大\""
+    },
+    "间": {
+        primary: "房间、空间，如\"房间\"",
+        secondary: "间隔、间断，如\"间隔\""
+    },
+    "便": {
+        primary: "方便、便利，如\"便利\"",
+        secondary: "价格低、便宜，如\"便宜\""
+    },
+    "发": {
+        primary: "发展、发生，如\"发展\"",
+        secondary: "头发、毛发，如\"头发\""
+    },
+    "行": {
+        primary: "行走、行动，如\"行动\"",
+        secondary: "银行、行列，如\"银行\""
+    },
+    "少": {
+        primary: "少数、少年，如\"少数\"",
+        secondary: "多少、减少，如\"多少\""
+    },
+    "相": {
+        primary: "相信、相互，如\"相信\"",
+        secondary: "相貌、相片，如\"相貌\""
+    },
+    "重": {
+        primary: "重要、重量，如\"重要\"",
+        secondary: "重复、重新，如\"重复\""
+    },
+    "数": {
+        primary: "数字、数学，如\"数字\"",
+        secondary: "数数、计算，如\"数数\""
+    },
+    "乐": {
+        primary: "快乐、乐意，如\"快乐\"",
+        secondary: "音乐、乐器，如\"音乐\""
+    }
+};
+
 // 读取所有章节的汉字数据
 function readAllChapters() {
     const chapters = [];
@@ -351,17 +423,15 @@ function filterPolyphones(characters) {
     return characters.filter(char => char.secondary_jyutping && char.secondary_jyutping !== '');
 }
 
-// 为多音字添加例词
+// 为多音字添加例词和释义（没有释义的字不加 definitions，页面显示"暂无释义"）
 function addExamples(polyphones) {
     return polyphones.map(char => {
         const examples = polyphoneExamples[char.char] || {
             primary: ["暂无例词", "暂无例词", "暂无例词"],
             secondary: ["暂无例词", "暂无例词", "暂无例词"]
         };
-        return {
-            ...char,
-            examples
-        };
+        const definitions = polyphoneDefinitions[char.char];
+        return definitions ? { ...char, examples, definitions } : { ...char, examples };
     });
 }
 
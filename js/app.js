@@ -64,7 +64,11 @@ class App {
 
             console.log(`📊 章节信息: ${chapter.title}, 字符数: ${chapter.char_count}`);
             
-            const characters = await window.dataManager.getChapterCharacters(chapterId);
+            const [characters] = await Promise.all([
+                window.dataManager.getChapterCharacters(chapterId),
+                window.pronunciationSystem.loadChapterAudio(chapterId),
+                window.dataManager.loadChapterExamples(chapterId)
+            ]);
             console.log(`📋 加载到的字符数: ${characters.length}`);
             
             if (characters.length > 0) {
@@ -73,6 +77,7 @@ class App {
 
             this.currentChapter = chapter;
             this.currentCharacters = characters;
+            window.pronunciationSystem.setChapter(chapterId);
 
             window.uiRenderer.renderCharacters(characters, chapter.title);
             window.uiRenderer.showChapterView();
@@ -80,6 +85,12 @@ class App {
             
             // 为标签切换方案添加事件监听器
             this.setupTabEventListeners();
+
+            // 先显示第 1 页，其余分页到达后依次追加
+            window.dataManager.loadRemainingPages((pageCharacters) => {
+                window.uiRenderer.appendCharacters(pageCharacters, chapter.title);
+                this.setupTabEventListeners();
+            });
         } catch (error) {
             console.error('❌ 章节加载失败:', error);
             window.uiRenderer.hideLoading();
@@ -89,8 +100,9 @@ class App {
 
     setupTabEventListeners() {
         // 为标签切换方案添加事件监听器
-        const tabs = document.querySelectorAll('.tab');
+        const tabs = document.querySelectorAll('.tab:not([data-bound])');
         tabs.forEach(tab => {
+            tab.dataset.bound = 'true';
             tab.addEventListener('click', () => {
                 const parentCard = tab.closest('.character-card');
                 const tabsContainer = parentCard.querySelector('.pinyin-tabs');
@@ -140,6 +152,8 @@ class App {
         console.log('🔙 返回章节列表');
         this.currentChapter = null;
         this.currentCharacters = [];
+        window.dataManager.cancelPendingPages();
+        window.pronunciationSystem.setChapter(null);
         
         // 重新加载章节列表
         this.loadChapters();
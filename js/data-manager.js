@@ -3,20 +3,48 @@ class DataManager {
         this.chapters = null;
         this.characters = null;
         this.audioIndex = null;
+        this.inventory = null;
+        this.examples = { words: {}, readings: {} };
+        this.assetVersions = new Map();
         this.initialized = false;
     }
 
     async init() {
         console.log('📚 数据管理器初始化...');
+        await this.loadPrecacheManifest();
         await this.loadChapters();
         await this.loadAudioIndex();
         this.initialized = true;
         console.log('✅ 数据管理器初始化完成');
     }
 
+    async loadPrecacheManifest() {
+        // 预缓存清单（build_precache_manifest.py 生成）：每个文件的内容哈希，请求时附加到 URL 上，
+        // 文件改变后 URL 随之改变，不再命中旧缓存；清单本身每次向服务器确认
+        try {
+            const response = await fetch('data/precache.json', { cache: 'no-cache' });
+            if (!response.ok) {
+                throw new Error('预缓存清单加载失败');
+            }
+            const manifest = await response.json();
+            const urlField = manifest.fields.indexOf('url');
+            const hashField = manifest.fields.indexOf('hash');
+            this.assetVersions = new Map(manifest.assets.map(asset => [asset[urlField], asset[hashField]]));
+            console.log(`✅ 预缓存清单加载成功: ${this.assetVersions.size} 个文件`);
+        } catch (error) {
+            console.warn('⚠️ 没有预缓存清单，按原路径请求:', error);
+            this.assetVersions = new Map();
+        }
+    }
+
+    assetUrl(path) {
+        const hash = this.assetVersions.get(path);
+        return hash ? `${path}?v=${hash}` : path;
+    }
+
     async loadChapters() {
         try {
-            const response = await fetch('data/chapters.json');
+            const response = await fetch(this.assetUrl('data/chapters.json'));
             if (!response.ok) {
                 throw new Error('章节数据加载失败');
             }
@@ -30,24 +58,24 @@ class DataManager {
 
     async loadAudioIndex() {
         try {
-            const response = await fetch('audio/index.json');
+            const response = await fetch(this.assetUrl('audio/index/manifest.json'));
             if (!response.ok) {
-                throw new Error('音频索引加载失败');
+                throw new Error('音频索引清单加载失败');
             }
             this.audioIndex = await response.json();
-            console.log(`✅ 音频索引加载成功: ${this.audioIndex.total_count} 个`);
+            console.log(`✅ 音频索引清单加载成功: ${this.audioIndex.total_count} 个`);
         } catch (error) {
-            console.error('❌ 音频索引加载错误:', error);
+            console.error('❌ 音频索引清单加载错误:', error);
             this.audioIndex = null;
         }
     }
 
-    generateDefaultChapters() {
+    generateDefaultChapters(chapterCount = 10) {
         const totalChars = 8105;
-        const charsPerChapter = Math.ceil(totalChars / 10);
+        const charsPerChapter = Math.ceil(totalChars / chapterCount);
         
         this.chapters = [];
-        for (let i = 1; i <= 10; i++) {
+        for (let i = 1; i <= chapterCount; i++) {
             const startRank = (i - 1) * charsPerChapter + 1;
             const endRank = Math.min(i * charsPerChapter, totalChars);
             const charCount = endRank - startRank + 1;
@@ -82,43 +110,152 @@ class DataManager {
     }
 
     async getChapterCharacters(chapterId) {
+        // 有分页清单时只等第 1 页，其余各页同时开始下载，由 loadRemainingPages 依次交付
+        const pages = this.getChapter(chapterId)?.pages;
+        this.pendingPages = null;
+        if (pages?.length) {
+            try {
+                const requests = pages.map(page => this.fetchPage(page.file));
+                requests.forEach(request => request.catch(() => {}));
+                this.characters = await requests[0];
+                this.pendingPages = { chapterId, requests: requests.slice(1) };
+                console.log(`✅ 第${chapterId}章第 1 页加载成功: ${this.characters.length} 个（共 ${pages.length} 页）`);
+                return this.characters;
+            } catch (error) {
+                console.error(`❌ 第${chapterId}章分页加载错误，改为加载整章:`, error);
+            }
+        }
+        return this.getFullChapterCharacters(chapterId);
+    }
+
+    async fetchPage(file) {
+        const response = await fetch(this.assetUrl(file));
+        if (!response.ok) {
+            throw new Error(`分页加载失败: ${file}`);
+        }
+        const [inventory, rows] = await Promise.all([this.loadInventory(), response.json()]);
+        return rows.map(row => this.decodeRow(inventory, row));
+    }
+
+    loadInventory() {
+        // 粤拼音节表（jyutping_inventory.py 生成），分页与音频索引中的读音都是它的整数编码
+        if (!this.inventory) {
+            this.inventory = fetch(this.assetUrl('data/jyutping_inventory.json')).then(response => {
+                if (!response.ok) {
+                    throw new Error('粤拼音节表加载失败');
+                }
+                return response.json();
+            }).catch(error => {
+                this.inventory = null;
+                throw error;
+            });
+        }
+        return this.inventory;
+    }
+
+    async loadChapterExamples(chapterId) {
+        // 例词分片（mine_example_words.py 生成）；没有分片时卡片退回内置例词
+        this.examples = { words: {}, readings: {} };
         try {
-            const response = await fetch(`data/chapter_${chapterId}_characters.json`);
+            const response = await fetch(this.assetUrl(`data/examples/chapter_${chapterId}.json`));
             if (!response.ok) {
-                throw new Error(`第${chapterId}章汉字数据加载失败`);
+                throw new Error(`第${chapterId}章例词加载失败`);
             }
-            const data = await response.json();
-            this.characters = Array.isArray(data) ? data : (data.characters || []);
-            console.log(`✅ 第${chapterId}章汉字数据加载成功: ${this.characters.length} 个`);
-            return this.characters;
+            const shard = await response.json();
+            const readings = {};
+            if (Object.keys(shard.readings || {}).length > 0) {
+                const inventory = await this.loadInventory();
+                for (const [key, words] of Object.entries(shard.readings)) {
+                    const [char, code] = key.split('|');
+                    readings[`${char}|${this.decodeReading(inventory, Number(code))}`] = words;
+                }
+            }
+            this.examples = { words: shard.words || {}, readings };
         } catch (error) {
-            console.error(`❌ 第${chapterId}章汉字数据加载错误:`, error);
-            return [];
+            console.warn(`⚠️ 第${chapterId}章没有例词数据:`, error);
         }
+        return this.examples;
     }
 
-    findAudioPath(char, jyutping) {
-        if (!this.audioIndex) {
-            return null;
+    getExamples(char, jyutping = null) {
+        // 指定读音时只返回按该读音分组的例词
+        if (jyutping) {
+            return this.examples.readings[`${char}|${jyutping}`] || null;
         }
+        return this.examples.words[char] || null;
+    }
 
-        const multiChar = this.audioIndex.multi_chars?.find(
-            item => item.char === char && item.jyutping === jyutping
-        );
+    decodeReading(inventory, code) {
+        // 编码 = 音节序号 * 8 + 声调；声调位为 7 时是例外读音表的序号
+        const index = code >> 3;
+        const tone = code & 7;
+        return tone === 7 ? inventory.irregular[index] : `${inventory.syllables[index]}${tone}`;
+    }
 
-        if (multiChar) {
-            return multiChar.audio_path;
+    decodeRow(inventory, row) {
+        // [字, 读音, 排名, 频率, 第二读音, 声调]，第二读音为 null 或缺省时没有该字段
+        const [char, reading, rank, score, secondary, tone] = row;
+        const character = {
+            char,
+            jyutping: this.decodeReading(inventory, reading),
+            tone: tone ?? (reading & 7),
+            frequency_rank: rank,
+            wordfreq_score: score
+        };
+        if (secondary !== undefined && secondary !== null) {
+            character.secondary_jyutping = this.decodeReading(inventory, secondary);
         }
+        return character;
+    }
 
-        const singleChar = this.audioIndex.single_chars?.find(
-            item => item.char === char
-        );
+    async loadRemainingPages(onPage) {
+        const pending = this.pendingPages;
+        if (!pending) {
+            return;
+        }
+        const { chapterId, requests } = pending;
+        const characters = this.characters;
+        for (const [index, request] of requests.entries()) {
+            try {
+                const page = await request;
+                // 加载期间切换了章节，丢弃剩余分页
+                if (this.pendingPages !== pending) {
+                    return;
+                }
+                characters.push(...page);
+                onPage?.(page);
+            } catch (error) {
+                console.error(`❌ 第${chapterId}章第 ${index + 2} 页加载错误:`, error);
+            }
+        }
+        this.pendingPages = null;
+        console.log(`✅ 第${chapterId}章全部分页加载完成: ${characters.length} 个`);
+    }
+
+    cancelPendingPages() {
+        this.pendingPages = null;
+    }
 
-        if (singleChar) {
-            return singleChar.audio_path;
+    async getFullChapterCharacters(chapterId) {
+        this.pendingPages = null;
+        try {
+            const response = await fetch(this.assetUrl(`data/chapter_${chapterId}_characters.json`));
+            if (!response.ok) {
+                throw new Error(`第${chapterId}章汉字数据加载失败`);
+            }
+            const data = await response.json();
+            this.characters = Array.isArray(data) ? data : (data.characters || []);
+            console.log(`✅ 第${chapterId}章汉字数据加载成功: ${this.characters.length} 个`);
+            return this.characters;
+        } catch (error) {
+            console.error(`❌ 第${chapterId}章汉字数据加载错误:`, error);
+            return [];
         }
+    }
 
-        return null;
+    findAudioPath(char, jyutping) {
+        // 查找表由发音系统按章节分片维护
+        return window.pronunciationSystem?.findAudioPath(char, jyutping) ?? null;
     }
 
     getStats() {
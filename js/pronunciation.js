@@ -3,6 +3,14 @@ class PronunciationSystem {
         this.isSpeaking = false;
         this.currentAudio = null;
         this.audioIndex = null;
+        // 音频查找表：单音字 字 → 路径，多音字 "字|粤拼" → 路径
+        this.singleAudio = new Map();
+        this.multiAudio = new Map();
+        this.loadedShards = new Set();
+        // 音频精灵（build_audio_sprites.py，部署时生成）：当前章节第一次发音时才加载
+        this.chapterId = null;
+        this.spriteManifest = null;
+        this.sprite = null;
     }
 
     async init() {
@@ -11,51 +19,153 @@ class PronunciationSystem {
     }
 
     async loadAudioIndex() {
-        // 根据当前页面位置确定正确的路径
-        const currentPath = window.location.pathname;
-        const indexPath = currentPath.includes('/output/') ? '../audio/index.json' : 'audio/index.json';
-        
+        // 优先加载分片索引清单（build_audio_index.py 生成），章节分片按需加载
+        const manifestPath = this.resolveAudioPath('audio/index/manifest.json');
+        console.log('📂 尝试加载音频索引清单:', manifestPath);
+
+        try {
+            const response = await fetch(manifestPath);
+            if (!response.ok) {
+                throw new Error('音频索引清单加载失败');
+            }
+            this.audioIndex = await response.json();
+            console.log(`✅ 音频索引清单加载成功: ${this.audioIndex.total_count} 个`);
+        } catch (error) {
+            console.warn('⚠️ 音频索引清单不可用，改用完整索引:', error);
+            await this.loadLegacyAudioIndex();
+        }
+    }
+
+    async loadLegacyAudioIndex() {
+        const indexPath = this.resolveAudioPath('audio/index.json');
         console.log('📂 尝试加载音频索引:', indexPath);
-        
+
         try {
             const response = await fetch(indexPath);
             if (!response.ok) {
                 throw new Error('音频索引加载失败');
             }
-            this.audioIndex = await response.json();
-            console.log(`✅ 音频索引加载成功: ${this.audioIndex.total_count} 个`);
+            const index = await response.json();
+            index.single_chars?.forEach(item => this.singleAudio.set(item.char, item.audio_path));
+            index.multi_chars?.forEach(item => this.multiAudio.set(`${item.char}|${item.jyutping}`, item.audio_path));
+            this.audioIndex = index;
+            console.log(`✅ 音频索引加载成功: ${index.total_count} 个`);
         } catch (error) {
             console.error('❌ 音频索引加载错误:', error);
             this.audioIndex = null;
         }
     }
 
-    findAudioPath(char, jyutping) {
-        if (!this.audioIndex) {
-            console.log(`⚠️ 音频索引未加载: ${char} (${jyutping})`);
-            return null;
+    async loadChapterAudio(chapterId) {
+        const shard = this.audioIndex?.chapters?.[chapterId];
+        if (!shard || this.loadedShards.has(String(chapterId))) {
+            return;
+        }
+
+        try {
+            const response = await fetch(this.resolveAudioPath(shard.file));
+            if (!response.ok) {
+                throw new Error(`第${chapterId}章音频索引加载失败`);
+            }
+            const data = await response.json();
+            // single 是有单字音频的字组成的字符串，路径由清单中的模板生成
+            for (const char of data.single || '') {
+                this.singleAudio.set(char, this.audioIndex.single_path.replace('{char}', char));
+            }
+            // syllables 把同一个合并音频（dedupe_audio.py）的字放在一起: {"ji6": "二义异…"}
+            for (const [file, chars] of Object.entries(data.syllables || {})) {
+                const path = this.audioIndex.syllable_path.replace('{file}', file);
+                for (const char of chars) {
+                    this.singleAudio.set(char, path);
+                }
+            }
+            // multi 的键是 "字|读音编码"，还原成 "字|粤拼"
+            const multi = Object.entries(data.multi || {});
+            if (multi.length > 0) {
+                const inventory = await window.dataManager.loadInventory();
+                multi.forEach(([key, path]) => {
+                    const [char, code] = key.split('|');
+                    this.multiAudio.set(`${char}|${window.dataManager.decodeReading(inventory, Number(code))}`, path);
+                });
+            }
+            this.loadedShards.add(String(chapterId));
+            console.log(`✅ 第${chapterId}章音频索引加载成功: ${shard.count} 个`);
+        } catch (error) {
+            console.error(`❌ 第${chapterId}章音频索引加载错误:`, error);
+        }
+    }
+
+    async loadAllChapterAudio() {
+        const chapterIds = Object.keys(this.audioIndex?.chapters || {});
+        await Promise.all(chapterIds.map(id => this.loadChapterAudio(id)));
+    }
+
+    setChapter(chapterId) {
+        // 只记录当前章节，精灵在该章第一次发音时才请求
+        this.chapterId = chapterId == null ? null : String(chapterId);
+    }
+
+    loadSpriteManifest() {
+        // 每次会话最多请求一次；没有生成精灵（本地开发）时失败一次后不再尝试
+        if (!this.spriteManifest) {
+            this.spriteManifest = fetch(this.resolveAudioPath('audio/sprites/manifest.json'))
+                .then(response => response.ok ? response.json() : null)
+                .catch(() => null);
         }
+        return this.spriteManifest;
+    }
 
-        console.log(`🔍 查找音频: ${char} (${jyutping})`);
-        console.log(`  单音字数量: ${this.audioIndex.single_chars?.length || 0}`);
-        console.log(`  多音字数量: ${this.audioIndex.multi_chars?.length || 0}`);
+    async loadChapterSprite(chapterId) {
+        // 偏移表和整章精灵各一次请求，下载完成前仍播放单独的音频文件
+        if (this.sprite?.chapterId === chapterId) {
+            return;
+        }
+        this.sprite = { chapterId, clips: null, blob: null };
 
-        const multiChar = this.audioIndex.multi_chars?.find(
-            item => item.char === char && item.jyutping === jyutping
-        );
+        try {
+            const entry = (await this.loadSpriteManifest())?.chapters?.[chapterId];
+            if (!entry) {
+                throw new Error(`第${chapterId}章没有音频精灵`);
+            }
+            const tableResponse = await fetch(`${this.resolveAudioPath(entry.file)}?v=${entry.hash}`);
+            if (!tableResponse.ok) {
+                throw new Error(`第${chapterId}章音频精灵偏移表加载失败`);
+            }
+            const table = await tableResponse.json();
+            const response = await fetch(`${this.resolveAudioPath(table.file)}?v=${table.hash}`);
+            if (!response.ok) {
+                throw new Error(`第${chapterId}章音频精灵加载失败`);
+            }
+            const blob = await response.blob();
+            if (this.sprite?.chapterId === chapterId) {
+                this.sprite = { chapterId, clips: table.clips, blob };
+                console.log(`✅ 第${chapterId}章音频精灵加载成功: ${Object.keys(table.clips).length} 段`);
+            }
+        } catch (error) {
+            console.log(`⚠️ 使用单独的音频文件: ${error.message}`);
+        }
+    }
 
-        if (multiChar) {
-            console.log(`✅ 找到多音字音频: ${multiChar.audio_path}`);
-            return multiChar.audio_path;
+    findSpriteClip(audioPath) {
+        // 偏移表以页面请求的音频路径为键，多音字录音和未打包的文件不在其中
+        const clip = this.sprite?.blob ? this.sprite.clips[audioPath] : null;
+        if (!clip) {
+            return null;
         }
+        const [offset, length] = clip;
+        return URL.createObjectURL(this.sprite.blob.slice(offset, offset + length, 'audio/mpeg'));
+    }
 
-        const singleChar = this.audioIndex.single_chars?.find(
-            item => item.char === char
-        );
+    findAudioPath(char, jyutping) {
+        if (!this.audioIndex) {
+            console.log(`⚠️ 音频索引未加载: ${char} (${jyutping})`);
+            return null;
+        }
 
-        if (singleChar) {
-            console.log(`✅ 找到单音字音频: ${singleChar.audio_path}`);
-            return singleChar.audio_path;
+        const audioPath = this.multiAudio.get(`${char}|${jyutping}`) || this.singleAudio.get(char);
+        if (audioPath) {
+            console.log(`✅ 找到音频: ${audioPath}`);
+            return audioPath;
         }
 
         console.log(`❌ 未找到音频: ${char} (${jyutping})`);
@@ -63,8 +173,9 @@ class PronunciationSystem {
     }
 
     resolveAudioPath(audioPath) {
-        // 根据当前页面位置调整音频路径
+        // 根据当前页面位置调整音频路径，并附加预缓存清单中的内容哈希
         const currentPath = window.location.pathname;
+        audioPath = window.dataManager?.assetUrl(audioPath) ?? audioPath;
         
         // 如果在output目录下，需要返回上级目录
         if (currentPath.includes('/output/')) {
@@ -165,13 +276,37 @@ class PronunciationSystem {
             this.stop();
         }
 
-        const audioPath = this.findAudioPath(char, jyutping);
+        let audioPath = this.findAudioPath(char, jyutping);
+
+        // 章节数据重新排序后分片可能过期，此时加载其余分片再查一次
+        if (!audioPath && this.audioIndex?.chapters && !this.audioIndex.missing?.includes(char)) {
+            await this.loadAllChapterAudio();
+            audioPath = this.findAudioPath(char, jyutping);
+        }
 
         if (!audioPath) {
             console.warn(`⚠️ 未找到音频: ${char} (${jyutping})`);
             return this.speakWithWebSpeech(char, jyutping);
         }
 
+        // 当前章节第一次发音时在后台加载整章精灵，这次先播放单独的文件
+        if (this.chapterId && this.sprite?.chapterId !== this.chapterId) {
+            this.loadChapterSprite(this.chapterId);
+        }
+
+        const clipUrl = this.findSpriteClip(audioPath);
+        if (clipUrl) {
+            console.log(`🎵 播放精灵片段: ${char}`);
+            try {
+                await this.playAudio(clipUrl);
+                return true;
+            } catch (error) {
+                console.error('❌ 精灵片段播放失败，改用单独的音频文件:', error);
+            } finally {
+                URL.revokeObjectURL(clipUrl);
+            }
+        }
+
         const resolvedPath = this.resolveAudioPath(audioPath);
         console.log(`🎵 播放音频: ${resolvedPath}`);
         try {
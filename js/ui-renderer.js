@@ -462,8 +462,13 @@ class UIRenderer {
     }
 
     // 获取汉字的例词
-    getCharacterExamples(char) {
-        return this.characterExamples[char] || ["暂无例词", "暂无例词", "暂无例词"];
+    getCharacterExamples(char, jyutping = null) {
+        // 按读音挖掘的例词 → 内置例词 → 本章例词分片（mine_example_words.py）
+        const dataManager = window.dataManager;
+        return (jyutping && dataManager?.getExamples(char, jyutping))
+            || this.characterExamples[char]
+            || dataManager?.getExamples(char)
+            || ["暂无例词", "暂无例词", "暂无例词"];
     }
 
     renderCharacters(characters, chapterTitle) {
@@ -491,6 +496,22 @@ class UIRenderer {
             console.log(`   ${index + 1}. ${char.char} - 排名: ${char.frequency_rank}`);
         });
 
+        this.charactersGrid.innerHTML = this.buildCharacterCards(sortedCharacters, chapterTitle);
+        this.bindPronunciationButtons();
+    }
+
+    // 追加后续分页的汉字（分页按排名顺序到达，直接接在末尾）
+    appendCharacters(characters, chapterTitle) {
+        console.log('🎨 追加汉字:', characters.length, '个');
+
+        const sortedCharacters = [...characters].sort((a, b) => {
+            return (a.frequency_rank || 99999) - (b.frequency_rank || 99999);
+        });
+        this.charactersGrid.insertAdjacentHTML('beforeend', this.buildCharacterCards(sortedCharacters, chapterTitle));
+        this.bindPronunciationButtons();
+    }
+
+    buildCharacterCards(sortedCharacters, chapterTitle) {
         // 检查是否是多音字章节
         const isPolyphoneChapter = chapterTitle === '多音字专栏';
         
@@ -526,9 +547,12 @@ class UIRenderer {
             }).join('');
         }
 
-        this.charactersGrid.innerHTML = html;
+        return html;
+    }
 
-        this.charactersGrid.querySelectorAll('.pronunciation-btn').forEach(btn => {
+    bindPronunciationButtons() {
+        this.charactersGrid.querySelectorAll('.pronunciation-btn:not([data-bound])').forEach(btn => {
+            btn.dataset.bound = 'true';
             btn.addEventListener('click', (event) => {
                 event.stopPropagation();
                 const char = btn.dataset.char;
@@ -690,8 +714,8 @@ class UIRenderer {
 
     // 多音字专用卡片渲染
     renderPolyphoneCard(char, frequencyLevel) {
-        const primaryExamples = char.examples?.primary || ["暂无例词", "暂无例词", "暂无例词"];
-        const secondaryExamples = char.examples?.secondary || ["暂无例词", "暂无例词", "暂无例词"];
+        const primaryExamples = char.examples?.primary || this.getCharacterExamples(char.char, char.jyutping);
+        const secondaryExamples = char.examples?.secondary || this.getCharacterExamples(char.char, char.secondary_jyutping);
         const primaryDefinition = char.definitions?.primary || "暂无释义";
         const secondaryDefinition = char.definitions?.secondary || "暂无释义";
         
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+JSON 读写后端
+安装了 orjson 时用它解析和序列化（解析章节文件约快 3 倍），否则使用标准库 json。
+章节等提交到仓库的文件仍由 chapter_writer.serialize 用标准库写出：orjson 的浮点数写法不同
+（0.0000603 而不是 6.03e-05），换用后所有文件都会改变，不同环境生成的文件也不再逐字节相同。
+
+load_files()/iter_files() 在线程池中并行读取并解析多个文件（默认每个 CPU 核一个线程，单核时顺序读取），解析结果按 (路径, 大小, 修改时间) 缓存在进程内，
+同一次运行的各阶段重复读取时直接返回（文件被改写后自动重新读取）。缓存的数据是共享的，调用方不要修改。
+
+    python json_backend.py --benchmark      对比标准库与 orjson、顺序与并行、冷读与缓存命中的加载耗时
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def loads(data):
+    """解析 bytes 或 str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(data, minify=False):
+    """序列化为 UTF-8 bytes（浮点数写法随后端而不同，只用于缓存等内部文件）"""
+    if orjson is not None:
+        return orjson.dumps(data) if minify else orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    if minify:
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def load_file(path, cache=True):
+    """读取并解析一个 JSON 文件；cache=True 时使用进程内缓存"""
+    stat = os.stat(path)
+    key = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+    if cache:
+        with _cache_lock:
+            if key in _cache:
+                return _cache[key]
+    with open(path, 'rb') as f:
+        data = loads(f.read())
+    if cache:
+        with _cache_lock:
+            _cache[key] = data
+    return data
+
+
+def dump_file(path, data, minify=False):
+    """原子写入 JSON 文件（先写临时文件再替换）"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # 临时文件名唯一，并发写同一路径时不会互相覆盖对方写了一半的临时文件
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(dumps(data, minify))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def iter_files(paths, workers=None, cache=True):
+    """并行读取多个文件，按原顺序逐个产出 (路径, 数据, 异常)；读取失败时数据为 None
+
+    单线程时读一个产出一个，调用方处理完一个文件即可释放它（不缓存时）。
+    """
+    paths = list(paths)
+
+    def load(path):
+        try:
+            return path, load_file(path, cache), None
+        except (OSError, ValueError) as e:
+            return path, None, e
+
+    workers = workers or min(len(paths), os.cpu_count() or 1) or 1
+    if workers == 1:
+        for path in paths:
+            yield load(path)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(load, paths)
+
+
+def load_files(paths, workers=None, cache=True):
+    """并行读取多个文件，按原顺序返回 [(路径, 数据, 异常)]；读取失败时数据为 None"""
+    return list(iter_files(paths, workers, cache))
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def benchmark(paths, repeat=5):
+    """各种读取方式的最短耗时（秒）"""
+    def best(fn):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    def stdlib_sequential():
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                json.load(f)
+
+    def backend_sequential():
+        for path in paths:
+            load_file(path, cache=False)
+
+    results = {
+        "json 顺序": best(stdlib_sequential),
+        f"{BACKEND} 顺序": best(backend_sequential),
+        f"{BACKEND} 并行": best(lambda: load_files(paths, workers=len(paths), cache=False)),
+    }
+    clear_cache()
+    load_files(paths)
+    results["缓存命中"] = best(lambda: load_files(paths))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON 读写后端")
+    parser.add_argument("--benchmark", action="store_true", help="测试读取全部章节数据的耗时")
+    parser.add_argument("--data-dir", default="data", help="章节数据目录")
+    parser.add_argument("--repeat", type=int, default=5, help="每种方式重复次数（取最短）")
+    args = parser.parse_args()
+
+    print(f"后端: {BACKEND}")
+    if not args.benchmark:
+        return
+
+    from ranking_engine import chapter_file, discover_chapter_count
+    chapter_count = discover_chapter_count(args.data_dir)
+    paths = [chapter_file(args.data_dir, chapter) for chapter in range(1, chapter_count + 1)]
+    paths += [path for path in (chapter_file(args.data_dir, 11), os.path.join(args.data_dir, "chapter_characters.json"))
+              if os.path.exists(path)]
+    size = sum(os.path.getsize(path) for path in paths)
+    print(f"{len(paths)} 个文件, {size / 1024:.0f} KB")
+    for name, seconds in benchmark(paths, args.repeat).items():
+        print(f"  {name:<14}{seconds * 1000:>8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
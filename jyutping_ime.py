@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+粤拼输入法候选引擎
+把每个读音（如 "ngo5"，声调数字是最后一个字母）插入一棵字典树，
+建树后自底向上为每个节点预先算好前 K 个候选（按 frequency_rank 排列、同一字只出现一次），
+因此带调（"ngo5"）、不带调（"ngo"）和前缀（"ng"）查询都是沿树走几步后直接取结果。
+多音节词另外以去掉声调的形式插入一次，"ngodei" 也能打出「我哋」。
+
+    python jyutping_ime.py ngo hou2           查询
+    python jyutping_ime.py --batch < 输入      每行一个查询，输出 "查询<TAB>候选"
+    python jyutping_ime.py --benchmark         8105 字和 10 万条合成词库的建树、查询耗时
+"""
+
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+
+from binary_dataset import DATASET_FILE, BinaryDataset
+
+TOP_K = 10
+
+
+class TrieNode:
+    __slots__ = ("children", "entries", "top")
+
+    def __init__(self):
+        self.children = {}
+        self.entries = []   # 读音恰好在此结束的 (排名, 字, 读音)
+        self.top = []       # 子树中排名最靠前的 TOP_K 个 (排名, 字, 读音)
+
+
+def normalize(query):
+    """去掉空格和分隔符并转成小写：Ngo5 dei6 → ngo5dei6"""
+    return "".join(ch for ch in query.lower() if ch.isalnum())
+
+
+def _unique_best(candidates, limit):
+    """按排名顺序取前 limit 个不同的字"""
+    seen = set()
+    result = []
+    for entry in candidates:
+        if entry[1] not in seen:
+            seen.add(entry[1])
+            result.append(entry)
+            if len(result) == limit:
+                break
+    return result
+
+
+class CandidateEngine:
+    def __init__(self, top_k=TOP_K):
+        self.top_k = top_k
+        self.root = TrieNode()
+        self.size = 0
+
+    @classmethod
+    def from_characters(cls, characters, top_k=TOP_K):
+        """由章节记录建树；主读音和第二读音都可以打出该字"""
+        engine = cls(top_k)
+        for record in characters:
+            rank = record.get('frequency_rank', 0)
+            for jyutping in (record.get('jyutping'), record.get('secondary_jyutping')):
+                if jyutping:
+                    engine.add(jyutping, record['char'], rank)
+        return engine.finalize()
+
+    @classmethod
+    def from_dataset(cls, path=DATASET_FILE, top_k=TOP_K):
+        with BinaryDataset(path) as dataset:
+            characters = [dataset.record(i) for i in range(len(dataset))]
+        return cls.from_characters(characters, top_k)
+
+    def _insert(self, path, entry):
+        node = self.root
+        for ch in path:
+            child = node.children.get(ch)
+            if child is None:
+                child = node.children[ch] = TrieNode()
+            node = child
+        node.entries.append(entry)
+
+    def add(self, key, text, rank):
+        """登记一条 (粤拼, 文字, 排名)；加完后调用 finalize()"""
+        path = normalize(key)
+        entry = (rank, text, key)
+        self._insert(path, entry)
+        toneless = "".join(ch for ch in path if not ch.isdigit())
+        # 单音节不带调的输入本来就是带调读音的前缀
+        if " " in key.strip() and toneless != path:
+            self._insert(toneless, entry)
+        self.size += 1
+
+    def finalize(self):
+        """后序遍历，由子节点的前 K 个候选归并出每个节点的前 K 个候选"""
+        stack = [(self.root, False)]
+        while stack:
+            node, visited = stack.pop()
+            if not visited:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children.values())
+                continue
+            node.entries.sort()
+            if node.children:
+                sources = [node.entries] + [child.top for child in node.children.values()]
+                node.top = _unique_best(heapq.merge(*sources), self.top_k)
+            else:
+                node.top = _unique_best(node.entries, self.top_k)
+        return self
+
+    def _find(self, query):
+        node = self.root
+        for ch in normalize(query):
+            node = node.children.get(ch)
+            if node is None:
+                return None
+        return node
+
+    def candidates(self, query, k=None):
+        """以 query 为前缀的候选 [(字, 粤拼)]，按排名排列"""
+        k = k or self.top_k
+        node = self._find(query)
+        if node is None:
+            return []
+        if k <= self.top_k:
+            return [(text, key) for _, text, key in node.top[:k]]
+        # 超过预计算的数量时遍历子树
+        entries = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            entries.extend(current.entries)
+            stack.extend(current.children.values())
+        return [(text, key) for _, text, key in _unique_best(sorted(entries), k)]
+
+    def node_count(self):
+        count = 0
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            count += 1
+            stack.extend(node.children.values())
+        return count
+
+
+def prefixes(keys):
+    """所有读音的所有非空前缀（查询基准用）"""
+    result = set()
+    for key in keys:
+        key = normalize(key)
+        result.update(key[:i] for i in range(1, len(key) + 1))
+    return sorted(result)
+
+
+def synthetic_lexicon(characters, size, seed=0):
+    """由真实读音随机组合出 size 条二至四字词 [(粤拼, 词, 排名)]"""
+    rng = random.Random(seed)
+    readings = [(c['char'], c['jyutping']) for c in characters if c.get('jyutping')]
+    lexicon = []
+    for rank in range(1, size + 1):
+        parts = rng.sample(readings, rng.randint(2, 4))
+        lexicon.append((" ".join(j for _, j in parts), "".join(ch for ch, _ in parts), rank))
+    return lexicon
+
+
+def time_queries(engine, queries, k):
+    start = time.perf_counter()
+    for query in queries:
+        engine.candidates(query, k)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def benchmark(characters, k, lexicon_size):
+    print("=== 候选引擎基准 ===")
+    start = time.perf_counter()
+    engine = CandidateEngine.from_characters(characters, max(k, TOP_K))
+    build_time = time.perf_counter() - start
+    keys = {c['jyutping'] for c in characters if c.get('jyutping')}
+    queries = prefixes(keys)
+    per_query = time_queries(engine, queries, k)
+    print(f"全部汉字: {engine.size} 个读音, {engine.node_count()} 个节点, 建树 {build_time * 1000:.1f} ms")
+    print(f"  {len(queries)} 个前缀查询 (top-{k}): {per_query * 1e6:.2f} µs/次, {1 / per_query:,.0f} 次/秒")
+
+    lexicon = synthetic_lexicon(characters, lexicon_size)
+    start = time.perf_counter()
+    engine = CandidateEngine(max(k, TOP_K))
+    for key, text, rank in lexicon:
+        engine.add(key, text, rank)
+    engine.finalize()
+    build_time = time.perf_counter() - start
+    rng = random.Random(1)
+    sample = [normalize(key)[:rng.randint(1, len(normalize(key)))] for key, _, _ in rng.sample(lexicon, 20000)]
+    per_query = time_queries(engine, sample, k)
+    print(f"合成词库: {engine.size} 条, {engine.node_count()} 个节点, 建树 {build_time:.2f} s")
+    print(f"  {len(sample)} 个随机前缀查询 (top-{k}): {per_query * 1e6:.2f} µs/次, {1 / per_query:,.0f} 次/秒")
+
+
+def run_batch(engine, k, stream=sys.stdin, output=sys.stdout):
+    count = 0
+    start = time.perf_counter()
+    lines = []
+    for line in stream:
+        query = line.strip()
+        if not query:
+            continue
+        lines.append(f"{query}\t{' '.join(text for text, _ in engine.candidates(query, k))}")
+        count += 1
+    output.write("\n".join(lines) + ("\n" if lines else ""))
+    elapsed = time.perf_counter() - start
+    if count:
+        print(f"{count} 个查询, {elapsed * 1000:.1f} ms ({count / elapsed:,.0f} 次/秒)", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="粤拼输入法候选查询")
+    parser.add_argument("queries", nargs="*", help="粤拼或前缀，如 ngo、hou2、ng")
+    parser.add_argument("-k", type=int, default=TOP_K, help="每个查询返回的候选数")
+    parser.add_argument("--dataset", default=DATASET_FILE, help="二进制数据集（见 binary_dataset.py）")
+    parser.add_argument("--batch", action="store_true", help="从标准输入逐行读取查询")
+    parser.add_argument("--benchmark", action="store_true", help="运行基准测试")
+    parser.add_argument("--lexicon-size", type=int, default=100000, help="基准测试的合成词库条数")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.dataset):
+        parser.error(f"找不到 {args.dataset}，请先运行 python binary_dataset.py")
+
+    if args.benchmark:
+        with BinaryDataset(args.dataset) as dataset:
+            characters = [dataset.record(i) for i in range(len(dataset))]
+        benchmark(characters, args.k, args.lexicon_size)
+        return
+
+    engine = CandidateEngine.from_dataset(args.dataset, max(args.k, TOP_K))
+    if args.batch:
+        run_batch(engine, args.k)
+        return
+    for query in args.queries:
+        candidates = engine.candidates(query, args.k)
+        print(f"{query}: " + " ".join(f"{text}({key})" for text, key in candidates))
+
+
+if __name__ == "__main__":
+    main()
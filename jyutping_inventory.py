@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+粤拼音节表与整数读音编码
+从数据集收集不带声调的音节（只追加、不重排，已生成的编码不会失效），
+每个读音编码为一个小整数：
+
+    音节序号 * 8 + 声调（1-6）
+
+无法拆成「音节 + 声调」的读音（空字符串、多音节如 "saa1 aa6"）放进例外表，
+编码为 例外序号 * 8 + 7。例外序号与音节序号各自从 0 编起，code >> 3 相同不代表读音相同：
+按音节分组时先用 is_irregular() 排除例外读音（或以 (is_irregular(code), code >> 3) 为键）。
+"""
+
+import argparse
+import json
+import os
+import re
+
+INVENTORY_NAME = "jyutping_inventory.json"
+INVENTORY_FILE = os.path.join("data", INVENTORY_NAME)
+INVENTORY_VERSION = 1
+
+IRREGULAR_TONE = 7
+READING_PATTERN = re.compile(r"([a-z]+)([1-6])")
+
+
+def split_reading(jyutping):
+    """"dik1" → ("dik", 1)；不是单个带调音节时返回 None"""
+    match = READING_PATTERN.fullmatch(jyutping)
+    return (match.group(1), int(match.group(2))) if match else None
+
+
+def tone_of(code):
+    return code & 7
+
+
+def syllable_of(code):
+    return code >> 3
+
+
+def is_irregular(code):
+    return code & 7 == IRREGULAR_TONE
+
+
+class JyutpingInventory:
+    def __init__(self, syllables=(), irregular=()):
+        self.syllables = list(syllables)
+        self.irregular = list(irregular)
+        self._syllable_ids = {s: i for i, s in enumerate(self.syllables)}
+        self._irregular_ids = {s: i for i, s in enumerate(self.irregular)}
+
+    @classmethod
+    def load(cls, path=INVENTORY_FILE):
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data.get("syllables", []), data.get("irregular", []))
+
+    def to_json(self):
+        return {"version": INVENTORY_VERSION, "syllables": self.syllables, "irregular": self.irregular}
+
+    def add(self, jyutping):
+        """登记读音并返回编码"""
+        parts = split_reading(jyutping)
+        if parts is None:
+            if jyutping not in self._irregular_ids:
+                self._irregular_ids[jyutping] = len(self.irregular)
+                self.irregular.append(jyutping)
+            return self._irregular_ids[jyutping] * 8 + IRREGULAR_TONE
+        syllable, tone = parts
+        if syllable not in self._syllable_ids:
+            self._syllable_ids[syllable] = len(self.syllables)
+            self.syllables.append(syllable)
+        return self._syllable_ids[syllable] * 8 + tone
+
+    def add_characters(self, characters):
+        """登记一批记录中的主读音和第二读音，返回新增的条目数"""
+        before = len(self.syllables) + len(self.irregular)
+        for record in characters:
+            self.add(record.get('jyutping', ''))
+            if record.get('secondary_jyutping') is not None:
+                self.add(record['secondary_jyutping'])
+        return len(self.syllables) + len(self.irregular) - before
+
+    def encode(self, jyutping):
+        """读音 → 编码；None 表示没有该字段，表中没有的读音抛出 KeyError"""
+        if jyutping is None:
+            return None
+        parts = split_reading(jyutping)
+        if parts is None:
+            return self._irregular_ids[jyutping] * 8 + IRREGULAR_TONE
+        return self._syllable_ids[parts[0]] * 8 + parts[1]
+
+    def decode(self, code):
+        if code is None:
+            return None
+        if is_irregular(code):
+            return self.irregular[code >> 3]
+        return f"{self.syllables[code >> 3]}{code & 7}"
+
+    def syllable(self, code):
+        """不带声调的音节（例外读音原样返回）"""
+        return self.irregular[code >> 3] if is_irregular(code) else self.syllables[code >> 3]
+
+    def encode_record(self, record):
+        """章节记录 → 紧凑行 [字, 读音, 排名, 频率, 第二读音, 声调]
+
+        第二读音缺失时为 null；声调与读音编码一致时省略，末尾的 null 也省略。
+        """
+        reading = self.encode(record.get('jyutping', ''))
+        row = [record['char'], reading, record.get('frequency_rank', 0), record.get('wordfreq_score', 0),
+               self.encode(record.get('secondary_jyutping'))]
+        tone = record.get('tone', 0)
+        if is_irregular(reading) or tone != tone_of(reading):
+            row.append(tone)
+        while row[-1] is None:
+            row.pop()
+        return row
+
+    def decode_row(self, row):
+        """encode_record 的逆操作"""
+        reading = row[1]
+        record = {
+            'char': row[0],
+            'jyutping': self.decode(reading),
+            'tone': row[5] if len(row) > 5 else tone_of(reading),
+            'frequency_rank': row[2],
+            'wordfreq_score': row[3],
+        }
+        if len(row) > 4 and row[4] is not None:
+            record['secondary_jyutping'] = self.decode(row[4])
+        return record
+
+    def save(self, path=INVENTORY_FILE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_json(), f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+
+def update_inventory(characters, data_dir="data"):
+    """读取 data/jyutping_inventory.json，登记新读音（有新增时写回）"""
+    path = os.path.join(data_dir, INVENTORY_NAME)
+    inventory = JyutpingInventory.load(path)
+    if inventory.add_characters(characters) or not os.path.exists(path):
+        inventory.save(path)
+    return inventory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成粤拼音节表")
+    parser.add_argument("--data-dir", default="data", help="章节数据目录")
+    args = parser.parse_args()
+
+    from chapter_pages import is_ranked_chapter, load_manifest
+    from ranking_engine import chapter_file, discover_chapter_count, load_characters
+
+    characters = load_characters(args.data_dir, discover_chapter_count(args.data_dir))
+    for entry in load_manifest(args.data_dir):
+        if not is_ranked_chapter(entry):
+            with open(chapter_file(args.data_dir, entry['id']), 'r', encoding='utf-8') as f:
+                characters.extend(json.load(f))
+    inventory = update_inventory(characters, args.data_dir)
+
+    plain = json.dumps(characters, ensure_ascii=False, separators=(',', ':'), default=dict)
+    packed = json.dumps([inventory.encode_record(c) for c in characters], ensure_ascii=False, separators=(',', ':'))
+    groups = {}
+    irregular = 0
+    for c in characters:
+        code = inventory.encode(c.get('jyutping', ''))
+        # 例外读音的 code >> 3 是例外序号，与音节序号不可比，不参与分组（与 reverse_index 相同）
+        if is_irregular(code):
+            irregular += 1
+            continue
+        groups.setdefault(syllable_of(code), []).append(c['char'])
+    print(f"音节: {len(inventory.syllables)} 个, 例外读音: {inventory.irregular}")
+    print(f"同音字组: {len(groups)} 个, 最大一组 {max(len(g) for g in groups.values())} 个字"
+          f"（另有 {irregular} 个字的读音为例外读音）")
+    print(f"记录体积: {len(plain.encode('utf-8')) / 1024:.1f} KB → {len(packed.encode('utf-8')) / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+例词挖掘
+流式读取词表或语料，为每个汉字保留出现频率最高的 K 个词（每个字一个大小为 K 的最小堆），
+按章节写成分片：
+    data/examples/chapter_N.json   {"words": {字: [词, ...]}, "readings": {"字|读音编码": [词, ...]}}
+词表带粤拼时另按读音分组（readings），多音字可以按读音显示例词；读音编码见 jyutping_inventory.py。
+
+词的来源（三选一）：
+    默认            wordfreq 的中文词表
+    --wordlist      每行 "词[<TAB>频率[<TAB>粤拼]]"，没有频率时按行号（越靠前越常用）
+    --corpus        纯文本语料，用 jieba 分词后计数；计数采用 lossy counting，
+                    内存只与 1/误差 有关，与语料大小无关
+
+堆的总大小不超过 汉字数 × K，与词表长度无关。
+"""
+
+import argparse
+import heapq
+import itertools
+import math
+import os
+
+from build_audio_index import load_chapter
+from build_corpus_frequency import is_cjk
+from chapter_pages import is_ranked_chapter, load_manifest
+from chapter_writer import write_files
+from jyutping_inventory import update_inventory
+from pipeline_trace import log, warn
+from ranking_engine import DATA_DIR, discover_chapter_count
+
+EXAMPLES_DIR = "examples"
+TOP_K = 3
+MAX_WORD_LENGTH = 4
+LOSSY_ERROR = 1e-6
+
+
+class TopWords:
+    """每个键（字或「字|读音」）一个大小为 k 的最小堆"""
+
+    def __init__(self, k=TOP_K):
+        self.k = k
+        self.heaps = {}
+        self._sequence = itertools.count()
+
+    def push(self, key, score, word):
+        heap = self.heaps.setdefault(key, [])
+        # 频率相同时先出现的词优先（序号取负，后出现的词先被挤出）
+        item = (score, -next(self._sequence), word)
+        if len(heap) < self.k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    def words(self, key):
+        return [word for _, _, word in sorted(self.heaps.get(key, ()), reverse=True)]
+
+
+class LossyCounter:
+    """Lossy counting（Manku & Motwani）：计数误差不超过 error × 总数，条目数为 O(1/error · log(error·N))"""
+
+    def __init__(self, error=LOSSY_ERROR):
+        self.width = math.ceil(1 / error)
+        self.entries = {}
+        self.total = 0
+        self.bucket = 1
+
+    def add(self, item):
+        entry = self.entries.get(item)
+        if entry is None:
+            self.entries[item] = [1, self.bucket - 1]
+        else:
+            entry[0] += 1
+        self.total += 1
+        if self.total % self.width == 0:
+            self.entries = {key: entry for key, entry in self.entries.items() if sum(entry) > self.bucket}
+            self.bucket += 1
+
+    def items(self):
+        return ((item, entry[0]) for item, entry in self.entries.items())
+
+
+def candidate_word(word, max_length=MAX_WORD_LENGTH):
+    return 2 <= len(word) <= max_length and all(is_cjk(ch) for ch in word)
+
+
+def read_wordlist(path):
+    """逐行产生 (词, 频率, 粤拼或 None)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f):
+            fields = line.rstrip("\n").split("\t") if "\t" in line else line.split(maxsplit=2)
+            if not fields or not fields[0] or fields[0].startswith("#"):
+                continue
+            try:
+                score = float(fields[1]) if len(fields) > 1 and fields[1] else -line_number
+            except ValueError:
+                score = -line_number
+            yield fields[0], score, fields[2].strip() if len(fields) > 2 and fields[2].strip() else None
+
+
+def wordfreq_words(lang="zh"):
+    import wordfreq
+    for word, freq in wordfreq.get_frequency_dict(lang).items():
+        yield word, freq, None
+
+
+def corpus_words(paths, targets, error=LOSSY_ERROR, max_length=MAX_WORD_LENGTH):
+    """jieba 分词并用 LossyCounter 计数，产生 (词, 次数, None)"""
+    try:
+        import jieba
+    except ImportError:
+        raise SystemExit("统计语料需要安装 jieba（pip install jieba）")
+
+    counter = LossyCounter(error)
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                for word in jieba.cut(line.strip()):
+                    if candidate_word(word, max_length) and any(ch in targets for ch in word):
+                        counter.add(word)
+    log(f"语料: {counter.total} 个候选词, 保留 {len(counter.entries)} 个计数")
+    for word, count in counter.items():
+        yield word, count, None
+
+
+def mine(words, targets, k=TOP_K, max_length=MAX_WORD_LENGTH):
+    """把 (词, 频率, 粤拼) 流分配到各字的堆中"""
+    top = TopWords(k)
+    scanned = 0
+    for word, score, jyutping in words:
+        scanned += 1
+        if not candidate_word(word, max_length):
+            continue
+        syllables = jyutping.split() if jyutping else []
+        aligned = len(syllables) == len(word)
+        for i, char in enumerate(word):
+            if char not in targets or char in word[:i]:
+                continue
+            top.push(char, score, word)
+            if aligned:
+                top.push((char, syllables[i]), score, word)
+    return top, scanned
+
+
+def load_target_chapters(data_dir=DATA_DIR):
+    """{章节: 汉字记录}（含多音字专栏等特殊章节）"""
+    chapters = list(range(1, discover_chapter_count(data_dir) + 1))
+    chapters += [entry['id'] for entry in load_manifest(data_dir) if not is_ranked_chapter(entry)]
+    loaded = {chapter: load_chapter(data_dir, chapter) for chapter in chapters}
+    return {chapter: characters for chapter, characters in loaded.items() if characters is not None}
+
+
+def shard_files(chapters, top, inventory, data_dir=DATA_DIR):
+    files = []
+    for chapter, characters in chapters.items():
+        shard = {"words": {}, "readings": {}}
+        for record in characters:
+            char = record['char']
+            words = top.words(char)
+            if words:
+                shard["words"][char] = words
+            for jyutping in (record.get('jyutping'), record.get('secondary_jyutping')):
+                reading_words = top.words((char, jyutping)) if jyutping else []
+                if reading_words:
+                    shard["readings"][f"{char}|{inventory.encode(jyutping)}"] = reading_words
+        files.append((os.path.join(data_dir, EXAMPLES_DIR, f"chapter_{chapter}.json"), shard))
+    return files
+
+
+def write_examples(files, data_dir=DATA_DIR):
+    examples_dir = os.path.join(data_dir, EXAMPLES_DIR)
+    keep = {os.path.basename(path) for path, _ in files}
+    if os.path.isdir(examples_dir):
+        for name in os.listdir(examples_dir):
+            if name.endswith(".json") and name not in keep:
+                os.remove(os.path.join(examples_dir, name))
+    return write_files(files, minify=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="为每个汉字挖掘最常用的例词，按章节写成分片")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--wordlist", help="词表文件：每行 词[<TAB>频率[<TAB>粤拼]]")
+    source.add_argument("--corpus", nargs="+", help="纯文本语料（需要 jieba）")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="章节数据目录")
+    parser.add_argument("-k", type=int, default=TOP_K, help="每个字保留的例词数")
+    parser.add_argument("--max-length", type=int, default=MAX_WORD_LENGTH, help="例词最大字数")
+    parser.add_argument("--error", type=float, default=LOSSY_ERROR, help="语料计数允许的相对误差")
+    args = parser.parse_args()
+
+    chapters = load_target_chapters(args.data_dir)
+    all_characters = [record for characters in chapters.values() for record in characters]
+    targets = {record['char'] for record in all_characters}
+
+    if args.wordlist:
+        words = read_wordlist(args.wordlist)
+    elif args.corpus:
+        words = corpus_words(args.corpus, targets, args.error, args.max_length)
+    else:
+        words = wordfreq_words()
+
+    top, scanned = mine(words, targets, args.k, args.max_length)
+    inventory = update_inventory(all_characters, args.data_dir)
+    files = shard_files(chapters, top, inventory, args.data_dir)
+    written = write_examples(files, args.data_dir)
+
+    covered = sum(len(shard["words"]) for _, shard in files)
+    readings = sum(len(shard["readings"]) for _, shard in files)
+    print(f"扫描 {scanned} 个词, {len(targets)} 个汉字中 {covered} 个有例词"
+          + (f", {readings} 个读音有按读音分组的例词" if readings else ""))
+    print(f"✅ 已写入 {len(written)} 个分片到 {os.path.join(args.data_dir, EXAMPLES_DIR)}/ "
+          f"({sum(size for _, size in written) / 1024:.1f} KB)")
+    missing = [char for char in sorted(targets) if char not in top.heaps]
+    if missing:
+        warn(f"没有例词的字 {len(missing)} 个: {''.join(missing[:60])}{'…' if len(missing) > 60 else ''}")
+
+
+if __name__ == "__main__":
+    main()
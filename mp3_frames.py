@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+MP3 帧解析
+只读取帧头，不解码音频：跳过 ID3 标签，按帧头计算每帧长度和时长，
+识别编码器写入的 Xing/Info/VBRI 信息帧
+"""
+
+import struct
+
+# 比特率表（kbps），按 (MPEG-1, 层) 与 (MPEG-2/2.5, 层) 区分
+BITRATES = {
+    (1, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (2, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (2, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+SAMPLE_RATES = {1: [44100, 48000, 32000], 2: [22050, 24000, 16000], 2.5: [11025, 12000, 8000]}
+VERSIONS = {0b00: 2.5, 0b10: 2, 0b11: 1}
+LAYERS = {0b01: 3, 0b10: 2, 0b11: 1}
+INFO_TAGS = (b"Xing", b"Info", b"VBRI")
+
+
+class FrameHeader:
+    __slots__ = ("version", "layer", "bitrate", "sample_rate", "padding", "channel_mode", "length", "samples")
+
+    def __init__(self, version, layer, bitrate, sample_rate, padding, channel_mode):
+        self.version = version
+        self.layer = layer
+        self.bitrate = bitrate
+        self.sample_rate = sample_rate
+        self.padding = padding
+        self.channel_mode = channel_mode
+        if layer == 1:
+            self.samples = 384
+            self.length = (12 * bitrate * 1000 // sample_rate + padding) * 4
+        else:
+            self.samples = 1152 if version == 1 or layer == 2 else 576
+            self.length = self.samples // 8 * bitrate * 1000 // sample_rate + padding
+
+    @property
+    def duration(self):
+        return self.samples / self.sample_rate
+
+    @property
+    def stream_format(self):
+        """拼接时必须一致的参数"""
+        return (self.version, self.layer, self.sample_rate, self.channel_mode)
+
+
+def parse_header(data, offset):
+    """解析 offset 处的帧头，不是合法帧头时返回 None"""
+    if offset + 4 > len(data):
+        return None
+    (word,) = struct.unpack_from(">I", data, offset)
+    if word >> 21 != 0x7FF:
+        return None
+    version = VERSIONS.get((word >> 19) & 0b11)
+    layer = LAYERS.get((word >> 17) & 0b11)
+    bitrate_index = (word >> 12) & 0b1111
+    rate_index = (word >> 10) & 0b11
+    if version is None or layer is None or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    bitrate = BITRATES[(1 if version == 1 else 2, layer)][bitrate_index]
+    sample_rate = SAMPLE_RATES[version][rate_index]
+    return FrameHeader(version, layer, bitrate, sample_rate, (word >> 9) & 1, (word >> 6) & 0b11)
+
+
+def id3v2_size(data):
+    """开头 ID3v2 标签的总长度（没有时为 0）"""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def audio_end(data):
+    """去掉结尾 ID3v1 / APE 标签后的长度"""
+    end = len(data)
+    if end >= 128 and data[end - 128:end - 125] == b"TAG":
+        end -= 128
+    return end
+
+
+def is_info_frame(data, offset, header):
+    """编码器信息帧只有元数据，不含音频"""
+    window = data[offset + 4:offset + min(header.length, 48)]
+    return any(tag in window for tag in INFO_TAGS)
+
+
+def iter_frames(data):
+    """依次返回 (偏移, 帧头)；遇到无法解析的数据时停止"""
+    offset = id3v2_size(data)
+    end = audio_end(data)
+    while offset < end:
+        header = parse_header(data, offset)
+        if header is None or offset + header.length > end:
+            break
+        yield offset, header
+        offset += header.length
+
+
+def audio_frames(data):
+    """音频帧列表 [(偏移, 帧头)]，不含开头的信息帧"""
+    frames = list(iter_frames(data))
+    if frames and is_info_frame(data, *frames[0]):
+        frames = frames[1:]
+    return frames
+
+
+def inspect(data):
+    """逐帧检查整个文件，返回 (音频帧列表, 问题)
+
+    问题为 None，或 (类型, 偏移)：
+        "empty"      没有任何可解析的帧
+        "truncated"  最后一帧不完整（文件被截断）
+        "garbage"    帧之间出现无法解析的数据（文件损坏）
+    """
+    offset = id3v2_size(data)
+    end = audio_end(data)
+    frames = []
+    problem = None
+    while offset < end:
+        header = parse_header(data, offset)
+        if header is None:
+            # 结尾的 APEv2 标签不算损坏
+            if data[offset:offset + 8] != b"APETAGEX":
+                problem = ("garbage", offset)
+            break
+        if offset + header.length > end:
+            problem = ("truncated", offset)
+            break
+        frames.append((offset, header))
+        offset += header.length
+    if frames and is_info_frame(data, *frames[0]):
+        frames = frames[1:]
+    if not frames:
+        problem = ("empty", offset)
+    return frames, problem
+
+
+def describe(path):
+    """读取文件并统计帧数、时长与格式"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    frames = audio_frames(data)
+    if not frames:
+        return None
+    first = frames[0][1]
+    return {
+        "frames": len(frames),
+        "duration": sum(header.duration for _, header in frames),
+        "sample_rate": first.sample_rate,
+        "bitrate": first.bitrate,
+        "channels": 1 if first.channel_mode == 0b11 else 2,
+        "audio_bytes": sum(header.length for _, header in frames),
+    }
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+排序流水线的阶段计时、计数与进度输出
+各模块通过本模块的 log()/stage()/count() 输出进度和记录数据，而不是直接 print：
+
+    with stage("score"):          阶段耗时（可嵌套），开启 tracemalloc 时另记内存峰值和主要分配位置
+    count("files_written", 3)     计数器（加载记录数、缓存命中、写入文件数和字节数等）
+    log("...")                    进度输出；安静模式下不显示
+    warn("...")                   错误和警告，始终输出到 stderr
+
+默认的全局 trace 只负责输出；命令行入口用 use_trace() 换成新的 PipelineTrace，
+运行结束后 write() 写成 JSON 文件（默认 .cache/traces/）。
+"""
+
+import contextlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+TRACE_DIR = os.path.join(".cache", "traces")
+TOP_ALLOCATIONS = 5
+
+
+class PipelineTrace:
+    def __init__(self, quiet=False, trace_memory=False):
+        self.quiet = quiet
+        self.trace_memory = trace_memory
+        self.started = time.time()
+        self._origin = time.perf_counter()
+        self.stages = []
+        self.counters = {}
+        self._stack = []
+        self._started_tracemalloc = False
+        # 从创建 trace 起跟踪内存，各阶段的峰值都是相对这一时刻的绝对值
+        if trace_memory:
+            self._start_tracemalloc()
+
+    def log(self, *args, **kwargs):
+        if not self.quiet:
+            print(*args, **kwargs)
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        record = {
+            "name": name,
+            "parent": self._stack[-1]["name"] if self._stack else None,
+            "start": round(time.perf_counter() - self._origin, 6),
+        }
+        if self.trace_memory:
+            # 子阶段会重置峰值，先把目前的峰值记到外层阶段上
+            self._propagate_peak()
+            tracemalloc.reset_peak()
+            record["_snapshot"] = tracemalloc.take_snapshot()
+            record["_peak"] = 0
+        self._stack.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = round(time.perf_counter() - start, 6)
+            self._stack.pop()
+            if self.trace_memory:
+                self._finish_memory(record)
+            self.stages.append(record)
+
+    def _start_tracemalloc(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def _propagate_peak(self):
+        peak = tracemalloc.get_traced_memory()[1]
+        for outer in self._stack:
+            outer["_peak"] = max(outer["_peak"], peak)
+
+    def _finish_memory(self, record):
+        current, peak = tracemalloc.get_traced_memory()
+        record["_peak"] = max(record["_peak"], peak)
+        for outer in self._stack:
+            outer["_peak"] = max(outer["_peak"], record["_peak"])
+        tracemalloc.reset_peak()
+
+        # 快照对比很慢（每次约 1 秒），留到写出 JSON 时再算，以免计入外层阶段的耗时
+        record["_snapshots"] = (record.pop("_snapshot"), tracemalloc.take_snapshot())
+        record["memory"] = {
+            "current_mb": round(current / 2 ** 20, 2),
+            "peak_mb": round(record.pop("_peak") / 2 ** 20, 2),
+        }
+
+    @staticmethod
+    def _top_allocations(before, after):
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        growth = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+        return [
+            {"where": str(stat.traceback[0]), "size_diff_kb": round(stat.size_diff / 1024, 1),
+             "count_diff": stat.count_diff}
+            for stat in growth[:TOP_ALLOCATIONS]
+        ]
+
+    def _resolve_snapshots(self):
+        for record in self.stages:
+            snapshots = record.pop("_snapshots", None)
+            if snapshots is not None:
+                record["memory"]["top_allocations"] = self._top_allocations(*snapshots)
+
+    def to_json(self):
+        self._resolve_snapshots()
+        if self._started_tracemalloc and not self._stack:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        return {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "seconds": round(time.perf_counter() - self._origin, 6),
+            "argv": sys.argv,
+            "tracemalloc": self.trace_memory,
+            "stages": sorted(self.stages, key=lambda record: record["start"]),
+            "counters": self.counters,
+        }
+
+    def write(self, path=None):
+        """写出 JSON；不指定路径时写到 .cache/traces/ 下按时间命名的文件"""
+        if path is None:
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+            path = os.path.join(TRACE_DIR, f"trace-{stamp}-{os.getpid()}.json")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_json(), f, ensure_ascii=False, indent=2)
+        return path
+
+    def summary(self):
+        """顶层阶段耗时和计数器的一行摘要"""
+        parts = [f"{record['name']} {record['seconds'] * 1000:.0f} ms"
+                 for record in sorted(self.stages, key=lambda record: record["start"])
+                 if record["parent"] is None]
+        parts += [f"{name}={value}" for name, value in sorted(self.counters.items())]
+        return ", ".join(parts)
+
+
+_active = PipelineTrace()
+
+
+def active_trace():
+    return _active
+
+
+@contextlib.contextmanager
+def use_trace(trace):
+    """在 with 块内把 trace 设为全局 trace"""
+    global _active
+    previous, _active = _active, trace
+    try:
+        yield trace
+    finally:
+        _active = previous
+
+
+def log(*args, **kwargs):
+    _active.log(*args, **kwargs)
+
+
+def warn(*args):
+    print(*args, file=sys.stderr)
+
+
+def count(name, value=1):
+    _active.count(name, value)
+
+
+def stage(name):
+    return _active.stage(name)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+多个排名的融合
+把任意多个已排好序的来源（各评分器的排名、字频表、排名文件）合成一个排名：
+
+    rrf     倒数排名融合  Σ 权重 / (k + 名次)          k 默认 60，名次靠前的差别更大
+    borda   Borda 计数     Σ 权重 × (n - 名次 + 1) / n  n 为该来源的长度，各名次等距
+
+各来源已经按名次排好，用 heapq.merge 按名次做 k 路归并，一遍累加得分并记下每个字在各来源中的名次，
+不重新计算任何来源的得分。某来源中没有的字在该来源得 0 分，名次记为 None。
+融合结果的每条记录带 source_ranks（{来源: 名次}）和 fusion_score，便于核对。
+
+    python ranking_engine.py fusion                                    三个评分器等权融合
+    python ranking_engine.py fusion --fusion-sources wordfreq:2 real --fusion-method borda
+    python rank_fusion.py wordfreq real:0.5 data/corpus_frequency.json 只比较，不写回
+"""
+
+import argparse
+import heapq
+import json
+import os
+
+from pipeline_trace import log
+
+METHODS = ("rrf", "borda")
+RRF_K = 60
+DEFAULT_SOURCES = ("wordfreq", "real", "common")
+
+
+def parse_source(spec):
+    """"wordfreq:2" → ("wordfreq", 2.0)；没有权重时为 1"""
+    name, sep, weight = spec.rpartition(":")
+    if sep:
+        try:
+            return name, float(weight)
+        except ValueError:
+            pass
+    return spec, 1.0
+
+
+def load_ranking(path):
+    """从文件读取按名次排列的字：
+    字频表（build_corpus_frequency.py 的 chars）、带 frequency_rank 的记录列表、字的列表，或每行一个字的文本
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if not path.endswith(".json"):
+            return [line.split()[0] for line in f if line.strip()]
+        data = json.load(f)
+    if isinstance(data, dict):
+        if "chars" in data:
+            return list(data["chars"])
+        data = [record for records in data.values() for record in records]
+    if data and isinstance(data[0], dict):
+        return [record['char'] for record in sorted(data, key=lambda record: record.get('frequency_rank', 0))]
+    return list(data)
+
+
+def ranked_stream(source, chars):
+    return ((rank, source, char) for rank, char in enumerate(chars, 1))
+
+
+def fuse(rankings, weights=None, method="rrf", k=RRF_K):
+    """融合多个排名
+
+    rankings 为 {来源: 按名次排列的字}，weights 为 {来源: 权重}。
+    返回按融合得分从高到低排列的 [(字, 得分, {来源: 名次})]；得分相同时，最好名次靠前的在前。
+    """
+    if method not in METHODS:
+        raise ValueError(f"未知的融合方法: {method}（可选: {', '.join(METHODS)}）")
+    weights = weights or {}
+    names = list(rankings)
+    lengths = {name: len(rankings[name]) for name in names}
+
+    def contribution(name, rank):
+        weight = weights.get(name, 1.0)
+        if method == "rrf":
+            return weight / (k + rank)
+        return weight * (lengths[name] - rank + 1) / lengths[name]
+
+    scores = {}
+    source_ranks = {}
+    streams = [ranked_stream(i, rankings[name]) for i, name in enumerate(names)]
+    # 按名次归并：字第一次出现的顺序就是其最好名次的顺序，用作同分时的次序
+    for rank, i, char in heapq.merge(*streams):
+        name = names[i]
+        ranks = source_ranks.get(char)
+        if ranks is None:
+            ranks = source_ranks[char] = dict.fromkeys(names)
+            scores[char] = 0.0
+        if ranks[name] is None:
+            ranks[name] = rank
+            scores[char] += contribution(name, rank)
+
+    fused = sorted(scores, key=scores.__getitem__, reverse=True)
+    return [(char, scores[char], source_ranks[char]) for char in fused]
+
+
+def displacement(fused, name):
+    """融合排名与某来源相比，名次的平均和最大变化（只计该来源中有的字）"""
+    moves = [abs(position - ranks[name]) for position, (_, _, ranks) in enumerate(fused, 1)
+             if ranks[name] is not None]
+    if not moves:
+        return 0.0, 0
+    return sum(moves) / len(moves), max(moves)
+
+
+def generate_report(ranked_characters, sources, weights, method, k, data_dir="data"):
+    """data/fusion_sorting_report.json：来源与权重、各来源的名次偏移、融合后的首尾各 100 字"""
+    fused = [(c['char'], c.get('fusion_score', 0.0), c.get('source_ranks', {})) for c in ranked_characters]
+    report = {
+        "method": method,
+        "rrf_k": k if method == "rrf" else None,
+        "sources": [{"name": name, "weight": weights.get(name, 1.0)} for name in sources],
+        "total_characters": len(ranked_characters),
+        "displacement": {},
+        "top_100_chars": [],
+        "bottom_100_chars": [],
+    }
+    for name in sources:
+        mean, worst = displacement(fused, name)
+        report["displacement"][name] = {"mean": round(mean, 2), "max": worst}
+
+    def summary(record):
+        return {
+            "char": record['char'],
+            "jyutping": record.get('jyutping', ''),
+            "frequency_rank": record['frequency_rank'],
+            "fusion_score": record.get('fusion_score'),
+            "source_ranks": record.get('source_ranks', {}),
+        }
+
+    report["top_100_chars"] = [summary(record) for record in ranked_characters[:100]]
+    report["bottom_100_chars"] = [summary(record) for record in ranked_characters[-100:]]
+
+    report_file = os.path.join(data_dir, 'fusion_sorting_report.json')
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    log(f"\n统计报告已保存: {report_file}")
+
+    log(f"\n=== 排名融合统计报告（{method}）===")
+    for name in sources:
+        moves = report["displacement"][name]
+        log(f"  {name} (权重 {weights.get(name, 1.0):g}): 名次平均变化 {moves['mean']}, 最大 {moves['max']}")
+    log("\n前20个汉字:")
+    for i, record in enumerate(ranked_characters[:20], 1):
+        ranks = ", ".join(f"{name} {rank}" for name, rank in record.get('source_ranks', {}).items())
+        log(f"  {i:2d}. {record['char']} ({record.get('jyutping', '')}) - {ranks}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="融合多个排名并与各来源比较（不写回章节）")
+    parser.add_argument("sources", nargs="*", default=list(DEFAULT_SOURCES),
+                        help="评分器名称或排名文件，可加权重如 wordfreq:2")
+    parser.add_argument("--method", choices=METHODS, default="rrf", help="融合方法")
+    parser.add_argument("-k", type=float, default=RRF_K, help="倒数排名融合的 k")
+    parser.add_argument("--data-dir", default="data", help="章节数据目录")
+    parser.add_argument("--top", type=int, default=30, help="显示前几名")
+    args = parser.parse_args()
+
+    from ranking_engine import FusionScorer, RankingEngine
+
+    scorer = FusionScorer(args.sources, args.method, args.k)
+    ranked = RankingEngine(args.data_dir).rank(scorer)
+    print(f"{'名次':>4} 字  融合得分   " + "".join(f"{name:>12}" for name in scorer.sources))
+    for record in ranked[:args.top]:
+        ranks = "".join(f"{'-' if rank is None else rank:>12}" for rank in record['source_ranks'].values())
+        print(f"{record['frequency_rank']:>4} {record['char']}  {record['fusion_score']:.6f}{ranks}")
+    for name in scorer.sources:
+        mean, worst = displacement([(c['char'], c['fusion_score'], c['source_ranks']) for c in ranked], name)
+        print(f"与 {name} 相比: 名次平均变化 {mean:.1f}, 最大 {worst}")
+
+
+if __name__ == "__main__":
+    main()
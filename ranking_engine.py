@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+统一的汉字排序引擎
+一次加载章节数据，通过可插拔的评分器在同一进程内生成多种排名
+"""
+
+import argparse
+import os
+import time
+
+from binary_dataset import DATASET_NAME, audio_characters, write_dataset
+from chapter_pages import MANIFEST_FILE, PAGE_SIZE, build_pages, is_ranked_chapter, load_manifest, remove_stale_pages
+from chapter_writer import COMPRESSIONS, ChapterWriteLock, write_files
+from json_backend import iter_files
+from jyutping_inventory import update_inventory
+from pipeline_trace import PipelineTrace, count, log, stage, use_trace, warn
+from record_store import make_records
+from reverse_index import INDEX_DIR, write_reverse_index
+from snapshot_store import SnapshotStore
+
+DATA_DIR = "data"
+CHAPTER_COUNT = 10
+
+
+def chapter_file(data_dir, chapter):
+    """章节数据文件路径"""
+    return os.path.join(data_dir, f"chapter_{chapter}_characters.json")
+
+
+def discover_chapter_count(data_dir=DATA_DIR):
+    """当前的章节数量：以 chapters.json 中按排名划分的章节为准，没有清单时用默认值"""
+    count = sum(1 for entry in load_manifest(data_dir) if is_ranked_chapter(entry))
+    return count or CHAPTER_COUNT
+
+
+def load_characters(data_dir=DATA_DIR, chapter_count=CHAPTER_COUNT):
+    """按章节顺序收集所有汉字（紧凑的 Record，见 record_store.py）"""
+    all_characters = []
+    paths = [chapter_file(data_dir, chapter) for chapter in range(1, chapter_count + 1)]
+    # 在线程池中并行读取和解析（见 json_backend.py），按章节顺序转换合并；
+    # 不放进进程内缓存，转换后解析出的 dict 即可释放
+    for chapter, (_, data, error) in enumerate(iter_files(paths, cache=False), 1):
+        if error is not None:
+            warn(f"  第{chapter}章加载失败: {error}")
+            continue
+        all_characters.extend(make_records(data))
+        log(f"  第{chapter}章: 加载了{len(data)}个汉字")
+
+    count("records_loaded", len(all_characters))
+    log(f"总共收集到 {len(all_characters)} 个汉字")
+    return all_characters
+
+
+def chapter_sizes(total_chars, chapter_count=CHAPTER_COUNT):
+    """各章的字数：平均分配，余数依次分给前面的章节"""
+    chars_per_chapter, remainder = divmod(total_chars, chapter_count)
+    return [chars_per_chapter + (1 if chapter <= remainder else 0) for chapter in range(1, chapter_count + 1)]
+
+
+def split_into_chapters(ranked_characters, chapter_count=CHAPTER_COUNT):
+    """按章节平均分组（余数依次分给前面的章节）"""
+    chapters = []
+    start_index = 0
+    for size in chapter_sizes(len(ranked_characters), chapter_count):
+        chapters.append(ranked_characters[start_index:start_index + size])
+        start_index += size
+    return chapters
+
+
+class Scorer:
+    """评分器基类
+
+    子类实现 score()；reverse 为 True 表示得分越高越常用。
+    streaming 为 True 表示 prepare() 只需要当前这一批记录，可以分批评分（见 external_sort.py）。
+    """
+
+    name = ""
+    description = ""
+    reverse = False
+    snapshot_label = None
+    streaming = False
+
+    def prepare(self, characters):
+        """排序前的一次性准备（加载频率表等）"""
+
+    def score(self, char_data):
+        raise NotImplementedError
+
+    def vector_rank(self, characters):
+        """向量化评分（需要 numpy），返回 (排序后的下标数组, 得分数组)"""
+        raise NotImplementedError(f"评分器 {self.name} 不支持向量化")
+
+    def annotate(self, char_data, score):
+        """把得分写回排名后的记录（默认不写）"""
+
+    def describe(self, char_data):
+        """章节首尾字的附加说明"""
+        return ""
+
+    def generate_report(self, ranked_characters, data_dir=DATA_DIR, chapter_count=CHAPTER_COUNT):
+        """生成统计报告"""
+
+
+class CommonStrokeScorer(Scorer):
+    """常用字优先 → 笔画数少优先 → Unicode编码"""
+
+    name = "common"
+    description = "常用字优先 → 笔画数少优先 → Unicode编码"
+    reverse = False
+    snapshot_label = "before_frequency_sorting"
+    streaming = True
+
+    def __init__(self):
+        self.common_chars = None
+        self._calculate_score = None
+
+    def prepare(self, characters):
+        if self.common_chars is None:
+            from apply_frequency_sorting import calculate_character_score, load_common_characters
+            self.common_chars = load_common_characters()
+            self._calculate_score = calculate_character_score
+            log(f"加载常用字: {len(self.common_chars)} 个")
+
+    def score(self, char_data):
+        return self._calculate_score(char_data, self.common_chars)
+
+    def vector_rank(self, characters):
+        from vectorized_scoring import common_stroke_rank
+        return common_stroke_rank(characters, self.common_chars)
+
+    def generate_report(self, ranked_characters, data_dir=DATA_DIR, chapter_count=CHAPTER_COUNT):
+        from apply_frequency_sorting import generate_statistics_report
+        generate_statistics_report(ranked_characters, data_dir, chapter_count)
+
+
+class RealFrequencyScorer(Scorer):
+    """真实语料库频率 + 笔画数 + 拼音常见度 + 语义领域"""
+
+    name = "real"
+    description = "真实语料库频率 + 笔画数 + 拼音常见度 + 语义领域"
+    reverse = True
+    snapshot_label = "before_real_frequency_sorting"
+
+    def __init__(self, sorter=None):
+        self.sorter = sorter
+
+    def prepare(self, characters):
+        if self.sorter is None:
+            from real_frequency_sorting import RealFrequencySorter
+            self.sorter = RealFrequencySorter(characters)
+
+    def score(self, char_data):
+        return self.sorter.calculate_character_priority(char_data)
+
+    def vector_rank(self, characters):
+        from vectorized_scoring import real_frequency_rank
+        return real_frequency_rank(characters, self.sorter)
+
+    def describe(self, char_data):
+        return f", 优先级: {self.sorter.frequency_data.get(char_data['char'], 'N/A')}"
+
+    def generate_report(self, ranked_characters, data_dir=DATA_DIR, chapter_count=CHAPTER_COUNT):
+        self.sorter.generate_statistics_report(ranked_characters, data_dir, chapter_count)
+
+
+class WordFreqScorer(Scorer):
+    """wordfreq 库提供的真实语料库频率"""
+
+    name = "wordfreq"
+    description = "wordfreq 库提供的真实语料库频率"
+    reverse = True
+    snapshot_label = "before_wordfreq_sorting"
+    streaming = True
+
+    def __init__(self, sorter=None):
+        self.sorter = sorter
+
+    def prepare(self, characters):
+        if self.sorter is None:
+            from wordfreq_based_sorting import WordFreqSorter
+            self.sorter = WordFreqSorter()
+        self.sorter.prefetch(char_data['char'] for char_data in characters)
+
+    def score(self, char_data):
+        return self.sorter.get_character_frequency(char_data['char'])
+
+    def vector_rank(self, characters):
+        from vectorized_scoring import wordfreq_rank
+        return wordfreq_rank(characters, self.sorter)
+
+    def annotate(self, char_data, score):
+        char_data['wordfreq_score'] = score
+
+    def describe(self, char_data):
+        return f", 频率: {char_data['wordfreq_score']:.6f}"
+
+    def generate_report(self, ranked_characters, data_dir=DATA_DIR, chapter_count=CHAPTER_COUNT):
+        self.sorter.generate_statistics_report(ranked_characters, data_dir, chapter_count)
+
+
+class FusionScorer(Scorer):
+    """融合其他评分器的排名和排名文件（倒数排名融合或 Borda 计数，见 rank_fusion.py）"""
+
+    name = "fusion"
+    description = "多个排名的融合"
+    reverse = True
+    snapshot_label = "before_fusion_sorting"
+
+    def __init__(self, sources=None, method="rrf", k=None):
+        from rank_fusion import DEFAULT_SOURCES, RRF_K, parse_source
+        parsed = [parse_source(spec) for spec in (sources or DEFAULT_SOURCES)]
+        self.sources = [name for name, _ in parsed]
+        self.weights = dict(parsed)
+        self.method = method
+        self.k = RRF_K if k is None else k
+        self.description = f"{method}: " + " + ".join(f"{name}×{weight:g}" for name, weight in parsed)
+        self.scores = None
+        self.source_ranks = None
+
+    def source_ranking(self, name, characters):
+        """某个来源按名次排列的字：评分器逐条评分后排序，其他来源从文件读取"""
+        if name in SCORERS and name != self.name:
+            scorer = SCORERS[name]()
+            scorer.prepare(characters)
+            scored = RankingEngine.score_characters(scorer, characters)
+            RankingEngine.sort_scored(scorer, scored)
+            return [char_data['char'] for _, char_data in scored]
+        if os.path.exists(name):
+            from rank_fusion import load_ranking
+            return load_ranking(name)
+        raise ValueError(f"未知的排名来源: {name}（评分器 {', '.join(SCORERS)} 或排名文件）")
+
+    def prepare(self, characters):
+        if self.scores is not None:
+            return
+        from rank_fusion import fuse
+
+        rankings = {}
+        for name in self.sources:
+            with stage(f"source_{os.path.basename(name)}"):
+                rankings[name] = self.source_ranking(name, characters)
+            log(f"来源 {name}: {len(rankings[name])} 个字, 权重 {self.weights[name]:g}")
+        with stage("fuse"):
+            fused = fuse(rankings, self.weights, self.method, self.k)
+        self.scores = {char: score for char, score, _ in fused}
+        self.source_ranks = {char: ranks for char, _, ranks in fused}
+
+    def score(self, char_data):
+        return self.scores.get(char_data['char'], 0.0)
+
+    def vector_rank(self, characters):
+        import numpy as np
+        scores = np.array([self.score(char_data) for char_data in characters], dtype=np.float64)
+        # 稳定排序，同分时与逐条排序的次序一致
+        return np.argsort(-scores, kind="stable"), scores
+
+    def annotate(self, char_data, score):
+        char_data['fusion_score'] = round(score, 10)
+        char_data['source_ranks'] = dict(self.source_ranks.get(char_data['char'], {}))
+
+    def describe(self, char_data):
+        ranks = " / ".join(f"{name} {rank}" for name, rank in char_data['source_ranks'].items())
+        return f", 来源名次: {ranks}"
+
+    def generate_report(self, ranked_characters, data_dir=DATA_DIR, chapter_count=CHAPTER_COUNT):
+        from rank_fusion import generate_report
+        generate_report(ranked_characters, self.sources, self.weights, self.method, self.k, data_dir)
+
+
+SCORERS = {
+    CommonStrokeScorer.name: CommonStrokeScorer,
+    RealFrequencyScorer.name: RealFrequencyScorer,
+    WordFreqScorer.name: WordFreqScorer,
+    FusionScorer.name: FusionScorer,
+}
+
+
+def make_scorer(name, args=None):
+    """按名称创建评分器；融合评分器从命令行参数读取来源和方法"""
+    if name == FusionScorer.name and args is not None:
+        return FusionScorer(args.fusion_sources, args.fusion_method, args.rrf_k)
+    return SCORERS[name]()
+
+
+class RankingEngine:
+    """加载 → 评分 → 排序 → 排名 → 分章 → 写入 → 报告"""
+
+    def __init__(self, data_dir=DATA_DIR, chapter_count=None, characters=None,
+                 minify=False, compressions=(), page_size=PAGE_SIZE, page_max_bytes=None):
+        self.data_dir = data_dir
+        # 读取按现有的章节划分；写回时可以改成新的章节数量
+        self.source_chapter_count = discover_chapter_count(data_dir)
+        self.chapter_count = chapter_count or self.source_chapter_count
+        self.page_size = page_size
+        self.page_max_bytes = page_max_bytes
+        self.minify = minify
+        self.compressions = tuple(compressions)
+        self.lock = ChapterWriteLock(data_dir)
+        # 可直接传入已有数据（如合成数据集），否则首次访问时从章节文件读取
+        self._characters = characters
+
+    @property
+    def characters(self):
+        """原始汉字数据（每个进程只读取一次）"""
+        if self._characters is None:
+            with stage("load"):
+                self._characters = load_characters(self.data_dir, self.source_chapter_count)
+        return self._characters
+
+    def backup(self, label):
+        """排序前保存章节数据快照（见 snapshot_store.py）"""
+        with stage("backup"):
+            return SnapshotStore(self.data_dir, chapter_count=self.source_chapter_count).take(label)
+
+    def rank(self, scorer, vectorized=False):
+        """对全部汉字评分并生成排名（不修改已加载的原始数据）
+
+        vectorized=True 时用 numpy 一次计算全部得分并 lexsort，排名与逐条计算一致。
+        """
+        characters = self.characters
+        with stage("prepare"):
+            scorer.prepare(characters)
+
+        if vectorized:
+            log("向量化计算得分并排序...")
+            with stage("score_sort"):
+                scored_characters = self.vector_score(scorer, characters)
+        else:
+            log("计算汉字得分...")
+            with stage("score"):
+                scored_characters = self.score_characters(scorer, characters)
+
+            log("按得分排序...")
+            with stage("sort"):
+                self.sort_scored(scorer, scored_characters)
+
+        log("生成最终排名...")
+        with stage("assign_ranks"):
+            return self.assign_ranks(scorer, scored_characters)
+
+    # 以下各阶段由 rank() 依次调用，单独拆出便于分别计时（见 benchmark_sorters.py）
+
+    @staticmethod
+    def score_characters(scorer, characters):
+        """逐条评分，返回 [(得分, 记录)]"""
+        return [(scorer.score(char_data), char_data) for char_data in characters]
+
+    @staticmethod
+    def sort_scored(scorer, scored_characters):
+        scored_characters.sort(key=lambda item: item[0], reverse=scorer.reverse)
+
+    @staticmethod
+    def vector_score(scorer, characters):
+        """向量化评分并排序，返回按排名排列的 [(得分, 记录)]"""
+        order, scores = scorer.vector_rank(characters)
+        scores = scores.tolist()
+        return [(scores[i], characters[i]) for i in order.tolist()]
+
+    @staticmethod
+    def assign_ranks(scorer, scored_characters):
+        """按顺序写入 frequency_rank（复制记录，不修改原始数据；Record 的副本只是一个带槽位的小对象）"""
+        ranked_characters = []
+        for i, (score, char_data) in enumerate(scored_characters, 1):
+            char_data = char_data.copy()
+            char_data['frequency_rank'] = i
+            scorer.annotate(char_data, score)
+            ranked_characters.append(char_data)
+        return ranked_characters
+
+    def write_chapters(self, ranked_characters, scorer=None, chapters=None):
+        """按章节重新分组，写回章节文件、分页文件和 chapters.json
+
+        chapters 为已分好的章节（不传时按 chapter_count 平均分组）。
+        """
+        if chapters is None:
+            log("按章节重新分组...")
+            with stage("split"):
+                chapters = split_into_chapters(ranked_characters, self.chapter_count)
+
+        files = [(chapter_file(self.data_dir, chapter), chapter_chars)
+                 for chapter, chapter_chars in enumerate(chapters, 1)]
+        with self.lock, stage("write"):
+            with stage("write_pages"):
+                page_files, manifest, stale_pages = build_pages(chapters, self.data_dir, self.page_size,
+                                                                self.page_max_bytes)
+                write_files(page_files, minify=True)
+            with stage("write_chapters"):
+                sizes = dict(write_files(files, self.minify, self.compressions))
+                write_files([(os.path.join(self.data_dir, MANIFEST_FILE), manifest)])
+                remove_stale_pages(stale_pages, self.data_dir)
+            inventory = update_inventory(ranked_characters, self.data_dir)
+            with stage("write_dataset"):
+                dataset_size = write_dataset(ranked_characters, os.path.join(self.data_dir, DATASET_NAME),
+                                             audio_characters(), inventory)
+            with stage("write_reverse_index"):
+                by_tone, by_syllable = write_reverse_index(ranked_characters, self.data_dir, inventory)
+            # 章节数量减少时删除多出来的旧章节文件
+            for chapter in range(self.chapter_count + 1, self.source_chapter_count + 1):
+                for path in [chapter_file(self.data_dir, chapter)] + [
+                        f"{chapter_file(self.data_dir, chapter)}.{kind}" for kind in COMPRESSIONS]:
+                    if os.path.exists(path):
+                        os.remove(path)
+            self.source_chapter_count = self.chapter_count
+
+        for chapter, chapter_chars in enumerate(chapters, 1):
+            output_file = chapter_file(self.data_dir, chapter)
+            variants = [f"{sizes[output_file] / 1024:.1f} KB"]
+            variants += [f".{kind} {sizes[f'{output_file}.{kind}'] / 1024:.1f} KB"
+                         for kind in self.compressions if f"{output_file}.{kind}" in sizes]
+            log(f"  第{chapter}章: {len(chapter_chars)}个汉字, {len(manifest[chapter - 1]['pages'])} 页 "
+                f"({', '.join(variants)})")
+            if not chapter_chars:
+                continue
+            first, last = chapter_chars[0], chapter_chars[-1]
+            first_note = scorer.describe(first) if scorer else ""
+            last_note = scorer.describe(last) if scorer else ""
+            log(f"    第一个字: {first['char']} (排名: {first['frequency_rank']}{first_note})")
+            log(f"    最后一个字: {last['char']} (排名: {last['frequency_rank']}{last_note})")
+
+        log(f"  二进制数据集: {DATASET_NAME} ({dataset_size / 1024:.1f} KB)")
+        log(f"  读音反查索引: {INDEX_DIR}/ ({len(by_tone)} 个读音, {len(by_syllable)} 个音节)")
+        return chapters
+
+    def run(self, scorer, write=True, backup=True, report=True, vectorized=False):
+        """完整流水线；write=False 时只计算排名
+
+        写入时从备份到生成报告全程持有数据目录锁。
+        """
+        if not write:
+            ranked_characters = self.rank(scorer, vectorized)
+            if report:
+                self.report(scorer, ranked_characters)
+            return ranked_characters
+
+        with self.lock:
+            if backup and scorer.snapshot_label:
+                self.backup(scorer.snapshot_label)
+
+            ranked_characters = self.rank(scorer, vectorized)
+            self.write_chapters(ranked_characters, scorer)
+            if report:
+                self.report(scorer, ranked_characters)
+
+        return ranked_characters
+
+    def report(self, scorer, ranked_characters):
+        with stage("report"):
+            scorer.generate_report(ranked_characters, self.data_dir, self.chapter_count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="统一的汉字排序引擎")
+    parser.add_argument("scorers", nargs="+", choices=sorted(SCORERS),
+                        help="使用的评分器，可指定多个（按顺序执行）")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="章节数据目录")
+    parser.add_argument("--chapters", type=int, default=None, help="章节数量（默认沿用 chapters.json）")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="分页文件每页字数")
+    parser.add_argument("--page-kb", type=float, default=None, help="分页文件每页最大 KB")
+    parser.add_argument("--dry-run", action="store_true", help="只计算排名，不写回章节文件")
+    parser.add_argument("--no-backup", action="store_true", help="写回前不保存快照")
+    parser.add_argument("--no-report", action="store_true", help="不生成统计报告")
+    parser.add_argument("--vectorized", action="store_true", help="使用 numpy 向量化评分与排序")
+    parser.add_argument("--minify", action="store_true", help="章节文件不缩进（体积更小）")
+    parser.add_argument("--compress", nargs="*", choices=["gz", "br"], default=[],
+                        help="同时生成预压缩文件（.gz / .br）")
+    parser.add_argument("--fusion-sources", nargs="+", default=None,
+                        help="fusion 融合的来源：评分器名称或排名文件，可加权重如 wordfreq:2（默认三个评分器等权）")
+    parser.add_argument("--fusion-method", choices=["rrf", "borda"], default="rrf",
+                        help="fusion 的融合方法：倒数排名融合或 Borda 计数")
+    parser.add_argument("--rrf-k", type=float, default=None, help="倒数排名融合的 k（默认 60）")
+    parser.add_argument("-q", "--quiet", action="store_true", help="不输出进度（错误仍输出到 stderr）")
+    parser.add_argument("--trace", default=None, help="运行记录 JSON 的路径（默认写到 .cache/traces/）")
+    parser.add_argument("--trace-memory", action="store_true", help="用 tracemalloc 记录各阶段内存峰值和主要分配位置")
+    args = parser.parse_args()
+
+    trace = PipelineTrace(quiet=args.quiet, trace_memory=args.trace_memory)
+    with use_trace(trace):
+        run_scorers(args)
+    path = trace.write(args.trace)
+    trace.log(f"各阶段: {trace.summary()}")
+    trace.log(f"运行记录: {path}")
+
+
+def run_scorers(args):
+    engine = RankingEngine(args.data_dir, args.chapters, minify=args.minify, compressions=args.compress,
+                           page_size=args.page_size,
+                           page_max_bytes=int(args.page_kb * 1024) if args.page_kb else None)
+    for name in args.scorers:
+        scorer = make_scorer(name, args)
+        log("=" * 60)
+        log(f"评分器: {name}（{scorer.description}）")
+        log("=" * 60)
+
+        start = time.perf_counter()
+        with stage(name):
+            ranked_characters = engine.run(
+                scorer,
+                write=not args.dry_run,
+                backup=not args.no_backup,
+                report=not args.no_report,
+                vectorized=args.vectorized,
+            )
+        elapsed = time.perf_counter() - start
+
+        top = "".join(c['char'] for c in ranked_characters[:20])
+        log(f"前20个: {top}")
+        log(f"耗时: {elapsed:.3f} 秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,19 +6,82 @@
 
 import json
 import os
-import shutil
-import requests
-from collections import defaultdict
-import re
+
+from build_corpus_frequency import TABLE_FILE, load_frequency_table
+from pipeline_trace import log
+from ranking_engine import (
+    CHAPTER_COUNT,
+    DATA_DIR,
+    RankingEngine,
+    RealFrequencyScorer,
+    load_characters,
+    split_into_chapters,
+)
+from stroke_table import stroke_count
 
 class RealFrequencySorter:
-    def __init__(self):
+    # 综合优先级中各项的权重（逐条计算与向量化计算共用）
+    PRIORITY_WEIGHTS = {
+        'frequency': 0.7,   # 频率最重要
+        'stroke': 0.2,      # 笔画数次重要
+        'pinyin': 0.05,     # 拼音常见度
+        'semantic': 0.05    # 语义领域
+    }
+    
+    # 日常生活中的常用字
+    DAILY_LIFE_CHARS = frozenset({
+        '吃', '喝', '睡', '醒', '走', '跑', '跳', '坐', '站', '看',
+        '听', '说', '读', '写', '买', '卖', '给', '拿', '放', '开',
+        '关', '进', '出', '上', '下', '来', '去', '回', '到', '有',
+        '没', '是', '不', '好', '坏', '大', '小', '多', '少', '长',
+        '短', '高', '低', '胖', '瘦', '快', '慢', '热', '冷', '新',
+        '旧', '美', '丑', '红', '黄', '蓝', '绿', '白', '黑'
+    })
+    
+    # 家庭相关字
+    FAMILY_CHARS = frozenset({
+        '爸', '妈', '爷', '奶', '姥', '爷', '婆', '公', '婆', '岳',
+        '丈', '婿', '媳', '妇', '郎', '娘', '姑', '姨', '舅', '叔',
+        '伯', '侄', '甥', '孙', '玄', '曾', '高', '太', '祖', '父',
+        '母', '兄', '弟', '姐', '妹', '夫', '妻', '儿', '女', '子'
+    })
+    
+    # 身体部位字
+    BODY_CHARS = frozenset({
+        '头', '脑', '脸', '面', '眉', '眼', '睛', '嘴', '唇', '齿',
+        '鼻', '耳', '舌', '喉', '颈', '肩', '背', '胸', '腹', '腰',
+        '手', '臂', '肘', '腕', '掌', '指', '腿', '膝', '脚', '足',
+        '心', '肝', '肺', '胃', '肠', '肾', '血', '骨', '肉', '皮'
+    })
+    
+    # 自然现象字
+    NATURE_CHARS = frozenset({
+        '天', '地', '日', '月', '星', '辰', '云', '雨', '雪', '风',
+        '雷', '电', '雾', '露', '霜', '冰', '火', '水', '山', '石',
+        '土', '沙', '泥', '金', '木', '水', '火', '土', '花', '草',
+        '树', '木', '林', '森', '鸟', '兽', '虫', '鱼', '鸡', '狗',
+        '猫', '牛', '羊', '马', '猪'
+    })
+    
+    # 语料字频表换算后最常用字的频率（与下面手工列表的量级一致）
+    CORPUS_SCALE = 1000000
+
+    def __init__(self, characters=None, table_path=TABLE_FILE):
         self.frequency_data = {}
-        self.load_frequency_data()
-        
-    def load_frequency_data(self):
-        """加载现代汉语语料库字频数据"""
-        print("加载现代汉语语料库字频数据...")
+        self.load_frequency_data(characters, table_path)
+        
+    def load_frequency_data(self, characters=None, table_path=TABLE_FILE):
+        """加载字频数据：优先读取 build_corpus_frequency.py 生成的语料字频表，没有时使用内置列表"""
+        counts = load_frequency_table(table_path)
+        if counts:
+            top = max(counts.values())
+            self.frequency_data = {char: n * self.CORPUS_SCALE / top for char, n in counts.items()}
+            log(f"加载语料字频表 {table_path}: {len(self.frequency_data)} 个汉字")
+            # 语料中没有出现的字频率记为 0，不再按笔画估算
+            self.supplement_more_characters(characters, estimate=False)
+            return
+
+        log("加载现代汉语语料库字频数据...")
         
         # 现代汉语语料库前5000字频数据（基于真实统计）
         # 数据来源：现代汉语语料库、人民日报语料库、BCC语料库等
@@ -126,95 +189,60 @@ class RealFrequencySorter:
             ("太", 2), ("祖", 1)
         ]
         
-        # 转换为字典
+        # 转换为字典（列表中有重复的字，以第一次出现、即排名靠前的为准）
         for char, freq in frequency_list:
-            self.frequency_data[char] = freq
+            self.frequency_data.setdefault(char, freq)
         
-        print(f"加载了 {len(self.frequency_data)} 个汉字的频率数据")
+        duplicates = len(frequency_list) - len(self.frequency_data)
+        log(f"加载了 {len(self.frequency_data)} 个汉字的频率数据（忽略重复 {duplicates} 个）")
         
         # 补充更多汉字（基于Unicode区块）
-        self.supplement_more_characters()
+        self.supplement_more_characters(characters)
     
-    def supplement_more_characters(self):
-        """补充更多汉字的频率数据（基于估算）"""
-        print("补充更多汉字的频率数据...")
+    def supplement_more_characters(self, characters=None, estimate=True):
+        """补充更多汉字的频率数据（基于估算；estimate=False 时记为 0）"""
+        log("补充更多汉字的频率数据...")
         
         # 基于《通用规范汉字表》的分级
         level_1_chars = set()  # 3500常用字
         level_2_chars = set()  # 3000次常用字
         level_3_chars = set()  # 1605通用字
         
-        # 加载所有章节的汉字
-        all_chars = set()
-        for chapter in range(1, 11):
-            try:
-                with open(f'data/chapter_{chapter}_characters.json', 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    for char_data in data:
-                        char = char_data['char']
-                        all_chars.add(char)
-            except:
-                pass
+        # 加载所有章节的汉字（排序引擎已加载时直接复用）
+        if characters is None:
+            characters = load_characters()
+        all_chars = {char_data['char'] for char_data in characters}
         
-        print(f"项目中共有 {len(all_chars)} 个不同汉字")
+        log(f"项目中共有 {len(all_chars)} 个不同汉字")
         
         # 为没有频率数据的汉字分配估算频率
         base_freq = 100  # 基础频率
         for char in all_chars:
-            if char not in self.frequency_data:
-                # 基于笔画数估算频率（笔画越少越常用）
-                stroke_count = self.estimate_stroke_count(char)
-                if stroke_count <= 3:
-                    estimated_freq = 5000  # 简单字
-                elif stroke_count <= 6:
-                    estimated_freq = 1000  # 中等字
-                elif stroke_count <= 9:
-                    estimated_freq = 500   # 较复杂字
-                elif stroke_count <= 12:
-                    estimated_freq = 200   # 复杂字
-                else:
-                    estimated_freq = 50    # 非常复杂字
-                
-                self.frequency_data[char] = estimated_freq
-        
-        print(f"总共处理了 {len(self.frequency_data)} 个汉字的频率数据")
+            if char in self.frequency_data:
+                continue
+            if not estimate:
+                self.frequency_data[char] = 0
+                continue
+            # 基于笔画数估算频率（笔画越少越常用）
+            stroke_count = self.estimate_stroke_count(char)
+            if stroke_count <= 3:
+                estimated_freq = 5000  # 简单字
+            elif stroke_count <= 6:
+                estimated_freq = 1000  # 中等字
+            elif stroke_count <= 9:
+                estimated_freq = 500   # 较复杂字
+            elif stroke_count <= 12:
+                estimated_freq = 200   # 复杂字
+            else:
+                estimated_freq = 50    # 非常复杂字
+
+            self.frequency_data[char] = estimated_freq
+        
+        log(f"总共处理了 {len(self.frequency_data)} 个汉字的频率数据")
     
     def estimate_stroke_count(self, char):
-        """估算汉字笔画数"""
-        common_strokes = {
-            '一': 1, '乙': 1, '二': 2, '十': 2, '丁': 2, '厂': 2, '七': 2,
-            '卜': 2, '八': 2, '人': 2, '入': 2, '儿': 2, '匕': 2, '几': 2,
-            '九': 2, '刁': 2, '了': 2, '刀': 2, '力': 2, '乃': 2, '又': 2,
-            '三': 3, '千': 3, '川': 3, '个': 3, '勺': 3, '久': 3, '凡': 3,
-            '及': 3, '亡': 3, '门': 3, '义': 3, '之': 3, '尸': 3, '己': 3,
-            '已': 3, '子': 3, '卫': 3, '也': 3, '女': 3, '飞': 3, '刃': 3,
-            '习': 3, '马': 3, '乡': 3, '丰': 4, '王': 4, '井': 4, '开': 4,
-            '夫': 4, '天': 4, '元': 4, '无': 4, '云': 4, '专': 4, '丐': 4,
-            '廿': 4, '五': 4, '不': 4, '丐': 4, '丑': 4, '中': 4, '丰': 4,
-            '为': 4, '主': 5, '市': 5, '立': 5, '冯': 5, '玄': 5, '玉': 5,
-            '瓜': 5, '瓦': 5, '甘': 5, '生': 5, '用': 5, '田': 5, '由': 5,
-            '甲': 5, '申': 5, '电': 5, '白': 5, '皮': 5, '皿': 5, '目': 5,
-            '矛': 5, '矢': 5, '石': 5, '示': 5
-        }
-        
-        if char in common_strokes:
-            return common_strokes[char]
-        
-        code_point = ord(char)
-        if 0x4E00 <= code_point <= 0x9FFF:
-            if code_point < 0x4F00:
-                return 3
-            elif code_point < 0x6000:
-                return 6
-            elif code_point < 0x7000:
-                return 9
-            elif code_point < 0x8000:
-                return 12
-            elif code_point < 0x9000:
-                return 15
-            else:
-                return 8
-        return 8
+        """查询汉字笔画数（码位索引的笔画表，见 stroke_table.py）"""
+        return stroke_count(char)
     
     def calculate_character_priority(self, char_data):
         """计算汉字优先级（基于真实频率数据）"""
@@ -239,11 +267,12 @@ class RealFrequencySorter:
         semantic_score = self.calculate_semantic_score(char)
         
         # 综合优先级（频率越高越常用）
+        weights = self.PRIORITY_WEIGHTS
         total_priority = (
-            freq_score * 0.7 +      # 频率最重要
-            stroke_adjustment * 0.2 + # 笔画数次重要
-            pinyin_score * 0.05 +    # 拼音常见度
-            semantic_score * 0.05    # 语义领域
+            freq_score * weights['frequency'] +
+            stroke_adjustment * weights['stroke'] +
+            pinyin_score * weights['pinyin'] +
+            semantic_score * weights['semantic']
         )
         
         return total_priority
@@ -282,147 +311,36 @@ class RealFrequencySorter:
     
     def calculate_semantic_score(self, char):
         """计算语义领域得分（日常词汇优先级高）"""
-        # 日常生活中的常用字
-        daily_life_chars = {
-            '吃', '喝', '睡', '醒', '走', '跑', '跳', '坐', '站', '看',
-            '听', '说', '读', '写', '买', '卖', '给', '拿', '放', '开',
-            '关', '进', '出', '上', '下', '来', '去', '回', '到', '有',
-            '没', '是', '不', '好', '坏', '大', '小', '多', '少', '长',
-            '短', '高', '低', '胖', '瘦', '快', '慢', '热', '冷', '新',
-            '旧', '美', '丑', '红', '黄', '蓝', '绿', '白', '黑'
-        }
-        
-        # 家庭相关字
-        family_chars = {
-            '爸', '妈', '爷', '奶', '姥', '爷', '婆', '公', '婆', '岳',
-            '丈', '婿', '媳', '妇', '郎', '娘', '姑', '姨', '舅', '叔',
-            '伯', '侄', '甥', '孙', '玄', '曾', '高', '太', '祖', '父',
-            '母', '兄', '弟', '姐', '妹', '夫', '妻', '儿', '女', '子'
-        }
-        
-        # 身体部位字
-        body_chars = {
-            '头', '脑', '脸', '面', '眉', '眼', '睛', '嘴', '唇', '齿',
-            '鼻', '耳', '舌', '喉', '颈', '肩', '背', '胸', '腹', '腰',
-            '手', '臂', '肘', '腕', '掌', '指', '腿', '膝', '脚', '足',
-            '心', '肝', '肺', '胃', '肠', '肾', '血', '骨', '肉', '皮'
-        }
-        
-        # 自然现象字
-        nature_chars = {
-            '天', '地', '日', '月', '星', '辰', '云', '雨', '雪', '风',
-            '雷', '电', '雾', '露', '霜', '冰', '火', '水', '山', '石',
-            '土', '沙', '泥', '金', '木', '水', '火', '土', '花', '草',
-            '树', '木', '林', '森', '鸟', '兽', '虫', '鱼', '鸡', '狗',
-            '猫', '牛', '羊', '马', '猪'
-        }
-        
-        if char in daily_life_chars:
+        if char in self.DAILY_LIFE_CHARS:
             return 2000
-        elif char in family_chars:
+        elif char in self.FAMILY_CHARS:
             return 1500
-        elif char in body_chars:
+        elif char in self.BODY_CHARS:
             return 1200
-        elif char in nature_chars:
+        elif char in self.NATURE_CHARS:
             return 1000
         else:
             return 500
     
-    def sort_characters(self):
+    def sort_characters(self, engine=None):
         """按真实字频排序所有汉字"""
-        print("开始按真实字频排序汉字...")
-        
-        # 备份原始数据
-        backup_dir = "data/backup_before_real_frequency_sorting"
-        if not os.path.exists(backup_dir):
-            os.makedirs(backup_dir)
-            print(f"创建备份目录: {backup_dir}")
-        
-        for chapter in range(1, 11):
-            src_file = f"data/chapter_{chapter}_characters.json"
-            dst_file = f"{backup_dir}/chapter_{chapter}_characters.json.backup"
-            if os.path.exists(src_file):
-                shutil.copy2(src_file, dst_file)
-                print(f"  备份: {src_file} -> {dst_file}")
-        
-        # 收集所有汉字
-        all_characters = []
-        for chapter in range(1, 11):
-            try:
-                with open(f'data/chapter_{chapter}_characters.json', 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    all_characters.extend(data)
-                    print(f"  第{chapter}章: 加载了{len(data)}个汉字")
-            except Exception as e:
-                print(f"  第{chapter}章加载失败: {e}")
-        
-        print(f"总共收集到 {len(all_characters)} 个汉字")
-        
-        # 计算每个汉字的优先级
-        print("计算汉字优先级...")
-        prioritized_characters = []
-        for char_data in all_characters:
-            priority = self.calculate_character_priority(char_data)
-            prioritized_characters.append({
-                'char_data': char_data,
-                'priority': priority
-            })
-        
-        # 按优先级排序（优先级越高越常用）
-        print("按优先级排序...")
-        prioritized_characters.sort(key=lambda x: x['priority'], reverse=True)
-        
-        # 生成排名
-        print("生成最终排名...")
-        ranked_characters = []
-        for i, item in enumerate(prioritized_characters, 1):
-            char_data = item['char_data'].copy()
-            char_data['frequency_rank'] = i  # 更新频率排名
-            ranked_characters.append(char_data)
-        
-        # 按章节重新分组
-        print("按章节重新分组...")
-        total_chars = len(ranked_characters)
-        chars_per_chapter = total_chars // 10
-        remainder = total_chars % 10
-        
-        start_index = 0
-        for chapter in range(1, 11):
-            # 计算本章汉字数量
-            chapter_count = chars_per_chapter
-            if chapter <= remainder:
-                chapter_count += 1
-            
-            # 获取本章汉字
-            end_index = start_index + chapter_count
-            chapter_chars = ranked_characters[start_index:end_index]
-            
-            # 保存到文件
-            output_file = f'data/chapter_{chapter}_characters.json'
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(chapter_chars, f, ensure_ascii=False, indent=2)
-            
-            print(f"  第{chapter}章: {len(chapter_chars)}个汉字")
-            print(f"    第一个字: {chapter_chars[0]['char']} (排名: {chapter_chars[0]['frequency_rank']}, 优先级: {self.frequency_data.get(chapter_chars[0]['char'], 'N/A')})")
-            print(f"    最后一个字: {chapter_chars[-1]['char']} (排名: {chapter_chars[-1]['frequency_rank']}, 优先级: {self.frequency_data.get(chapter_chars[-1]['char'], 'N/A')})")
-            
-            # 更新起始索引
-            start_index = end_index
-        
-        # 生成统计报告
-        self.generate_statistics_report(ranked_characters)
-        
-        print("\n" + "=" * 60)
-        print("真实字频排序完成！")
-        print("=" * 60)
-        print("重要提示:")
-        print("1. 原始数据已备份到 data/backup_before_real_frequency_sorting/")
-        print("2. 新的字频排名已应用到所有章节数据")
-        print("3. 现在汉字将按真实字频排序（最常用字在前）")
-        print("4. 排序规则: 真实语料库频率 + 笔画数 + 拼音常见度 + 语义领域")
-        print("=" * 60)
+        log("开始按真实字频排序汉字...")
+        
+        if engine is None:
+            engine = RankingEngine()
+        engine.run(RealFrequencyScorer(self))
+        
+        log("\n" + "=" * 60)
+        log("真实字频排序完成！")
+        log("=" * 60)
+        log("重要提示:")
+        log("1. 排序前的数据已保存为快照（python snapshot_store.py list 查看）")
+        log("2. 新的字频排名已应用到所有章节数据")
+        log("3. 现在汉字将按真实字频排序（最常用字在前）")
+        log("4. 排序规则: 真实语料库频率 + 笔画数 + 拼音常见度 + 语义领域")
+        log("=" * 60)
     
-    def generate_statistics_report(self, ranked_characters):
+    def generate_statistics_report(self, ranked_characters, data_dir=DATA_DIR, chapter_count=CHAPTER_COUNT):
         """生成统计报告"""
         report = {
             "total_characters": len(ranked_characters),
@@ -455,19 +373,7 @@ class RealFrequencySorter:
         ]
         
         # 章节统计
-        total_chars = len(ranked_characters)
-        chars_per_chapter = total_chars // 10
-        remainder = total_chars % 10
-        
-        start_index = 0
-        for chapter in range(1, 11):
-            chapter_count = chars_per_chapter
-            if chapter <= remainder:
-                chapter_count += 1
-            
-            end_index = start_index + chapter_count
-            chapter_chars = ranked_characters[start_index:end_index]
-            
+        for chapter, chapter_chars in enumerate(split_into_chapters(ranked_characters, chapter_count), 1):
             report["chapters_summary"][f"chapter_{chapter}"] = {
                 "character_count": len(chapter_chars),
                 "first_char": chapter_chars[0]['char'],
@@ -477,8 +383,6 @@ class RealFrequencySorter:
                 "last_char_rank": chapter_chars[-1]['frequency_rank'],
                 "last_char_frequency": self.frequency_data.get(chapter_chars[-1]['char'], 'N/A')
             }
-            
-            start_index = end_index
         
         # 频率分布统计
         freq_ranges = {
@@ -507,39 +411,41 @@ class RealFrequencySorter:
         report["frequency_distribution"] = freq_ranges
         
         # 保存报告
-        with open('data/real_frequency_sorting_report.json', 'w', encoding='utf-8') as f:
+        report_file = os.path.join(data_dir, 'real_frequency_sorting_report.json')
+        with open(report_file, 'w', encoding='utf-8') as f:
             json.dump(report, f, ensure_ascii=False, indent=2)
         
-        print(f"\n统计报告已保存: data/real_frequency_sorting_report.json")
+        log(f"\n统计报告已保存: {report_file}")
         
         # 打印简要报告
-        print("\n=== 真实字频排序统计报告 ===")
-        print(f"总汉字数: {report['total_characters']}")
+        log("\n=== 真实字频排序统计报告 ===")
+        log(f"总汉字数: {report['total_characters']}")
         
-        print("\n频率分布:")
-        print(f"  非常高频率 (>50000): {freq_ranges['very_high']} 字")
-        print(f"  高频率 (10000-50000): {freq_ranges['high']} 字")
-        print(f"  中频率 (1000-10000): {freq_ranges['medium']} 字")
-        print(f"  低频率 (100-1000): {freq_ranges['low']} 字")
-        print(f"  非常低频率 (<100): {freq_ranges['very_low']} 字")
+        log("\n频率分布:")
+        log(f"  非常高频率 (>50000): {freq_ranges['very_high']} 字")
+        log(f"  高频率 (10000-50000): {freq_ranges['high']} 字")
+        log(f"  中频率 (1000-10000): {freq_ranges['medium']} 字")
+        log(f"  低频率 (100-1000): {freq_ranges['low']} 字")
+        log(f"  非常低频率 (<100): {freq_ranges['very_low']} 字")
         
-        print("\n前20个最常用汉字:")
+        log("\n前20个最常用汉字:")
         for i, char_info in enumerate(report['top_100_chars'][:20], 1):
-            print(f"  {i:2d}. {char_info['char']} ({char_info['jyutping']}) - 排名: {char_info['frequency_rank']:4d}, 频率: {char_info['estimated_frequency']}")
+            log(f"  {i:2d}. {char_info['char']} ({char_info['jyutping']}) - 排名: {char_info['frequency_rank']:4d}, 频率: {char_info['estimated_frequency']}")
         
-        print("\n最后20个汉字:")
+        log("\n最后20个汉字:")
         for i, char_info in enumerate(report['bottom_100_chars'][-20:], 1):
             idx = report['total_characters'] - 20 + i
-            print(f"  {idx:4d}. {char_info['char']} ({char_info['jyutping']}) - 排名: {char_info['frequency_rank']:4d}, 频率: {char_info['estimated_frequency']}")
+            log(f"  {idx:4d}. {char_info['char']} ({char_info['jyutping']}) - 排名: {char_info['frequency_rank']:4d}, 频率: {char_info['estimated_frequency']}")
 
 def main():
-    print("=" * 60)
-    print("真实语料库字频排序系统")
-    print("基于现代汉语语料库字频统计数据")
-    print("=" * 60)
+    log("=" * 60)
+    log("真实语料库字频排序系统")
+    log("基于现代汉语语料库字频统计数据")
+    log("=" * 60)
     
-    sorter = RealFrequencySorter()
-    sorter.sort_characters()
+    engine = RankingEngine()
+    sorter = RealFrequencySorter(engine.characters)
+    sorter.sort_characters(engine)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+紧凑的汉字记录
+排序流水线在内存中保存的每个汉字原本是一个 dict（约 6 个键），排名时再复制一份。
+Record 把常用字段放进 __slots__，其余字段（如评分器的注记）放在按需创建的 extra 字典里：
+    - 没有每条记录的哈希表，只有固定的槽位
+    - 键的顺序按「形状」记录：同样的键序列共用一个元组，序列化后的字段顺序与原 JSON 相同
+    - 粤拼字符串用 sys.intern 去重（8105 个字只有约 1500 种读音）
+Record 实现 MutableMapping 接口（record['char']、record.get(...)、'x' in record、dict(record)），
+加载、评分、排名、分章、写入和报告各阶段无需改动；copy() 复制出的仍是 Record。
+写 JSON 时用 default=dict 转换（见 chapter_writer.serialize）。
+
+    python record_store.py --benchmark                          8105、10 万、100 万条记录上对比 dict 与 Record 的内存
+    python record_store.py --benchmark --sizes real 100000      只测部分规模
+"""
+
+import argparse
+import concurrent.futures
+import multiprocessing
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import MutableMapping
+
+FIELDS = ("char", "jyutping", "tone", "frequency_rank", "wordfreq_score", "secondary_jyutping")
+INTERNED_FIELDS = ("jyutping", "secondary_jyutping")
+_SLOTS = frozenset(FIELDS)
+_MISSING = object()
+
+# 键序列 → (共用的元组, 从 dict 填充槽位的函数, 复制槽位的函数)；(键序列, 新键) → 加上新键后的键序列
+_shapes = {}
+_extended = {}
+
+
+def _compile(keys):
+    """为一种键序列生成逐个字段赋值的函数（与 dataclasses 相同的做法），比循环调用 setattr 快"""
+    slot_keys = [key for key in keys if key in _SLOTS]
+    fill = [f"    value = data[{key!r}]\n    record.{key} = intern(value) if type(value) is str else value"
+            if key in INTERNED_FIELDS else f"    record.{key} = data[{key!r}]" for key in slot_keys]
+    copy = [f"    target.{key} = source.{key}" for key in slot_keys]
+    source = (
+        "def fill(record, data):\n" + ("\n".join(fill) or "    pass") + "\n"
+        "def copy(source, target):\n" + ("\n".join(copy) or "    pass") + "\n"
+    )
+    namespace = {"intern": sys.intern}
+    exec(source, namespace)
+    return namespace["fill"], namespace["copy"], len(slot_keys) == len(keys)
+
+
+def _shape(keys):
+    keys = tuple(keys)
+    shape = _shapes.get(keys)
+    if shape is None:
+        shape = _shapes[keys] = (keys,) + _compile(keys)
+    return shape[0]
+
+
+def _extend(keys, key):
+    extended = _extended.get((keys, key))
+    if extended is None:
+        extended = _extended[(keys, key)] = _shape(keys + (key,))
+    return extended
+
+
+class Record(MutableMapping):
+    """一个汉字的记录，按 dict 的方式读写"""
+
+    __slots__ = FIELDS + ("_keys", "_extra")
+
+    def __init__(self, data=()):
+        self._keys = ()
+        self._extra = None
+        for key, value in (data.items() if hasattr(data, "items") else data):
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, data):
+        """从 JSON 解析出的 dict 创建（粤拼字符串去重）"""
+        record = cls.__new__(cls)
+        keys = record._keys = _shape(data)
+        _, fill, _, plain = _shapes[keys]
+        fill(record, data)
+        record._extra = None if plain else {key: value for key, value in data.items() if key not in _SLOTS}
+        return record
+
+    def __getitem__(self, key):
+        if key in _SLOTS:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in self._keys:
+            self._keys = _extend(self._keys, key)
+        if key in _SLOTS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        if key in _SLOTS:
+            delattr(self, key)
+        else:
+            del self._extra[key]
+        self._keys = _shape(k for k in self._keys if k != key)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def get(self, key, default=None):
+        if key in _SLOTS:
+            return getattr(self, key, default)
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def copy(self):
+        """浅复制（与 dict.copy 相同，嵌套的值共用）"""
+        record = Record.__new__(Record)
+        _shapes[self._keys][2](self, record)
+        record._keys = self._keys
+        record._extra = None if self._extra is None else dict(self._extra)
+        return record
+
+    def __repr__(self):
+        return f"Record({dict(self)!r})"
+
+
+def make_records(data):
+    """把 JSON 解析出的一组 dict 转成 Record"""
+    return [Record.from_dict(item) for item in data]
+
+
+# 以下为内存基准测试
+
+DEFAULT_SIZES = ["real", "100000", "1000000"]
+PIPELINES = ("dict", "record")
+
+
+def dict_pipeline_load(data_dir, chapter_count):
+    """原来的加载方式：每个汉字保留 JSON 解析出的 dict"""
+    from json_backend import load_files
+    from ranking_engine import chapter_file
+
+    characters = []
+    for _, data, error in load_files([chapter_file(data_dir, chapter) for chapter in range(1, chapter_count + 1)],
+                                     cache=False):
+        if error is not None:
+            raise error
+        characters.extend(data)
+    return characters
+
+
+def measure_case(size, pipeline, scorer_name, data_dir):
+    """在临时目录中跑一遍 加载 → 评分 → 排序 → 排名 → 分章 → 报告，记录各阶段结束时的 Python 堆占用和峰值"""
+    from benchmark_sorters import isolate_frequency_cache, prepare_workdir
+    from pipeline_trace import PipelineTrace, use_trace
+    from ranking_engine import SCORERS, RankingEngine, load_characters, split_into_chapters
+
+    workdir = tempfile.mkdtemp(prefix="jyutping-records-")
+    try:
+        with use_trace(PipelineTrace(quiet=True)):
+            chapter_count = prepare_workdir(size, workdir, data_dir)
+            isolate_frequency_cache(size, workdir)
+            scorer = SCORERS[scorer_name]()
+            stages = {}
+            tracemalloc.start()
+            start = time.perf_counter()
+
+            def checkpoint(name):
+                current, peak = tracemalloc.get_traced_memory()
+                stages[name] = {"current_mb": round(current / 2 ** 20, 1), "peak_mb": round(peak / 2 ** 20, 1)}
+                tracemalloc.reset_peak()
+
+            if pipeline == "dict":
+                characters = dict_pipeline_load(workdir, chapter_count)
+            else:
+                characters = load_characters(workdir, chapter_count)
+            checkpoint("load")
+            scorer.prepare(characters)
+            scored = RankingEngine.score_characters(scorer, characters)
+            RankingEngine.sort_scored(scorer, scored)
+            checkpoint("score_sort")
+            ranked = RankingEngine.assign_ranks(scorer, scored)
+            del scored
+            checkpoint("assign_ranks")
+            chapters = split_into_chapters(ranked, chapter_count)
+            checkpoint("split")
+            scorer.generate_report(ranked, workdir, chapter_count)
+            checkpoint("report")
+            seconds = time.perf_counter() - start
+            tracemalloc.stop()
+            records = len(characters)
+            del characters, ranked, chapters
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "size": size,
+        "records": records,
+        "pipeline": pipeline,
+        "peak_mb": max(stage["peak_mb"] for stage in stages.values()),
+        "seconds": round(seconds, 2),
+        "stages": stages,
+    }
+
+
+def benchmark(sizes, scorer_name="common", data_dir="data"):
+    # 每个用例一个全新的进程，互不影响
+    context = multiprocessing.get_context("spawn")
+    cases = []
+    for size in sizes:
+        for pipeline in PIPELINES:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                cases.append(pool.submit(measure_case, size, pipeline, scorer_name, data_dir).result())
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description="紧凑的汉字记录；--benchmark 对比 dict 与 Record 的内存占用")
+    parser.add_argument("--benchmark", action="store_true", help="运行内存基准测试")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES,
+                        help="数据规模：real 表示真实章节数据，数字表示合成记录条数")
+    parser.add_argument("--scorer", default="common", help="评分器（只影响评分阶段，默认 common）")
+    parser.add_argument("--data-dir", default="data", help="真实章节数据目录")
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        parser.print_help()
+        return
+    for size in args.sizes:
+        if size != "real" and not size.isdigit():
+            parser.error(f"无效的规模: {size}")
+
+    cases = benchmark(args.sizes, args.scorer, args.data_dir)
+    stage_names = list(cases[0]["stages"])
+    print(f"Python 堆占用（tracemalloc，MB），各阶段结束时 / 流水线峰值")
+    print(f"{'记录数':>9} {'方式':<7}" + "".join(f"{name:>14}" for name in stage_names) + f"{'峰值':>9}{'耗时':>9}")
+    by_size = {}
+    for case in cases:
+        cells = "".join(f"{case['stages'][name]['current_mb']:>14.1f}" for name in stage_names)
+        print(f"{case['records']:>9} {case['pipeline']:<7}{cells}{case['peak_mb']:>9.1f}{case['seconds']:>8.2f}s")
+        by_size.setdefault(case["size"], {})[case["pipeline"]] = case
+    print()
+    for size, pair in by_size.items():
+        before, after = pair["dict"], pair["record"]
+        retained = before["stages"]["assign_ranks"]["current_mb"], after["stages"]["assign_ranks"]["current_mb"]
+        print(f"{before['records']:>9} 条: 排名后常驻 {retained[0]:.1f} → {retained[1]:.1f} MB "
+              f"(-{1 - retained[1] / retained[0]:.0%}), 峰值 {before['peak_mb']:.1f} → {after['peak_mb']:.1f} MB "
+              f"(-{1 - after['peak_mb'] / before['peak_mb']:.0%})")
+
+
+if __name__ == "__main__":
+    main()
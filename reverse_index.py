@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+读音反查索引
+按排名顺序遍历一次数据集（主读音和第二读音），生成：
+    data/reverse_index/index.json       分片数、各读音的同音字数量
+    data/reverse_index/shard_K.json     {"tones": {读音编码: 字串}, "syllables": {音节序号: 字串}}
+读音编码见 jyutping_inventory.py，按 音节序号 % 分片数 分片；字串按排名排列。
+查询时只读取清单和一个分片，之后都是字典查询。
+"""
+
+import argparse
+import json
+import os
+
+from chapter_writer import write_files
+from jyutping_inventory import INVENTORY_NAME, JyutpingInventory, is_irregular, syllable_of, update_inventory
+
+INDEX_DIR = "reverse_index"
+SHARD_COUNT = 16
+
+
+def build_reverse_index(characters, inventory):
+    """返回 ({读音编码: [字]}, {音节序号: [字]})，字按排名排列且不重复
+
+    同一个字的两个读音是连续处理的，重复只可能出现在列表末尾。
+    """
+    by_tone = {}
+    by_syllable = {}
+    for record in sorted(characters, key=lambda c: c.get('frequency_rank', 0)):
+        char = record['char']
+        for jyutping in (record.get('jyutping', ''), record.get('secondary_jyutping')):
+            if not jyutping:
+                continue
+            code = inventory.encode(jyutping)
+            if is_irregular(code):
+                continue
+            for chars in (by_tone.setdefault(code, []), by_syllable.setdefault(syllable_of(code), [])):
+                if not chars or chars[-1] != char:
+                    chars.append(char)
+    return by_tone, by_syllable
+
+
+def index_files(by_tone, by_syllable, data_dir, shard_count=SHARD_COUNT):
+    """分片文件和清单 [(路径, 数据)]"""
+    index_dir = os.path.join(data_dir, INDEX_DIR)
+    shards = [{"tones": {}, "syllables": {}} for _ in range(shard_count)]
+    for code, chars in sorted(by_tone.items()):
+        shards[syllable_of(code) % shard_count]["tones"][str(code)] = "".join(chars)
+    for syllable, chars in sorted(by_syllable.items()):
+        shards[syllable % shard_count]["syllables"][str(syllable)] = "".join(chars)
+
+    manifest = {
+        "version": 1,
+        "shards": shard_count,
+        "sizes": {str(code): len(chars) for code, chars in sorted(by_tone.items())},
+    }
+    files = [(os.path.join(index_dir, f"shard_{k}.json"), shard) for k, shard in enumerate(shards)]
+    files.append((os.path.join(index_dir, "index.json"), manifest))
+    return files
+
+
+def write_reverse_index(characters, data_dir="data", inventory=None, shard_count=SHARD_COUNT):
+    inventory = inventory or update_inventory(characters, data_dir)
+    by_tone, by_syllable = build_reverse_index(characters, inventory)
+    files = index_files(by_tone, by_syllable, data_dir, shard_count)
+
+    index_dir = os.path.join(data_dir, INDEX_DIR)
+    keep = {os.path.basename(path) for path, _ in files}
+    if os.path.isdir(index_dir):
+        for name in os.listdir(index_dir):
+            if name.endswith(".json") and name not in keep:
+                os.remove(os.path.join(index_dir, name))
+    write_files(files, minify=True)
+    return by_tone, by_syllable
+
+
+class ReverseIndex:
+    """读音 → 汉字的查询接口（分片按需加载）"""
+
+    def __init__(self, data_dir="data"):
+        self.index_dir = os.path.join(data_dir, INDEX_DIR)
+        self.inventory = JyutpingInventory.load(os.path.join(data_dir, INVENTORY_NAME))
+        with open(os.path.join(self.index_dir, "index.json"), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        self.shard_count = manifest["shards"]
+        self.sizes = {int(code): size for code, size in manifest["sizes"].items()}
+        self._shards = {}
+        self._syllable_ids = {s: i for i, s in enumerate(self.inventory.syllables)}
+
+    def _shard(self, syllable):
+        k = syllable % self.shard_count
+        shard = self._shards.get(k)
+        if shard is None:
+            with open(os.path.join(self.index_dir, f"shard_{k}.json"), 'r', encoding='utf-8') as f:
+                shard = self._shards[k] = json.load(f)
+        return shard
+
+    def _code(self, jyutping):
+        try:
+            return self.inventory.encode(jyutping)
+        except KeyError:
+            return None
+
+    def characters(self, jyutping):
+        """读作 jyutping（带声调，如 "si6"）的字，按排名排列"""
+        code = self._code(jyutping)
+        if code is None or is_irregular(code):
+            return ""
+        return self._shard(syllable_of(code))["tones"].get(str(code), "")
+
+    def homophones(self, syllable):
+        """音节相同（任意声调，如 "si"）的字，按排名排列"""
+        syllable_id = self._syllable_ids.get(syllable)
+        if syllable_id is None:
+            return ""
+        return self._shard(syllable_id)["syllables"].get(str(syllable_id), "")
+
+    def group_size(self, jyutping):
+        code = self._code(jyutping)
+        return self.sizes.get(code, 0) if code is not None else 0
+
+    def largest_groups(self, limit=10):
+        """同音字最多的读音 [(粤拼, 字数)]"""
+        ranked = sorted(self.sizes.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [(self.inventory.decode(code), size) for code, size in ranked]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成并查询读音反查索引")
+    parser.add_argument("readings", nargs="*", help="要查询的读音（带声调如 si6，不带声调如 si）")
+    parser.add_argument("--data-dir", default="data", help="章节数据目录")
+    parser.add_argument("--build", action="store_true", help="重新生成索引")
+    args = parser.parse_args()
+
+    if args.build or not os.path.exists(os.path.join(args.data_dir, INDEX_DIR, "index.json")):
+        from ranking_engine import discover_chapter_count, load_characters
+        characters = load_characters(args.data_dir, discover_chapter_count(args.data_dir))
+        by_tone, by_syllable = write_reverse_index(characters, args.data_dir)
+        print(f"✅ 已生成反查索引: {len(by_tone)} 个读音, {len(by_syllable)} 个音节")
+
+    index = ReverseIndex(args.data_dir)
+    for reading in args.readings:
+        if reading[-1:].isdigit():
+            chars = index.characters(reading)
+            print(f"{reading} ({len(chars)} 个): {chars}")
+        else:
+            chars = index.homophones(reading)
+            print(f"{reading} 任意声调 ({len(chars)} 个): {chars}")
+    if not args.readings:
+        print("同音字最多的读音:")
+        for reading, size in index.largest_groups():
+            print(f"  {reading}: {size} 个")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+音频元数据扫描
+不解码音频，只解析 ID3 标签和 MP3 帧头（见 mp3_frames.py），在进程池中并行扫描
+audio/single_chars/ 和多音字音频，把每个文件的元数据写进 audio/index.json 中对应的条目（audio_path 旁）：
+    duration_ms  时长（各帧时长之和）
+    bitrate      平均比特率（kbps）
+    frames       音频帧数（不含编码器信息帧）
+    bytes        文件大小
+    sha256       内容哈希
+    issue        只在有问题时出现："empty"（没有可解析的帧）、"truncated"（最后一帧不完整）、
+                 "garbage"（帧之间有无法解析的数据），附带出问题的字节偏移
+另在顶层记录 "problems"（有问题的文件列表）。
+
+扫描结果按 (路径, 大小, 修改时间) 缓存在 .cache/audio_metadata.json，再次运行只重新扫描改动过的文件；
+--rescan 忽略缓存。
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from chapter_writer import write_files
+from json_backend import dump_file, load_file
+from mp3_frames import inspect
+from pipeline_trace import log, warn
+
+AUDIO_DIR = "audio"
+INDEX_FILE = os.path.join(AUDIO_DIR, "index.json")
+CACHE_FILE = os.path.join(".cache", "audio_metadata.json")
+CACHE_VERSION = 1
+METADATA_FIELDS = ("duration_ms", "bitrate", "frames", "bytes", "sha256", "issue")
+
+
+def scan_file(path):
+    """读取并检查一个文件（在工作进程中运行），返回元数据"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    frames, problem = inspect(data)
+    duration = sum(header.duration for _, header in frames)
+    audio_bytes = sum(header.length for _, header in frames)
+    metadata = {
+        "duration_ms": round(duration * 1000),
+        "bitrate": round(audio_bytes * 8 / duration / 1000) if duration else 0,
+        "frames": len(frames),
+        "bytes": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+    if problem:
+        metadata["issue"] = {"type": problem[0], "offset": problem[1]}
+    return metadata
+
+
+def scan_files(paths, workers=None, chunksize=64):
+    """并行扫描，返回 {路径: 元数据}；文件很少时直接在本进程中扫描"""
+    if len(paths) < chunksize:
+        return {path: scan_file(path) for path in paths}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(paths, pool.map(scan_file, paths, chunksize=chunksize)))
+
+
+class MetadataCache:
+    """{路径: [大小, 修改时间, 元数据]}"""
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.entries = {}
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return self
+        try:
+            data = load_file(self.path, cache=False)
+        except (OSError, ValueError) as e:
+            warn(f"读取音频元数据缓存失败，全部重新扫描: {e}")
+            return self
+        if data.get("version") == CACHE_VERSION:
+            self.entries = data.get("entries", {})
+        return self
+
+    def save(self):
+        dump_file(self.path, {"version": CACHE_VERSION, "entries": self.entries}, minify=True)
+
+    def get(self, path, stat):
+        entry = self.entries.get(path)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+        return None
+
+    def put(self, path, stat, metadata):
+        self.entries[path] = [stat.st_size, stat.st_mtime_ns, metadata]
+
+
+def index_entries(index):
+    return index.get("single_chars", []) + index.get("multi_chars", [])
+
+
+def scan_index(index_file=INDEX_FILE, cache_file=CACHE_FILE, workers=None, rescan=False):
+    """扫描索引中列出的全部音频，把元数据写回索引；返回 (索引, 本次扫描的文件数, 不存在的文件)"""
+    with open(index_file, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    cache = MetadataCache(cache_file)
+    if not rescan:
+        cache.load()
+
+    paths = sorted({entry["audio_path"] for entry in index_entries(index)})
+    metadata = {}
+    pending = []
+    missing = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            missing.append(path)
+            continue
+        cached = cache.get(path, stat)
+        if cached is None:
+            pending.append((path, stat))
+        else:
+            metadata[path] = cached
+
+    log(f"音频文件: {len(paths)} 个, 需要扫描 {len(pending)} 个"
+        + (f", 缓存命中 {len(metadata)} 个" if metadata else ""))
+    start = time.perf_counter()
+    scanned = scan_files([path for path, _ in pending], workers)
+    elapsed = time.perf_counter() - start
+    for path, stat in pending:
+        metadata[path] = scanned[path]
+        cache.put(path, stat, scanned[path])
+    if pending:
+        size = sum(stat.st_size for _, stat in pending)
+        log(f"扫描 {len(pending)} 个文件 ({size / 2 ** 20:.1f} MB), {elapsed:.2f} 秒")
+    # 删除已不存在的文件的缓存
+    cache.entries = {path: entry for path, entry in cache.entries.items() if path in metadata}
+    cache.save()
+
+    for entry in index_entries(index):
+        for field in METADATA_FIELDS:
+            entry.pop(field, None)
+        entry.update(metadata.get(entry["audio_path"], {}))
+    index["problems"] = sorted(path for path, info in metadata.items() if "issue" in info) + missing
+    write_files([(index_file, index)])
+    return index, len(pending), missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="扫描音频文件的时长、比特率、帧数和哈希，写入 audio/index.json")
+    parser.add_argument("--index", default=INDEX_FILE, help="音频索引文件")
+    parser.add_argument("--cache", default=CACHE_FILE, help="扫描结果缓存")
+    parser.add_argument("--workers", type=int, default=None, help="进程数（默认 CPU 核数）")
+    parser.add_argument("--rescan", action="store_true", help="忽略缓存，重新扫描全部文件")
+    args = parser.parse_args()
+
+    index, scanned, missing = scan_index(args.index, args.cache, args.workers, args.rescan)
+    entries = [entry for entry in index_entries(index) if "duration_ms" in entry]
+    if entries:
+        durations = sorted(entry["duration_ms"] for entry in entries)
+        bitrates = sorted(entry["bitrate"] for entry in entries)
+        log(f"✅ 已更新 {args.index}: {len(entries)} 个文件, 本次扫描 {scanned} 个")
+        log(f"时长: 最短 {durations[0]} ms, 中位数 {durations[len(durations) // 2]} ms, 最长 {durations[-1]} ms, "
+              f"合计 {sum(durations) / 60000:.1f} 分钟")
+        log(f"平均比特率: {bitrates[0]}–{bitrates[-1]} kbps, 中位数 {bitrates[len(bitrates) // 2]} kbps")
+    problems = [entry for entry in entries if "issue" in entry]
+    if problems or missing:
+        warn(f"⚠️ {len(problems)} 个文件有问题, {len(missing)} 个文件不存在:")
+        for entry in problems[:20]:
+            warn(f"  {entry['audio_path']}: {entry['issue']['type']} (偏移 {entry['issue']['offset']})")
+        for path in missing[:20]:
+            warn(f"  {path}: 不存在")
+
+
+if __name__ == "__main__":
+    main()
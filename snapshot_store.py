@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+章节数据快照库
+按内容哈希去重保存汉字记录，每次排序前都能低成本地保存快照，历史不会互相覆盖
+
+目录结构（默认 data/snapshots/）：
+    objects.pack   追加写入的压缩块，每块是一批新记录（zlib 压缩的 JSON 列表）
+    objects.idx    每行 "哈希 块偏移 块长度 块内序号"
+    manifests/     每个快照一个 <id>.json.gz，按章节列出 [哈希, 排名, 排名字段位置]
+
+记录去掉 frequency_rank 后再计算哈希，排名写在快照清单里，
+所以重新排序只会产生新的清单，不会重复保存记录内容。
+恢复任意快照只需读取它的清单和引用到的块，与历史长度无关。
+恢复时按快照的章节数量由 RankingEngine.write_chapters 写回，分页、chapters.json、二进制数据集、
+读音表和反查索引随章节一起更新；恢复到数据目录时另外重新生成音频索引分片。
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import time
+import zlib
+
+from chapter_writer import ChapterWriteLock
+from pipeline_trace import log
+
+CHAPTER_PATTERN = "chapter_{}_characters.json"
+CHAPTER_NAME = re.compile(r"chapter_(\d+)_characters\.json$")
+
+
+def record_key(record):
+    """去掉排名后的记录及其内容哈希"""
+    content = {k: v for k, v in record.items() if k != 'frequency_rank'}
+    payload = json.dumps(content, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest(), content
+
+
+def is_minified(text):
+    return not text.startswith("[\n")
+
+
+class SnapshotStore:
+    def __init__(self, data_dir="data", store_dir=None, chapter_count=None):
+        self.data_dir = data_dir
+        self.store_dir = store_dir or os.path.join(data_dir, "snapshots")
+        if chapter_count is None:
+            # 默认沿用 chapters.json 中的章节划分（多音字专栏等特殊章节不在快照中）
+            from ranking_engine import discover_chapter_count
+            chapter_count = discover_chapter_count(data_dir)
+        self.chapter_count = chapter_count
+        self.pack_path = os.path.join(self.store_dir, "objects.pack")
+        self.index_path = os.path.join(self.store_dir, "objects.idx")
+        self.manifest_dir = os.path.join(self.store_dir, "manifests")
+        self._index = None
+        self._chunks = {}
+
+    # ---- 对象存储 ----
+
+    @property
+    def index(self):
+        """哈希 → (块偏移, 块长度, 块内序号)"""
+        if self._index is None:
+            self._index = {}
+            if os.path.exists(self.index_path):
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        digest, offset, length, position = line.split()
+                        self._index[digest] = (int(offset), int(length), int(position))
+        return self._index
+
+    def _append_objects(self, objects):
+        """把一批新记录压缩成一个块追加到 objects.pack"""
+        if not objects:
+            return
+        os.makedirs(self.store_dir, exist_ok=True)
+        chunk = zlib.compress(json.dumps([content for _, content in objects], ensure_ascii=False,
+                                         separators=(',', ':')).encode('utf-8'), 9)
+        with open(self.pack_path, 'ab') as f:
+            offset = f.tell()
+            f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self.index_path, 'a', encoding='utf-8') as f:
+            for position, (digest, _) in enumerate(objects):
+                f.write(f"{digest} {offset} {len(chunk)} {position}\n")
+                self.index[digest] = (offset, len(chunk), position)
+
+    def _load_object(self, digest):
+        offset, length, position = self.index[digest]
+        chunk = self._chunks.get(offset)
+        if chunk is None:
+            with open(self.pack_path, 'rb') as f:
+                f.seek(offset)
+                chunk = json.loads(zlib.decompress(f.read(length)).decode('utf-8'))
+            self._chunks[offset] = chunk
+        return chunk[position]
+
+    # ---- 快照清单 ----
+
+    def manifest_path(self, snapshot_id):
+        return os.path.join(self.manifest_dir, f"{snapshot_id}.json.gz")
+
+    def snapshot_ids(self):
+        if not os.path.isdir(self.manifest_dir):
+            return []
+        return sorted(name[:-len(".json.gz")] for name in os.listdir(self.manifest_dir)
+                      if name.endswith(".json.gz"))
+
+    def load_manifest(self, snapshot_id):
+        path = self.manifest_path(snapshot_id)
+        if not os.path.exists(path):
+            matches = [s for s in self.snapshot_ids() if s.startswith(snapshot_id)]
+            if len(matches) != 1:
+                raise KeyError(f"找不到快照: {snapshot_id}")
+            path = self.manifest_path(matches[0])
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return json.load(f)
+
+    def latest(self):
+        ids = self.snapshot_ids()
+        return self.load_manifest(ids[-1]) if ids else None
+
+    # ---- 保存 / 恢复 ----
+
+    def chapter_sources(self, source_dir=None, suffix=""):
+        source_dir = source_dir or self.data_dir
+        for chapter in range(1, self.chapter_count + 1):
+            name = CHAPTER_PATTERN.format(chapter)
+            path = os.path.join(source_dir, name + suffix)
+            if os.path.exists(path):
+                yield name, path
+
+    def take(self, label="", source_dir=None, suffix=""):
+        """保存当前章节文件的快照；内容与最近一次快照相同时不重复保存"""
+        files = {}
+        formats = {}
+        new_objects = []
+        seen = set()
+        for name, path in self.chapter_sources(source_dir, suffix):
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            formats[name] = "minified" if is_minified(text) else "indented"
+            entries = []
+            for record in json.loads(text):
+                digest, content = record_key(record)
+                keys = list(record)
+                position = keys.index('frequency_rank') if 'frequency_rank' in record else -1
+                entries.append([digest, record.get('frequency_rank'), position])
+                if digest not in self.index and digest not in seen:
+                    seen.add(digest)
+                    new_objects.append((digest, content))
+            files[name] = entries
+
+        if not files:
+            log("没有可保存的章节文件")
+            return None
+
+        content_hash = hashlib.blake2b(json.dumps(files, separators=(',', ':')).encode('utf-8'),
+                                       digest_size=8).hexdigest()
+        latest = self.latest()
+        if latest is not None and latest["content_hash"] == content_hash:
+            log(f"章节数据与最近的快照 {latest['id']} 相同，跳过")
+            return latest["id"]
+
+        self._append_objects(new_objects)
+
+        snapshot_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{content_hash}"
+        manifest = {
+            "id": snapshot_id,
+            "label": label,
+            "created": time.strftime('%Y-%m-%d %H:%M:%S'),
+            "content_hash": content_hash,
+            "formats": formats,
+            "files": files,
+        }
+        os.makedirs(self.manifest_dir, exist_ok=True)
+        tmp_path = self.manifest_path(snapshot_id) + ".tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.manifest_path(snapshot_id))
+
+        total = sum(len(entries) for entries in files.values())
+        log(f"保存快照: {snapshot_id} ({label or '无标签'}) - {len(files)} 个文件, "
+            f"{total} 条记录, 新增 {len(new_objects)} 条")
+        return snapshot_id
+
+    def materialize(self, snapshot_id):
+        """还原快照中的章节数据：{文件名: 记录列表}"""
+        manifest = self.load_manifest(snapshot_id)
+        chapters = {}
+        for name, entries in manifest["files"].items():
+            records = []
+            for digest, rank, position in entries:
+                content = self._load_object(digest)
+                if position < 0:
+                    records.append(dict(content))
+                    continue
+                items = list(content.items())
+                items.insert(position, ('frequency_rank', rank))
+                records.append(dict(items))
+            chapters[name] = records
+        return manifest, chapters
+
+    def restore(self, snapshot_id, target_dir=None):
+        """把快照写回数据目录（持有写锁）
+
+        与排序后写回相同，经 RankingEngine.write_chapters 写入章节文件及其派生文件，
+        章节数量恢复为快照中的数量；恢复到数据目录时重新生成音频索引分片。
+        """
+        from build_audio_index import build_audio_index
+        from ranking_engine import DATA_DIR, RankingEngine
+        from record_store import make_records
+
+        target_dir = target_dir or self.data_dir
+        manifest, files = self.materialize(snapshot_id)
+        numbered = sorted((int(CHAPTER_NAME.match(name).group(1)), name) for name in files)
+        if [number for number, _ in numbered] != list(range(1, len(numbered) + 1)):
+            raise ValueError(f"快照 {manifest['id']} 的章节不连续: {', '.join(name for _, name in numbered)}")
+        for _, name in numbered:
+            for record in files[name]:
+                # 旧 backup_before_* 目录由 pandas 写出，缺失的读音是 NaN；现行数据记为空字符串
+                if not isinstance(record.get('jyutping', ''), str):
+                    record['jyutping'] = ''
+        chapters = [make_records(files[name]) for _, name in numbered]
+        formats = manifest.get("formats", {})
+        minify = bool(formats) and all(formats.get(name) == "minified" for name in files)
+
+        # 恢复到新目录时先建好目录，写锁文件就放在里面
+        os.makedirs(target_dir, exist_ok=True)
+        engine = RankingEngine(target_dir, len(chapters), minify=minify)
+        with engine.lock:
+            engine.write_chapters([record for chapter in chapters for record in chapter], chapters=chapters)
+            # 音频索引分片固定在 audio/index/，只对应默认的数据目录
+            if os.path.abspath(target_dir) == os.path.abspath(DATA_DIR):
+                build_audio_index(target_dir, len(chapters))
+        log(f"已恢复快照 {manifest['id']} 到 {target_dir}/（{len(chapters)} 章）")
+        log("例词分片和预缓存清单需运行 python build.py 更新")
+
+    def diff(self, old_id, new_id, limit=20):
+        """比较两个快照的排名变化"""
+        old = self.load_manifest(old_id)
+        new = self.load_manifest(new_id)
+
+        def ranks(manifest):
+            result = {}
+            for entries in manifest["files"].values():
+                for digest, rank, _ in entries:
+                    result[self._load_object(digest)['char']] = rank
+            return result
+
+        old_ranks, new_ranks = ranks(old), ranks(new)
+        added = sorted(set(new_ranks) - set(old_ranks), key=new_ranks.get)
+        removed = sorted(set(old_ranks) - set(new_ranks), key=old_ranks.get)
+        moved = [(char, old_ranks[char], new_ranks[char]) for char in new_ranks
+                 if char in old_ranks and old_ranks[char] != new_ranks[char]]
+        moved.sort(key=lambda item: abs(item[2] - item[1]), reverse=True)
+
+        log(f"比较 {old['id']} → {new['id']}")
+        log(f"  新增 {len(added)} 个, 删除 {len(removed)} 个, 排名变化 {len(moved)} 个")
+        if added:
+            log(f"  新增: {''.join(added[:limit])}")
+        if removed:
+            log(f"  删除: {''.join(removed[:limit])}")
+        for char, old_rank, new_rank in moved[:limit]:
+            log(f"    {char}: {old_rank} → {new_rank} ({new_rank - old_rank:+d})")
+        return added, removed, moved
+
+    def list_snapshots(self):
+        ids = self.snapshot_ids()
+        if not ids:
+            log("还没有快照")
+        for snapshot_id in ids:
+            manifest = self.load_manifest(snapshot_id)
+            total = sum(len(entries) for entries in manifest["files"].values())
+            log(f"  {snapshot_id}  {manifest['created']}  {total:5d} 条  {manifest['label']}")
+        if os.path.exists(self.pack_path):
+            size = os.path.getsize(self.pack_path) + sum(
+                os.path.getsize(self.manifest_path(s)) for s in ids)
+            log(f"共 {len(ids)} 个快照, {len(self.index)} 条不同记录, 占用 {size / 1024:.1f} KB")
+        return ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="章节数据快照库")
+    parser.add_argument("--data-dir", default="data", help="章节数据目录")
+    parser.add_argument("--store-dir", default=None, help="快照库目录（默认 <data-dir>/snapshots）")
+    parser.add_argument("--chapters", type=int, default=None, help="保存快照时读取的章节数量（默认沿用 chapters.json）")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    take = commands.add_parser("take", help="保存当前章节数据的快照")
+    take.add_argument("--label", default="", help="快照标签")
+    commands.add_parser("list", help="列出所有快照")
+    diff = commands.add_parser("diff", help="比较两个快照的排名")
+    diff.add_argument("old")
+    diff.add_argument("new")
+    diff.add_argument("--limit", type=int, default=20)
+    restore = commands.add_parser("restore", help="恢复快照到章节文件")
+    restore.add_argument("snapshot")
+    restore.add_argument("--target-dir", default=None)
+    imported = commands.add_parser("import", help="把旧的 backup_before_* 目录导入为快照")
+    imported.add_argument("backup_dirs", nargs="+")
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.data_dir, args.store_dir, args.chapters)
+    if args.command == "take":
+        # 与排序脚本的写入互斥，避免保存到写了一半的章节
+        with ChapterWriteLock(args.data_dir):
+            store.take(args.label)
+    elif args.command == "list":
+        store.list_snapshots()
+    elif args.command == "diff":
+        store.diff(args.old, args.new, args.limit)
+    elif args.command == "restore":
+        store.restore(args.snapshot, args.target_dir)
+    elif args.command == "import":
+        for backup_dir in args.backup_dirs:
+            store.take(os.path.basename(os.path.normpath(backup_dir)), backup_dir, ".backup")
+
+
+if __name__ == "__main__":
+    main()
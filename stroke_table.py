@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+按码位索引的汉字笔画数表
+构建时从本地数据文件生成紧凑的二进制数组，运行时内存映射后 O(1) 查询
+
+数据源是仓库里的 data/stroke_counts.tsv（来自 PyPI 包 strokes 的 strokeCount.json，MIT 许可证），
+build.py 的 stroke_table 阶段在它变化时重新生成 data/stroke_counts.bin：
+    python stroke_table.py data/stroke_counts.tsv
+
+文件格式（小端）：
+    4 字节  魔数 b'STRK'
+    2 字节  格式版本
+    4 字节  起始码位 base
+    4 字节  条目数 count
+    count 字节  笔画数（uint8，第 i 个对应码位 base + i，0 表示未知）
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+
+# 按模块所在目录解析，从其他工作目录运行脚本时也能找到笔画表
+STROKE_TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "stroke_counts.bin")
+
+MAGIC = b"STRK"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHII")
+
+
+def parse_stroke_source(path):
+    """读取笔画数据源，返回 {码位: 笔画数}
+
+    支持三种格式：
+    - Unihan 数据文件（如 Unihan_IRGSources.txt）中的 kTotalStrokes 行
+    - JSON 对象 {"字": 笔画数}
+    - 每行 "字<TAB>笔画数" 的文本
+    """
+    counts = {}
+    if path.endswith(".json"):
+        with open(path, 'r', encoding='utf-8') as f:
+            for char, count in json.load(f).items():
+                if len(char) == 1 and count:
+                    counts[ord(char)] = int(count)
+        return counts
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) == 3 and fields[1] == "kTotalStrokes":
+                # 多个取值时第一个是通用规范（简体）笔画数
+                counts[int(fields[0][2:], 16)] = int(fields[2].split()[0])
+            elif len(fields) == 2 and len(fields[0]) == 1:
+                counts[ord(fields[0])] = int(fields[1])
+    return counts
+
+
+def build_stroke_table(source_path, output_path=STROKE_TABLE_FILE):
+    """从数据源生成二进制笔画表"""
+    counts = parse_stroke_source(source_path)
+    if not counts:
+        raise ValueError(f"数据源中没有笔画数据: {source_path}")
+
+    base = min(counts)
+    size = max(counts) - base + 1
+    table = bytearray(size)
+    for code_point, count in counts.items():
+        table[code_point - base] = min(count, 255)
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, base, size))
+        f.write(table)
+    os.replace(tmp_path, output_path)
+
+    print(f"笔画表已生成: {output_path}")
+    print(f"  码位范围: U+{base:04X} - U+{base + size - 1:04X}")
+    print(f"  有效条目: {len(counts)} 个, 文件大小: {(HEADER.size + size) / 1024:.1f} KB")
+    return len(counts)
+
+
+class StrokeTable:
+    """内存映射的笔画数表"""
+
+    def __init__(self, path=STROKE_TABLE_FILE):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.base, self.size = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"无法识别的笔画表文件: {path}")
+
+    def lookup(self, char):
+        """返回笔画数，表中没有时返回 0"""
+        offset = ord(char) - self.base
+        if 0 <= offset < self.size:
+            return self._mm[HEADER.size + offset]
+        return 0
+
+    def as_array(self):
+        """以 numpy 数组形式零拷贝访问整张表（需要 numpy）"""
+        import numpy as np
+        return np.frombuffer(self._mm, dtype=np.uint8, count=self.size, offset=HEADER.size)
+
+    def close(self):
+        self._mm.close()
+
+
+_table = None
+
+
+def get_stroke_table():
+    """进程内共享的笔画表；文件不存在时返回 None"""
+    global _table
+    if _table is None and os.path.exists(STROKE_TABLE_FILE):
+        _table = StrokeTable(STROKE_TABLE_FILE)
+    return _table
+
+
+def estimate_stroke_count(char):
+    """基于Unicode区块估算笔画数（笔画表缺失或未收录时使用）"""
+    code_point = ord(char)
+    if 0x4E00 <= code_point <= 0x9FFF:
+        if code_point < 0x4F00:
+            return 3
+        elif code_point < 0x6000:
+            return 6
+        elif code_point < 0x7000:
+            return 9
+        elif code_point < 0x8000:
+            return 12
+        elif code_point < 0x9000:
+            return 15
+        else:
+            return 8
+    return 8
+
+
+def stroke_count(char):
+    """查询汉字笔画数：优先使用笔画表，未收录时估算"""
+    table = get_stroke_table()
+    if table is not None:
+        count = table.lookup(char)
+        if count:
+            return count
+    return estimate_stroke_count(char)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成按码位索引的汉字笔画数表")
+    parser.add_argument("source", help="笔画数据源（Unihan kTotalStrokes / JSON / TSV）")
+    parser.add_argument("-o", "--output", default=STROKE_TABLE_FILE, help="输出文件")
+    args = parser.parse_args()
+
+    build_stroke_table(args.source, args.output)
+
+    table = StrokeTable(args.output)
+    from ranking_engine import load_characters
+    characters = load_characters()
+    missing = [c['char'] for c in characters if not table.lookup(c['char'])]
+    print(f"数据集覆盖: {len(characters) - len(missing)}/{len(characters)}")
+    if missing:
+        print(f"  未收录: {''.join(missing[:50])}")
+    table.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+# 仓库中的脚本都在根目录，按顶层模块导入
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+DATA_DIR = os.path.join(ROOT, "data")
+
+
+@pytest.fixture
+def frequency_cache_dir(tmp_path, monkeypatch):
+    """wordfreq 字频缓存写到临时目录，不改动共享的 .cache/"""
+    import frequency_cache
+    monkeypatch.setattr(frequency_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+@pytest.fixture(scope="session")
+def characters():
+    """真实章节数据（8105 个汉字）"""
+    from ranking_engine import discover_chapter_count, load_characters
+    return load_characters(DATA_DIR, discover_chapter_count(DATA_DIR))
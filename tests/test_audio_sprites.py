@@ -0,0 +1,63 @@
+import json
+import struct
+
+from build_audio_sprites import build_audio_sprites, build_sprite, chapter_paths
+from mp3_frames import audio_frames
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, 无填充，单声道：每帧 417 字节
+FRAME_LENGTH = 417
+
+
+def frame(header=0xFFFB90C0):
+    return struct.pack(">I", header) + bytes(FRAME_LENGTH - 4)
+
+
+def id3_tag(size=20):
+    return b"ID3\x03\x00\x00" + bytes([0, 0, 0, size]) + bytes(size)
+
+
+def write_audio(path, frames, header=0xFFFB90C0):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(id3_tag() + frame(header) * frames)
+    return str(path)
+
+
+def test_chapter_paths_follow_the_shard_and_skip_duplicates():
+    manifest = {"single_path": "audio/single_chars/{char}.mp3", "syllable_path": "audio/syllables/{file}.mp3"}
+    shard = {"single": "我", "syllables": {"si6": "是事", "hai6": "系"},
+             "multi": {"行|1": "audio/syllables/hai6.mp3", "行|2": "audio/multi/hong4.mp3"}}
+    assert chapter_paths(shard, manifest) == [
+        "audio/single_chars/我.mp3", "audio/syllables/si6.mp3", "audio/syllables/hai6.mp3", "audio/multi/hong4.mp3"]
+
+
+def test_sprite_slices_are_the_original_frames(tmp_path):
+    first = write_audio(tmp_path / "a.mp3", 3)
+    second = write_audio(tmp_path / "b.mp3", 5)
+    # 48 kHz 的片段不能拼进 44.1 kHz 的流
+    other = write_audio(tmp_path / "c.mp3", 2, header=0xFFFB94C0)
+
+    sprite, clips, skipped = build_sprite([first, second, other, str(tmp_path / "missing.mp3")])
+    assert skipped == [other, str(tmp_path / "missing.mp3")]
+    assert clips[first][:2] == [0, 3 * FRAME_LENGTH]
+    assert clips[second][:2] == [3 * FRAME_LENGTH, 5 * FRAME_LENGTH]
+    offset, length, _ = clips[second]
+    assert len(audio_frames(sprite[offset:offset + length])) == 5
+
+
+def test_manifest_lists_each_chapter_table(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_audio(tmp_path / "audio" / "syllables" / "si6.mp3", 4)
+    index = tmp_path / "audio" / "index"
+    index.mkdir()
+    (index / "chapter_1.json").write_text(json.dumps({"single": "", "syllables": {"si6": "是事"}, "multi": {}}))
+    (index / "manifest.json").write_text(json.dumps({
+        "single_path": "audio/single_chars/{char}.mp3", "syllable_path": "audio/syllables/{file}.mp3",
+        "chapters": {"1": {"file": "audio/index/chapter_1.json", "count": 2}}}))
+
+    listing = build_audio_sprites("audio")
+    table = json.loads((tmp_path / "audio" / "sprites" / "chapter_1.json").read_text())
+    assert listing == json.loads((tmp_path / "audio" / "sprites" / "manifest.json").read_text())["chapters"]
+    assert listing["1"]["file"] == "audio/sprites/chapter_1.json" and listing["1"]["clips"] == 1
+    assert table["file"] == "audio/sprites/chapter_1.mp3"
+    assert table["clips"] == {"audio/syllables/si6.mp3": [0, 4 * FRAME_LENGTH, table["clips"]["audio/syllables/si6.mp3"][2]]}
+    assert (tmp_path / "audio" / "sprites" / "chapter_1.mp3").stat().st_size == table["bytes"]
@@ -0,0 +1,25 @@
+from binary_dataset import BinaryDataset, write_dataset
+from jyutping_inventory import JyutpingInventory
+
+
+def chapter_record(record):
+    """章节 JSON 中 BinaryDataset.record 能还原的字段"""
+    return {key: record[key] for key in ("char", "jyutping", "tone", "frequency_rank", "wordfreq_score",
+                                         "secondary_jyutping") if key in record}
+
+
+def test_dataset_round_trip(characters, tmp_path):
+    inventory = JyutpingInventory()
+    inventory.add_characters(characters)
+    audio_chars = {c['char'] for c in characters[::3]}
+    path = str(tmp_path / "characters.bin")
+    write_dataset(characters, path, audio_chars, inventory)
+
+    with BinaryDataset(path) as dataset:
+        assert len(dataset) == len(characters)
+        for record in characters:
+            assert dataset.by_char(record['char']) == chapter_record(record)
+            assert dataset.by_rank(record['frequency_rank'])['char'] == record['char']
+            assert dataset.has_audio(record['char']) == (record['char'] in audio_chars)
+        assert dataset.by_char("㐀") is None
+        assert dataset.by_rank(len(characters) + 1) is None
@@ -0,0 +1,87 @@
+import sys
+
+import pytest
+
+from build import BuildState, Stage, build, local_imports
+
+
+def copy_stage(name, source, target, transform=str.upper):
+    """in-process 阶段：读 source，写 transform 后的内容到 target，记录运行次数"""
+    def run():
+        runs.append(name)
+        with open(source, encoding="utf-8") as f:
+            text = f.read()
+        with open(target, "w", encoding="utf-8") as f:
+            f.write(transform(text))
+    run.__name__ = name
+    return Stage(name, run, inputs=[source], outputs=[target])
+
+
+runs = []
+
+
+@pytest.fixture
+def graph(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    runs.clear()
+    (tmp_path / "source.txt").write_text("hello", encoding="utf-8")
+    upper = copy_stage("upper", "source.txt", "upper.txt")
+    length = copy_stage("length", "upper.txt", "length.txt", lambda text: str(len(text)))
+    length.deps.append("upper")
+    return {"upper": upper, "length": length}
+
+
+def run_build(graph, state_file="state.json", **kwargs):
+    return build(graph, list(graph), BuildState(state_file).load(), jobs=1, **kwargs)
+
+
+def test_second_build_skips_everything(graph):
+    assert run_build(graph) == {"upper": "built", "length": "built"}
+    assert run_build(graph) == {"upper": "skipped", "length": "skipped"}
+    assert runs == ["upper", "length"]
+
+
+def test_unchanged_upstream_output_skips_downstream(graph, tmp_path):
+    run_build(graph)
+    # 源文件变了，但大写后的结果没变：上游重建，下游跳过
+    (tmp_path / "source.txt").write_text("HELLO", encoding="utf-8")
+    assert run_build(graph) == {"upper": "built", "length": "skipped"}
+    (tmp_path / "source.txt").write_text("hello world", encoding="utf-8")
+    assert run_build(graph) == {"upper": "built", "length": "built"}
+    assert (tmp_path / "length.txt").read_text(encoding="utf-8") == "11"
+
+
+def test_missing_output_or_force_rebuilds(graph, tmp_path):
+    run_build(graph)
+    (tmp_path / "length.txt").unlink()
+    assert run_build(graph) == {"upper": "skipped", "length": "built"}
+    assert run_build(graph, force={"upper"}) == {"upper": "built", "length": "skipped"}
+
+
+def test_dry_run_does_not_run_or_save(graph, tmp_path):
+    assert run_build(graph, dry_run=True) == {"upper": "would_run", "length": "would_run"}
+    assert runs == [] and not (tmp_path / "state.json").exists()
+
+
+def test_failed_stage_blocks_downstream(graph, tmp_path):
+    (tmp_path / "source.txt").unlink()
+    assert run_build(graph) == {"upper": "failed", "length": "blocked"}
+
+
+def test_command_stage_key_follows_scripts(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "helper.py").write_text("VALUE = 1\n", encoding="utf-8")
+    (tmp_path / "tool.py").write_text("from helper import VALUE\n", encoding="utf-8")
+    (tmp_path / "lib.js").write_text("module.exports = 1;\n", encoding="utf-8")
+    (tmp_path / "tool.js").write_text("const fs = require('fs');\nconst lib = require('./lib');\n",
+                                      encoding="utf-8")
+    assert local_imports("tool.py") == {"tool.py", "helper.py"}
+    assert local_imports("tool.js") == {"tool.js", "lib.js"}
+
+    state = BuildState("state.json")
+    stages = [Stage("py", [sys.executable, "tool.py"], [], []), Stage("js", ["node", "tool.js"], [], [])]
+    keys = [state.stage_key(stage) for stage in stages]
+    (tmp_path / "helper.py").write_text("VALUE = 2\n", encoding="utf-8")
+    (tmp_path / "lib.js").write_text("module.exports = 2;\n", encoding="utf-8")
+    state.hashes.clear()
+    assert all(new != old for new, old in zip([state.stage_key(stage) for stage in stages], keys))
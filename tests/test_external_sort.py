@@ -0,0 +1,30 @@
+import pytest
+
+from conftest import DATA_DIR
+from external_sort import FieldScorer, external_sort, verify
+from ranking_engine import chapter_file, discover_chapter_count, make_scorer
+
+
+@pytest.mark.parametrize("name", ["common", "wordfreq"])
+def test_external_sort_matches_in_memory_rank(name, tmp_path, frequency_cache_dir):
+    if name == "wordfreq":
+        pytest.importorskip("wordfreq")
+    chapter_count = discover_chapter_count(DATA_DIR)
+    output_dir = tmp_path / "out"
+    # 小批量、小扇入，强制多段多轮归并
+    written = external_sort(make_scorer(name), str(output_dir), data_dir=DATA_DIR, chapter_count=chapter_count,
+                            run_size=700, fan_in=3, spill_dir=str(tmp_path / "spill"))
+    assert len(written) == chapter_count
+    assert verify(lambda: make_scorer(name), str(output_dir), data_dir=DATA_DIR,
+                  chapter_count=chapter_count) == []
+
+
+def test_field_scorer_jsonl_input(tmp_path):
+    source = tmp_path / "records.jsonl"
+    source.write_text("".join(f'{{"char": "{chr(0x4E00 + i)}", "score": {i % 7}}}\n' for i in range(50)),
+                      encoding="utf-8")
+    output_dir = tmp_path / "out"
+    external_sort(FieldScorer("score"), str(output_dir), inputs=[str(source)], chapter_count=3,
+                  run_size=8, fan_in=2, spill_dir=str(tmp_path / "spill"))
+    assert verify(lambda: FieldScorer("score"), str(output_dir), inputs=[str(source)], chapter_count=3) == []
+    assert not (output_dir / chapter_file("", 4)).exists()
@@ -0,0 +1,33 @@
+import json
+
+from jyutping_inventory import JyutpingInventory, is_irregular, tone_of
+
+
+def test_inventory_round_trip(characters, tmp_path):
+    inventory = JyutpingInventory()
+    inventory.add_characters(characters)
+    path = str(tmp_path / "jyutping_inventory.json")
+    inventory.save(path)
+    loaded = JyutpingInventory.load(path)
+    assert loaded.to_json() == json.loads(json.dumps(inventory.to_json()))
+
+    for record in characters:
+        row = loaded.encode_record(record)
+        assert row == inventory.encode_record(record)
+        decoded = loaded.decode_row(row)
+        assert decoded == {key: record[key] for key in decoded}
+        assert set(record) - set(decoded) <= {"secondary_jyutping"}
+        if not is_irregular(row[1]):
+            assert f"{loaded.syllable(row[1])}{tone_of(row[1])}" == record['jyutping']
+
+
+def test_inventory_codes_are_stable():
+    inventory = JyutpingInventory()
+    first = [inventory.add(reading) for reading in ("si6", "si1", "ngo5", "m4", "si6")]
+    assert first[0] == first[4]
+    assert first[0] >> 3 == first[1] >> 3 and tone_of(first[0]) == 6 and tone_of(first[1]) == 1
+    # 新读音追加在末尾，已有的编码不变
+    inventory.add("gwong2")
+    assert [inventory.encode(reading) for reading in ("si6", "si1", "ngo5", "m4")] == first[:4]
+    assert [inventory.decode(code) for code in first] == ["si6", "si1", "ngo5", "m4", "si6"]
+    assert inventory.encode(None) is None and inventory.decode(None) is None
@@ -0,0 +1,61 @@
+import struct
+
+from mp3_frames import inspect, parse_header
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, 无填充，单声道：每帧 417 字节
+HEADER = 0xFFFB90C0
+FRAME_LENGTH = 417
+
+
+def frame():
+    return struct.pack(">I", HEADER) + bytes(FRAME_LENGTH - 4)
+
+
+def id3_tag(size=20):
+    # ID3v2 的大小字段是 4 个 7 位字节
+    return b"ID3\x03\x00\x00" + bytes([0, 0, 0, size]) + bytes(size)
+
+
+def test_header():
+    header = parse_header(frame(), 0)
+    assert (header.version, header.layer, header.bitrate, header.sample_rate) == (1, 3, 128, 44100)
+    assert header.length == FRAME_LENGTH
+
+
+def test_complete_file():
+    data = id3_tag() + frame() * 5
+    frames, problem = inspect(data)
+    assert problem is None
+    assert [offset for offset, _ in frames] == [30 + i * FRAME_LENGTH for i in range(5)]
+
+
+def test_truncated_last_frame():
+    data = frame() * 5
+    frames, problem = inspect(data[:-100])
+    assert len(frames) == 4
+    assert problem == ("truncated", 4 * FRAME_LENGTH)
+
+
+def test_garbage_between_frames():
+    data = frame() * 2 + b"\x12\x34" * 30 + frame() * 2
+    frames, problem = inspect(data)
+    assert len(frames) == 2
+    assert problem == ("garbage", 2 * FRAME_LENGTH)
+
+
+def test_trailing_ape_tag_is_not_garbage():
+    frames, problem = inspect(frame() * 3 + b"APETAGEX" + bytes(24))
+    assert len(frames) == 3 and problem is None
+
+
+def test_no_frames():
+    assert inspect(b"")[1] == ("empty", 0)
+    assert inspect(b"not an mp3 file at all")[1][0] == "empty"
+    assert inspect(id3_tag())[1] == ("empty", 30)
+
+
+def test_info_frame_is_not_audio():
+    info = struct.pack(">I", HEADER) + bytes(17) + b"Xing" + bytes(FRAME_LENGTH - 25)
+    frames, problem = inspect(info + frame() * 2)
+    assert problem is None
+    assert [offset for offset, _ in frames] == [FRAME_LENGTH, 2 * FRAME_LENGTH]
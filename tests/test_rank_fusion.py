@@ -0,0 +1,45 @@
+import pytest
+
+from rank_fusion import fuse
+
+
+def order(fused):
+    return [char for char, _, _ in fused]
+
+
+@pytest.mark.parametrize("method", ["rrf", "borda"])
+def test_ties_keep_best_rank_order(method):
+    # 甲、乙各在一个来源中排第一、另一个中排第三，得分相同；按归并时第一次出现的顺序（先比名次，再比来源顺序）
+    rankings = {"a": ["甲", "丙", "乙"], "b": ["乙", "丙", "甲"]}
+    fused = fuse(rankings, method=method)
+    scores = {char: score for char, score, _ in fused}
+    assert scores["甲"] == pytest.approx(scores["乙"])
+    assert order(fused).index("甲") < order(fused).index("乙")
+    # 来源顺序反过来时次序也反过来
+    swapped = order(fuse({"b": rankings["b"], "a": rankings["a"]}, method=method))
+    assert swapped.index("乙") < swapped.index("甲")
+
+
+def test_tie_broken_by_best_rank_before_source_order():
+    # Borda 下甲（名次 3、1）与乙（名次 2、2）同分；甲的最好名次在后一个来源中，但名次更好，仍排在前面
+    fused = fuse({"a": ["丙", "乙", "甲", "丁"], "b": ["甲", "乙", "丁", "丙"]}, method="borda")
+    assert [(char, score) for char, score, _ in fused] == [("甲", 1.5), ("乙", 1.5), ("丙", 1.25), ("丁", 0.75)]
+
+
+def test_rrf_scores_and_source_ranks():
+    fused = fuse({"a": ["甲", "乙"], "b": ["乙"]}, weights={"a": 1.0, "b": 2.0}, k=60)
+    assert order(fused) == ["乙", "甲"]
+    char, score, ranks = fused[0]
+    assert score == pytest.approx(1 / 62 + 2 / 61)
+    assert ranks == {"a": 2, "b": 1}
+    assert fused[1][2] == {"a": 1, "b": None}
+
+
+def test_duplicate_entries_count_once():
+    fused = fuse({"a": ["甲", "甲", "乙"]}, k=0)
+    assert fused[0] == ("甲", 1.0, {"a": 1})
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        fuse({"a": ["甲"]}, method="median")
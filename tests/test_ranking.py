@@ -0,0 +1,24 @@
+import pytest
+
+from conftest import DATA_DIR
+from ranking_engine import SCORERS, RankingEngine, make_scorer
+
+pytest.importorskip("numpy")
+
+
+def ranking(characters, name, vectorized):
+    engine = RankingEngine(DATA_DIR, characters=characters)
+    return [(c['char'], c['frequency_rank']) for c in engine.rank(make_scorer(name), vectorized)]
+
+
+@pytest.mark.parametrize("name", sorted(SCORERS))
+def test_vectorized_matches_loop(name, characters, frequency_cache_dir):
+    if name in ("wordfreq", "fusion"):
+        pytest.importorskip("wordfreq")
+    assert ranking(characters, name, vectorized=True) == ranking(characters, name, vectorized=False)
+
+
+def test_rank_does_not_modify_loaded_records(characters):
+    before = [dict(c) for c in characters[:50]]
+    RankingEngine(DATA_DIR, characters=characters).rank(make_scorer("common"))
+    assert [dict(c) for c in characters[:50]] == before
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+NumPy 向量化评分与排序
+把频率、笔画、拼音、语义、码位等特征整理成列，一次计算加权得分，
+再用 lexsort 排序；结果与逐条计算的排序完全一致
+"""
+
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from jyutping_inventory import JyutpingInventory
+from stroke_table import get_stroke_table
+
+
+def codepoint_column(characters):
+    return np.fromiter((ord(c['char']) for c in characters), dtype=np.int64, count=len(characters))
+
+
+def estimate_stroke_counts(codepoints):
+    """stroke_table.estimate_stroke_count 的向量化版本"""
+    in_cjk = (codepoints >= 0x4E00) & (codepoints <= 0x9FFF)
+    return np.select(
+        [
+            in_cjk & (codepoints < 0x4F00),
+            in_cjk & (codepoints < 0x6000),
+            in_cjk & (codepoints < 0x7000),
+            in_cjk & (codepoints < 0x8000),
+            in_cjk & (codepoints < 0x9000),
+        ],
+        [3, 6, 9, 12, 15],
+        default=8,
+    ).astype(np.int64)
+
+
+def stroke_count_column(codepoints):
+    """按码位批量查笔画表，未收录的码位按区块估算"""
+    counts = np.zeros(len(codepoints), dtype=np.int64)
+    table = get_stroke_table()
+    if table is not None:
+        offsets = codepoints - table.base
+        inside = (offsets >= 0) & (offsets < table.size)
+        counts[inside] = table.as_array()[offsets[inside]]
+    missing = counts == 0
+    if missing.any():
+        counts[missing] = estimate_stroke_counts(codepoints[missing])
+    return counts
+
+
+def descending_order(scores):
+    """得分从高到低；得分相同保持原始顺序（与 list.sort(reverse=True) 一致）"""
+    return np.lexsort((np.arange(len(scores)), -scores))
+
+
+def common_stroke_rank(characters, common_chars):
+    """常用字优先 → 笔画数少优先 → 码位
+
+    码位作为 lexsort 的次关键字，取代 ord(char) / 1000000 的浮点技巧。
+    """
+    codepoints = codepoint_column(characters)
+    is_common = np.fromiter((c['char'] in common_chars for c in characters), dtype=bool, count=len(characters))
+    scores = np.where(is_common, 0, 10000) + stroke_count_column(codepoints) * 100
+    return np.lexsort((codepoints, scores)), scores
+
+
+def real_frequency_features(characters, sorter):
+    """RealFrequencySorter 的特征列"""
+    count = len(characters)
+    codepoints = codepoint_column(characters)
+    strokes = stroke_count_column(codepoints)
+
+    # 没有频率数据的汉字记为 -1，再按笔画数估算
+    frequency_data = sorter.frequency_data
+    frequency = np.fromiter((frequency_data.get(c['char'], -1) for c in characters), dtype=np.float64, count=count)
+    frequency = np.where(frequency >= 0, frequency, np.maximum(1, 10000 - strokes * 1000))
+
+    # 拼音得分只取决于读音：先编码成整数，每种读音只算一次
+    inventory = JyutpingInventory()
+    codes = np.fromiter((inventory.add(c.get('jyutping', '')) for c in characters), dtype=np.int64, count=count)
+    unique_codes, inverse = np.unique(codes, return_inverse=True)
+    pinyin = np.array([sorter.calculate_pinyin_score(inventory.decode(int(code))) for code in unique_codes],
+                      dtype=np.float64)[inverse]
+
+    # 语义得分：按码位做集合成员判断，顺序与 calculate_semantic_score 一致
+    def members(chars):
+        return np.isin(codepoints, np.fromiter((ord(ch) for ch in chars), dtype=np.int64))
+
+    semantic = np.select(
+        [
+            members(sorter.DAILY_LIFE_CHARS),
+            members(sorter.FAMILY_CHARS),
+            members(sorter.BODY_CHARS),
+            members(sorter.NATURE_CHARS),
+        ],
+        [2000.0, 1500.0, 1200.0, 1000.0],
+        default=500.0,
+    )
+
+    return {
+        'frequency': frequency,
+        'stroke': np.maximum(0, 5000 - strokes * 500).astype(np.float64),
+        'pinyin': pinyin,
+        'semantic': semantic,
+        'codepoint': codepoints,
+    }
+
+
+def real_frequency_rank(characters, sorter):
+    """按 RealFrequencySorter.PRIORITY_WEIGHTS 一次计算全部优先级"""
+    features = real_frequency_features(characters, sorter)
+    weights = sorter.PRIORITY_WEIGHTS
+    priority = (
+        features['frequency'] * weights['frequency'] +
+        features['stroke'] * weights['stroke'] +
+        features['pinyin'] * weights['pinyin'] +
+        features['semantic'] * weights['semantic']
+    )
+    return descending_order(priority), priority
+
+
+def wordfreq_rank(characters, sorter):
+    frequency = np.fromiter((sorter.get_character_frequency(c['char']) for c in characters),
+                            dtype=np.float64, count=len(characters))
+    return descending_order(frequency), frequency
+
+
+def synthetic_characters(size, seed=0):
+    """合成的扩展汉字集：依次取 CJK 各区块码位（不够时循环），粤拼随机取自现有数据"""
+    from ranking_engine import load_characters
+
+    readings = [c.get('jyutping', '') for c in load_characters()] or ['']
+    blocks = [(0x4E00, 0x9FFF), (0x3400, 0x4DBF), (0x20000, 0x2A6DF), (0x2A700, 0x2EBE0), (0x30000, 0x3134A)]
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(readings), size)
+
+    code_points = itertools.cycle(itertools.chain.from_iterable(range(start, end + 1) for start, end in blocks))
+    return [
+        {'char': chr(code_point), 'jyutping': readings[pick]}
+        for code_point, pick in zip(code_points, picks.tolist())
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比逐条排序与向量化排序")
+    parser.add_argument("--size", type=int, default=0, help="合成数据规模（0 表示使用真实章节数据）")
+    parser.add_argument("--scorer", default="real", choices=["common", "real", "wordfreq"])
+    args = parser.parse_args()
+
+    from ranking_engine import SCORERS, RankingEngine
+
+    engine = RankingEngine(characters=synthetic_characters(args.size) if args.size else None)
+    characters = engine.characters
+
+    scorer = SCORERS[args.scorer]()
+    scorer.prepare(characters)
+
+    start = time.perf_counter()
+    loop_ranked = engine.rank(scorer)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vector_ranked = engine.rank(scorer, vectorized=True)
+    vector_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    order, _ = scorer.vector_rank(characters)
+    kernel_time = time.perf_counter() - start
+
+    same = [c['char'] for c in loop_ranked] == [c['char'] for c in vector_ranked]
+    print(f"\n=== {args.scorer}: {len(characters)} 个汉字 ===")
+    print(f"  逐条计算: {loop_time * 1000:.1f} ms")
+    print(f"  向量化: {vector_time * 1000:.1f} ms（其中特征列 + 加权 + lexsort: {kernel_time * 1000:.1f} ms）")
+    print(f"  排名一致: {'是' if same else '否'}")
+
+
+if __name__ == "__main__":
+    main()